@@ -0,0 +1,196 @@
+import argparse
+import json
+import math
+import os
+import time
+from threshold_rules import counter_deltas, nic_counters
+
+DEFAULT_STATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'anomaly_state.json')
+
+HOURS_PER_WEEK = 168
+
+
+class Ewma:
+    __slots__ = ('alpha', 'mean', 'var', 'count')
+
+    def __init__(self, alpha, mean=0.0, var=0.0, count=0):
+        """
+        Exponentially weighted mean and variance, updated in O(1).
+        :param alpha: Weight of the newest sample (0-1).
+        """
+        self.alpha = alpha
+        self.mean = mean
+        self.var = var
+        self.count = count
+
+    def update(self, value):
+        if not self.count:
+            self.mean = value
+        else:
+            diff = value - self.mean
+            increment = self.alpha * diff
+            self.mean += increment
+            self.var = (1 - self.alpha) * (self.var + diff * increment)
+        self.count += 1
+
+    def zscore(self, value, min_std):
+        return (value - self.mean) / max(math.sqrt(self.var), min_std)
+
+
+class _Stream:
+    def __init__(self, alpha, seasonal_alpha):
+        """
+        Baselines of one interface and direction: a fast EWMA following the
+        recent level and one slower EWMA per hour of the week.
+        """
+        self.recent = Ewma(alpha)
+        self.seasonal = [Ewma(seasonal_alpha) for _ in range(HOURS_PER_WEEK)]
+        self.score = 0.0
+        self.rate = 0.0
+        self.anomalous = False
+
+
+def hour_of_week(timestamp):
+    local = time.localtime(timestamp)
+    return local.tm_wday * 24 + local.tm_hour
+
+
+class AnomalyDetector:
+    def __init__(self, alpha=0.05, seasonal_alpha=0.02, threshold=4.0, warmup=30, min_std=0.25,
+                 exclude=('lo',)):
+        """
+        Streaming anomaly scores on per-NIC rates.
+
+        Rates are scored as log(1 + bytes/s), which tames the heavy tail of
+        bandwidth, against two baselines: an EWMA of the recent level and an
+        EWMA for the current hour of the week. Once the hour-of-week baseline
+        has seen warmup samples its z-score is used, so traffic is judged
+        against what is usual at that time (3 a.m. on a Sunday looks
+        different from Monday noon); before that the recent z-score is. Each
+        sample costs O(1) and memory is constant per interface.
+        :param threshold: Score at which a sample is anomalous; the stream
+                          re-arms once its score falls below half of it.
+        :param min_std: Floor on the standard deviation (in log units), so a
+                        flat baseline does not turn every change into an anomaly.
+        :param exclude: Interface name prefixes not scored.
+        """
+        self.alpha = alpha
+        self.seasonal_alpha = seasonal_alpha
+        self.threshold = threshold
+        self.warmup = warmup
+        self.min_std = min_std
+        self.exclude = exclude
+        self.streams = {}  # (interface, direction) -> _Stream
+        self._previous = None
+        self._previous_time = None
+
+    def update(self, counters, now=None):
+        """
+        Feed cumulative per-NIC byte counters (see RuleEngine.update).
+        :return: List of (interface, direction, bytes/s, score) for streams
+                 that became anomalous with this sample.
+        """
+        now = time.time() if now is None else now
+        current = nic_counters(counters)
+        previous, previous_time = self._previous, self._previous_time
+        self._previous, self._previous_time = current, now
+        if previous is None or now <= previous_time:
+            return []
+        elapsed = now - previous_time
+        slot = hour_of_week(now)
+
+        anomalies = []
+        for nic, (delta_in, delta_out) in counter_deltas(previous, current).items():
+            if nic.startswith(self.exclude):
+                continue
+            for direction, delta in (('in', delta_in), ('out', delta_out)):
+                stream = self.streams.get((nic, direction))
+                if stream is None:
+                    stream = self.streams[(nic, direction)] = _Stream(self.alpha, self.seasonal_alpha)
+                rate = delta / elapsed
+                value = math.log1p(rate)
+                seasonal = stream.seasonal[slot]
+                if seasonal.count >= self.warmup:
+                    score = seasonal.zscore(value, self.min_std)
+                elif stream.recent.count >= self.warmup:
+                    score = stream.recent.zscore(value, self.min_std)
+                else:
+                    score = 0.0
+                stream.recent.update(value)
+                seasonal.update(value)
+                stream.rate, stream.score = rate, score
+                if score >= self.threshold and not stream.anomalous:
+                    stream.anomalous = True
+                    anomalies.append((nic, direction, rate, score))
+                elif score < self.threshold / 2:
+                    stream.anomalous = False
+        return anomalies
+
+    def highest(self):
+        """
+        Return (interface, direction, bytes/s, score) of the stream with the
+        highest current score, or None before the first sample.
+        """
+        if not self.streams:
+            return None
+        (nic, direction), stream = max(self.streams.items(), key=lambda item: item[1].score)
+        return nic, direction, stream.rate, stream.score
+
+    def save(self, path=DEFAULT_STATE_PATH):
+        """
+        Keep the baselines across restarts, so the hour-of-week baselines do
+        not have to be learned again.
+        """
+        state = {f"{nic}|{direction}": {'recent': [stream.recent.mean, stream.recent.var, stream.recent.count],
+                                        'seasonal': [[s.mean, s.var, s.count] for s in stream.seasonal]}
+                 for (nic, direction), stream in self.streams.items()}
+        temporary = f"{path}.tmp"
+        with open(temporary, 'w') as f:
+            json.dump(state, f)
+        os.replace(temporary, path)
+
+    def load(self, path=DEFAULT_STATE_PATH):
+        if not os.path.exists(path):
+            return
+        with open(path) as f:
+            state = json.load(f)
+        for key, baselines in state.items():
+            nic, _, direction = key.rpartition('|')
+            stream = _Stream(self.alpha, self.seasonal_alpha)
+            stream.recent = Ewma(self.alpha, *baselines['recent'])
+            stream.seasonal = [Ewma(self.seasonal_alpha, *values) for values in baselines['seasonal']]
+            self.streams[(nic, direction)] = stream
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Streaming anomaly scores on per-interface bandwidth')
+    parser.add_argument('-r', '--refresh', type=float, default=5,
+                        help='Sampling interval in seconds')
+    parser.add_argument('-z', '--threshold', type=float, default=4.0,
+                        help='Anomaly score threshold')
+    parser.add_argument('--state', type=str, default=DEFAULT_STATE_PATH,
+                        help='File keeping the baselines across restarts')
+    return parser.parse_args()
+
+
+def main():
+    import psutil
+
+    args = parse_arguments()
+    detector = AnomalyDetector(threshold=args.threshold)
+    detector.load(args.state)
+    detector.update(psutil.net_io_counters(pernic=True))
+    try:
+        while True:
+            time.sleep(args.refresh)
+            for nic, direction, rate, score in detector.update(psutil.net_io_counters(pernic=True)):
+                print(f"{time.strftime('%H:%M:%S')} anomaly on {nic} {direction}: "
+                      f"{rate / 1024:.1f} KB/s (score {score:.1f})", flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        detector.save(args.state)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE_PATH = os.path.join(HERE, 'startup_baseline.json')
+
+# Mode -> Python code run in a fresh interpreter: what that mode imports
+# before it does any work
+MODES = {
+    'interpreter': 'pass',
+    'bwm-once': 'import bwm, netns',
+    'bwm-ui': 'import bwm, curses, locale, psutil, sparkline, snmp_stats',
+    'launcher': "import runpy; runpy.run_path('integrating_categorizer.py', run_name='launcher')",
+    'categorizer': 'import traffic_categorizer',
+    'parallel-categorizer': 'import parallel_categorizer',
+    'process-usage': 'import process_usage',
+    'pcap-analyzer': 'import pcap_analyzer',
+    'grapher': 'import usage_grapher',
+    'report': 'import report',
+}
+
+_IMPORT_TIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)')
+
+
+def measure(code, runs=7):
+    """
+    Run code in fresh interpreters with -X importtime.
+    :return: (median total import time in ms, {top-level module: cumulative ms} of the median run).
+    """
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=HERE,
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'failed')
+        modules = {}
+        for line in result.stderr.splitlines():
+            match = _IMPORT_TIME.match(line)
+            # Top-level imports carry the cumulative time of everything they pulled in
+            if match and len(match.group(3)) == 1:
+                modules[match.group(4)] = int(match.group(2)) / 1000
+        samples.append((sum(modules.values()), modules))
+    samples.sort(key=lambda sample: sample[0])
+    return samples[len(samples) // 2]
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Import time at startup of each mode')
+    parser.add_argument('modes', nargs='*', default=list(MODES),
+                        help=f"Modes to measure (default all): {', '.join(MODES)}")
+    parser.add_argument('-n', '--runs', type=int, default=7,
+                        help='Runs per mode; the median is reported')
+    parser.add_argument('--top', type=int, default=3,
+                        help='Show the slowest top-level imports of each mode')
+    parser.add_argument('--save', type=str, nargs='?', const=DEFAULT_BASELINE_PATH, default=None,
+                        help='Write the results as the baseline')
+    parser.add_argument('--compare', type=str, nargs='?', const=DEFAULT_BASELINE_PATH, default=None,
+                        help='Compare with a baseline and exit with 1 on a regression')
+    parser.add_argument('--tolerance', type=float, default=1.5,
+                        help='Allowed slowdown factor over the baseline')
+    parser.add_argument('--slack', type=float, default=5.0,
+                        help='Allowed slowdown in ms regardless of the factor (timing noise)')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+    print(f"{'Mode':<22}{'Import (ms)':>12}{'Baseline':>10}  Slowest imports")
+    for mode in args.modes:
+        try:
+            total, modules = measure(MODES[mode], args.runs)
+        except RuntimeError as e:
+            print(f"{mode:<22}{'-':>12}{'':>10}  {e}")
+            continue
+        results[mode] = round(total, 1)
+        slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        reference = baseline.get(mode)
+        print(f"{mode:<22}{total:>12.1f}{reference if reference is not None else '':>10}  "
+              + ', '.join(f"{name} {ms:.1f}" for name, ms in slowest))
+        if reference is not None and total > reference * args.tolerance + args.slack:
+            regressions.append(mode)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+            f.write('\n')
+        print(f"Wrote {args.save}")
+    if regressions:
+        print(f"Import time regressed: {', '.join(regressions)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
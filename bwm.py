@@ -1,16 +1,24 @@
 import os
 import time
-import psutil
 import argparse
 import sys
-import platform
-import curses
-import platform
+
+# Everything else is imported where it is used, so the one-shot mode
+# (--once / --count) starts without psutil, curses or the monitor's features.
 
 class BandwidthMonitor:
-    def __init__(self, threshold=100.0, refresh_rate=5, incremental_threshold=0.1, stdscr=None):
+    def __init__(self, threshold=100.0, refresh_rate=5, incremental_threshold=0.1, stdscr=None,
+                 process_backend=None, namespace_accounting=None, kernel_stats=None,
+                 quota_tracker=None, rule_engine=None, anomaly_detector=None):
         """
         Initialize Bandwidth Monitor with configurable parameters
+        :param process_backend: Optional started NettopBackend for the per-process pane.
+        :param namespace_accounting: Optional NamespaceAccounting for the per-container pane.
+        :param kernel_stats: KernelStats for packet, retransmit and drop rates (created if not given).
+        :param quota_tracker: Optional QuotaTracker for billing-cycle quotas kept across restarts.
+        :param rule_engine: Optional RuleEngine with sliding-window threshold rules per interface.
+        :param anomaly_detector: Optional AnomalyDetector scoring per-interface rates against
+                                 recent and hour-of-week baselines.
         """
         self.total_threshold = threshold
         self.incremental_threshold = incremental_threshold
@@ -29,6 +37,37 @@ class BandwidthMonitor:
         self.lifetime_total_out = 0.0
         self.lifetime_accumulated = 0.0
 
+        # Rate history (MB/s per refresh interval) for the in-terminal graphs
+        from sparkline import History
+        self.in_history = History()
+        self.out_history = History()
+        self.show_graphs = True
+
+        # Packet, protocol, retransmit and drop rates from kernel counters
+        if kernel_stats is None:
+            from snmp_stats import KernelStats
+            kernel_stats = KernelStats()
+        self.kernel_stats = kernel_stats
+        self.kernel_rates = {}
+
+        # Per-process usage pane
+        self.process_backend = process_backend
+        self.show_processes = process_backend is not None
+
+        # Per network namespace (container / pod) usage pane
+        self.namespace_accounting = namespace_accounting
+        self.show_namespaces = namespace_accounting is not None
+
+        # Billing-cycle quotas; unlike the session counters these survive reset() and restarts
+        self.quota_tracker = quota_tracker
+
+        # Sliding-window threshold rules, fed per-NIC counters
+        self.rule_engine = rule_engine
+
+        # Streaming anomaly scores per interface
+        self.anomaly_detector = anomaly_detector
+        self.update_interfaces(time.time())
+
         # Control flags
         self.running = True
 
@@ -37,6 +76,7 @@ class BandwidthMonitor:
         self.start_time = time.time()
         
     def beep(self):
+        import platform
         if platform.system() == "Darwin":
             print("Playing beep using 'osascript'...")
             os.system('osascript -e "beep 1"')
@@ -67,21 +107,11 @@ class BandwidthMonitor:
             return None
         return self.accumulated / elapsed_hours
 
-<<<<<<< HEAD
-=======
-    def beep(self):
-        """Use 'afplay' to play a system sound."""
-        if platform.system() == "Darwin":
-            print("Playing beep using 'afplay'...")
-            os.system('afplay /System/Library/Sounds/Ping.aiff')
-        else:
-            print('beep: Only works on Mac OS')
-        
->>>>>>> 8f691e814d38943389a31263c4924c20328943fc
     def get_bandwidth_usage(self):
         """
         Retrieve current network bandwidth usage in MB
         """
+        import psutil
         net_io = psutil.net_io_counters()
         return (net_io.bytes_recv / (1024 * 1024),
                 net_io.bytes_sent / (1024 * 1024))
@@ -93,6 +123,7 @@ class BandwidthMonitor:
         self.stdscr.nodelay(True)  # Set getch() to be non-blocking
         previous_in, previous_out = self.get_bandwidth_usage()
         last_refresh_time = time.time()
+        self.kernel_stats.refresh(last_refresh_time)
 
         while self.running:
             # Check for keyboard input
@@ -111,6 +142,15 @@ class BandwidthMonitor:
                     self.set_total_threshold()
                 elif key_char == 'i':
                     self.set_incremental_threshold()
+                elif key_char == 'g':
+                    self.show_graphs = not self.show_graphs
+                    self.display_usage()
+                elif key_char == 'p' and self.process_backend is not None:
+                    self.show_processes = not self.show_processes
+                    self.display_usage()
+                elif key_char == 'n' and self.namespace_accounting is not None:
+                    self.show_namespaces = not self.show_namespaces
+                    self.display_usage()
 
             # Check if it's time to refresh the metrics
             current_time = time.time()
@@ -126,6 +166,13 @@ class BandwidthMonitor:
                 # Store incremental usage for display
                 self.in_usage = in_usage
                 self.out_usage = out_usage
+                elapsed = current_time - last_refresh_time
+                self.in_history.append(in_usage / elapsed)
+                self.out_history.append(out_usage / elapsed)
+                self.kernel_stats.refresh(current_time)
+                self.kernel_rates = self.kernel_stats.rates()
+                if self.namespace_accounting is not None:
+                    self.namespace_accounting.refresh(current_time)
 
                 # Check incremental threshold if set
                 if (self.incremental_threshold is not None and
@@ -142,6 +189,14 @@ class BandwidthMonitor:
                 self.lifetime_total_out += out_usage
                 self.lifetime_accumulated += total_interval_usage
 
+                # Update quotas
+                if self.quota_tracker is not None:
+                    for quota, level, used in self.quota_tracker.add(total_interval_usage, current_time):
+                        self.alert_quota(quota, level, used)
+
+                # Evaluate threshold rules and anomaly scores
+                self.update_interfaces(current_time)
+
                 # Check total threshold
                 if self.accumulated >= self.total_threshold:
                     self.threshold_reached_count += 1
@@ -157,6 +212,22 @@ class BandwidthMonitor:
             # Small sleep to prevent CPU overuse
             time.sleep(0.1)
 
+    def update_interfaces(self, now):
+        """
+        Feed one read of the per-NIC counters to the rule engine and the
+        anomaly detector, and alert on what they report.
+        """
+        if self.rule_engine is None and self.anomaly_detector is None:
+            return
+        import psutil
+        counters = psutil.net_io_counters(pernic=True)
+        if self.rule_engine is not None:
+            for rule in self.rule_engine.update(counters, now):
+                self.alert_rule(rule)
+        if self.anomaly_detector is not None:
+            for nic, direction, rate, score in self.anomaly_detector.update(counters, now):
+                self.alert_anomaly(nic, direction, rate, score)
+
     def display_usage(self):
         """
         Display current bandwidth usage statistics
@@ -179,13 +250,23 @@ class BandwidthMonitor:
 
         # Display incremental and accumulated usage
         line += 2
-        self.stdscr.addstr(line, 0, f"Incremental In:        {self.in_usage:.2f} MB")
-        self.stdscr.addstr(line + 1, 0, f"Incremental Out:       {self.out_usage:.2f} MB")
+        in_rate = f"{self.in_history.last(1)[0]:.2f} MB/s" if len(self.in_history) else ""
+        out_rate = f"{self.out_history.last(1)[0]:.2f} MB/s" if len(self.out_history) else ""
+        in_packets = f"{self.kernel_rates['packets_in']:.0f} pkt/s" if self.kernel_rates else ""
+        out_packets = f"{self.kernel_rates['packets_out']:.0f} pkt/s" if self.kernel_rates else ""
+        self.stdscr.addstr(line, 0, f"Incremental In:        {self.in_usage:.2f} MB    {in_rate:>12}  {in_packets:>12}")
+        self.stdscr.addstr(line + 1, 0, f"Incremental Out:       {self.out_usage:.2f} MB    {out_rate:>12}  {out_packets:>12}")
         line += 3
         self.stdscr.addstr(line, 0, f"Accumulated In:        {self.total_in:.2f} MB ({self.total_in / 1024:.2f} GB)")
         self.stdscr.addstr(line + 1, 0, f"Accumulated Out:       {self.total_out:.2f} MB ({self.total_out / 1024:.2f} GB)")
         self.stdscr.addstr(line + 2, 0, f"Total Accumulated:     {self.accumulated:.2f} MB ({self.accumulated / 1024:.2f} GB)")
         
+        # Retransmit, drop and error rates and the protocol breakdown
+        from snmp_stats import format_rates
+        for row, text in enumerate(format_rates(self.kernel_rates)):
+            if line + 3 + row < max_rows:
+                self.stdscr.addstr(line + 3 + row, 0, text[:max_cols - 1])
+
         # Display lifetime usage if there is enough space
         line += 6
         if line + 3 < max_rows:
@@ -198,26 +279,149 @@ class BandwidthMonitor:
         # Display threshold and instructions if there is enough space
         if line + 2 < max_rows:
             self.stdscr.addstr(line, 0, f"Threshold Reached: {self.threshold_reached_count}")
+            highest = self.anomaly_detector.highest() if self.anomaly_detector is not None else None
+            if highest is not None:
+                nic, direction, rate, score = highest
+                self.stdscr.addstr(line + 1, 0, f"Anomaly Score: {score:.1f} ({nic} {direction}, {rate / 1024:.1f} KB/s)")
             self.stdscr.addstr(line + 2, 0, "Press 'H' for Help")
+        line += 4
+
+        if self.quota_tracker is not None:
+            line = self.display_quotas(line, max_rows, max_cols)
+        if self.rule_engine is not None:
+            line = self.display_rules(line, max_rows, max_cols)
+        if self.show_graphs:
+            line = self.display_graphs(line, max_rows, max_cols)
+        if self.show_namespaces:
+            line = self.display_namespaces(line, max_rows, max_cols)
+        if self.show_processes:
+            self.display_processes(line, max_rows, max_cols)
 
         # Refresh the screen
         self.stdscr.refresh()
 
+    def display_quotas(self, line, max_rows, max_cols):
+        """
+        Draw the usage of every quota window, as far as the screen has room.
+        """
+        from quota import format_status
+        rows = self.quota_tracker.status()
+        if not rows or line + len(rows) >= max_rows:
+            return line
+        self.stdscr.addstr(line, 0, "Quotas:")
+        for row, status in enumerate(rows):
+            self.stdscr.addstr(line + 1 + row, 0, format_status(status)[:max_cols - 1])
+        return line + len(rows) + 2
+
+    def display_rules(self, line, max_rows, max_cols, limit=5):
+        """
+        Draw the number of active threshold rules and the first few of them.
+        """
+        if line >= max_rows:
+            return line
+        from threshold_rules import describe
+        active = self.rule_engine.active()
+        self.stdscr.addstr(line, 0, f"Rules: {len(active)} of {len(self.rule_engine.rules)} active")
+        shown = active[:max(0, min(limit, max_rows - line - 2))]
+        for row, rule in enumerate(shown):
+            self.stdscr.addstr(line + 1 + row, 2, describe(rule)[:max_cols - 3])
+        return line + len(shown) + 2
+
+    def display_graphs(self, line, max_rows, max_cols):
+        """
+        Draw in/out rate sparklines, a braille chart of the total rate and a
+        histogram of the total rate from the fixed-size history, as far as
+        the screen has room.
+        """
+        from sparkline import braille, histogram, sparkline
+        width = max_cols - 30
+        if width < 10 or len(self.in_history) == 0:
+            return line
+        in_rates = self.in_history.last(width)
+        out_rates = self.out_history.last(width)
+        peak = max(max(in_rates), max(out_rates))
+
+        if line + 1 < max_rows:
+            self.stdscr.addstr(line, 0, f"In  {in_rates[-1]:8.2f} MB/s  {sparkline(in_rates, maximum=peak)}")
+            self.stdscr.addstr(line + 1, 0, f"Out {out_rates[-1]:8.2f} MB/s  {sparkline(out_rates, maximum=peak)}")
+            line += 3
+
+        totals = [i + o for i, o in zip(in_rates, out_rates)]
+        if line + 3 < max_rows:
+            self.stdscr.addstr(line, 0, f"Total rate (peak {max(totals):.2f} MB/s):")
+            for row, text in enumerate(braille(totals, width // 2, 3)):
+                self.stdscr.addstr(line + 1 + row, 4, text)
+            line += 5
+
+        bins = histogram(totals, bins=5, width=width - 10)
+        if bins and line + len(bins) < max_rows:
+            self.stdscr.addstr(line, 0, "Total rate histogram (MB/s):")
+            for row, (low, high, count, bar) in enumerate(bins):
+                self.stdscr.addstr(line + 1 + row, 0, f"{low:8.2f}-{high:<8.2f} {count:>4} {bar}"[:max_cols - 1])
+            line += len(bins) + 2
+        return line
+
+    def display_namespaces(self, line, max_rows, max_cols, limit=10):
+        """
+        Draw the busiest network namespaces (host, containers, pods), as far
+        as the screen has room.
+        """
+        rows = min(limit, max_rows - line - 2)
+        if rows < 1:
+            return line
+        header = f"{'Namespace':<12}{'Container / Pod':<30}{'In (KB/s)':>11}{'Out (KB/s)':>11}{'In (MB)':>10}{'Out (MB)':>10}"
+        self.stdscr.addstr(line, 0, header[:max_cols - 1])
+        usage = self.namespace_accounting.usage()
+        for row, namespace in enumerate(usage[:rows]):
+            text = (f"{namespace['netns']:<12}{namespace['label'][:29]:<30}{namespace['recv_rate'] / 1024:>11.1f}"
+                    f"{namespace['sent_rate'] / 1024:>11.1f}{namespace['bytes_recv'] / 1048576:>10.2f}"
+                    f"{namespace['bytes_sent'] / 1048576:>10.2f}")
+            self.stdscr.addstr(line + 1 + row, 0, text[:max_cols - 1])
+        return line + min(rows, len(usage)) + 2
+
+    def display_processes(self, line, max_rows, max_cols):
+        """
+        Draw the busiest processes reported by the nettop backend, as far as
+        the screen has room.
+        """
+        rows = max_rows - line - 2
+        if rows < 1:
+            return
+        header = f"{'PID':<9}{'Process':<30}{'In (MB)':>10}{'Out (MB)':>10}{'Total In':>12}{'Total Out':>12}"
+        self.stdscr.addstr(line, 0, header[:max_cols - 1])
+        for row, (pid, name, delta_in, delta_out, total_in, total_out) in enumerate(self.process_backend.top(rows)):
+            text = (f"{pid:<9}{name[:29]:<30}{delta_in / 1048576:>10.2f}{delta_out / 1048576:>10.2f}"
+                    f"{total_in / 1048576:>12.2f}{total_out / 1048576:>12.2f}")
+            self.stdscr.addstr(line + 1 + row, 0, text[:max_cols - 1])
+        if self.process_backend.last_error:
+            self.stdscr.addstr(max_rows - 1, 0, self.process_backend.last_error[:max_cols - 1])
+
     def alert_total_threshold(self):
         self.stdscr.addstr(9, 0, f"CAUTION: High consumption! Threshold {self.total_threshold} MB reached.")
         self.stdscr.refresh()
-<<<<<<< HEAD
         self.beep()
-=======
-        # Beep sound
-        self.beep()   # My own beep
->>>>>>> 8f691e814d38943389a31263c4924c20328943fc
 
     def alert_incremental_threshold(self, current_usage):
         self.stdscr.addstr(10, 0, f"WARNING: Interval usage {current_usage:.2f} MB exceeds {self.incremental_threshold} MB limit.")
         self.stdscr.refresh()
         self.beep()
 
+    def alert_quota(self, quota, level, used):
+        self.stdscr.addstr(11, 0, f"QUOTA: {quota.name} at {level:.0f}% ({used:.1f} of {quota.limit:.0f} MB, {quota.period}).")
+        self.stdscr.refresh()
+        self.beep()
+
+    def alert_anomaly(self, nic, direction, rate, score):
+        self.stdscr.addstr(11, 0, f"ANOMALY: {nic} {direction} at {rate / 1024:.1f} KB/s is unusual for this hour (score {score:.1f}).")
+        self.stdscr.refresh()
+        self.beep()
+
+    def alert_rule(self, rule):
+        from threshold_rules import describe
+        self.stdscr.addstr(11, 0, f"RULE: {describe(rule)}"[:self.stdscr.getmaxyx()[1] - 1])
+        self.stdscr.refresh()
+        self.beep()
+
     def reset(self):
         previous_total = self.accumulated
         previous_threshold_count = self.threshold_reached_count
@@ -244,6 +448,7 @@ class BandwidthMonitor:
         avg_per_minute = self.get_avg_usage_minute()
         avg_per_hour = self.get_avg_usage_hour()
 
+        import curses
         curses.endwin()
         os.system("clear")
 
@@ -265,11 +470,18 @@ class BandwidthMonitor:
         else:
             print("Average Usage per Hour: N/A")
         print(f"Threshold Reached: {self.threshold_reached_count}")
+        if self.quota_tracker is not None:
+            from quota import format_status
+            self.quota_tracker.save()
+            print("\nQuotas")
+            for status in self.quota_tracker.status():
+                print(format_status(status))
         print("\nGoodbye!")
 
         sys.exit(0)
 
     def set_refresh_rate(self):
+        import curses
         curses.echo()
         self.stdscr.addstr(10, 0, "Enter new refresh rate (in seconds): ")
         self.stdscr.clrtoeol()
@@ -287,6 +499,7 @@ class BandwidthMonitor:
         time.sleep(2)
 
     def set_total_threshold(self):
+        import curses
         curses.echo()
         self.stdscr.addstr(10, 0, "Enter new total threshold (in MB): ")
         self.stdscr.clrtoeol()
@@ -304,6 +517,7 @@ class BandwidthMonitor:
         time.sleep(2)
 
     def set_incremental_threshold(self):
+        import curses
         curses.echo()
         self.stdscr.addstr(10, 0, "Enter new incremental threshold (in MB): ")
         self.stdscr.clrtoeol()
@@ -328,10 +542,95 @@ class BandwidthMonitor:
         self.stdscr.addstr(17, 0, "U/u  : Set new refresh rate")
         self.stdscr.addstr(18, 0, "T/t  : Set new total threshold")
         self.stdscr.addstr(19, 0, "I/i  : Set new incremental threshold")
-        self.stdscr.addstr(20, 0, "H/h  : Show this help menu")
+        self.stdscr.addstr(20, 0, "G/g  : Toggle graphs")
+        self.stdscr.addstr(21, 0, "P/p  : Toggle per-process pane (with -p)")
+        self.stdscr.addstr(22, 0, "N/n  : Toggle per-container pane (with -N)")
+        self.stdscr.addstr(23, 0, "H/h  : Show this help menu")
         self.stdscr.refresh()
         time.sleep(5)
 
+# Columns of the one-shot output; rates are bytes per second over the interval
+READING_FIELDS = ('time', 'interface', 'bytes_recv', 'bytes_sent', 'packets_recv', 'packets_sent',
+                  'errors', 'drops', 'recv_rate', 'sent_rate')
+
+def read_counters(per_nic=False):
+    """
+    Cumulative counters as {interface: NetDevCounters}, read from /proc/net/dev
+    where it exists (no psutil import) and from psutil otherwise. Unless
+    per_nic, a single 'all' entry sums every interface except loopback.
+    """
+    from netns import NetDevCounters, read_net_dev_interfaces
+    if os.path.exists('/proc/net/dev'):
+        interfaces = read_net_dev_interfaces('/proc/net/dev')
+    else:
+        import psutil
+        interfaces = {nic: NetDevCounters(c.bytes_recv, c.packets_recv, c.errin, c.dropin,
+                                          c.bytes_sent, c.packets_sent, c.errout, c.dropout)
+                      for nic, c in psutil.net_io_counters(pernic=True).items()}
+    if per_nic:
+        return interfaces
+    totals = [0] * len(NetDevCounters._fields)
+    for nic, counters in interfaces.items():
+        if not nic.startswith('lo'):
+            for i, value in enumerate(counters):
+                totals[i] += value
+    return {'all': NetDevCounters(*totals)}
+
+def readings(current, previous, now, elapsed):
+    """
+    Build one output row per interface; rates are None without a previous reading.
+    """
+    rows = []
+    for nic, counters in current.items():
+        last = previous.get(nic) if previous else None
+        rows.append({
+            'time': round(now, 3),
+            'interface': nic,
+            'bytes_recv': counters.bytes_recv,
+            'bytes_sent': counters.bytes_sent,
+            'packets_recv': counters.packets_recv,
+            'packets_sent': counters.packets_sent,
+            'errors': counters.errin + counters.errout,
+            'drops': counters.dropin + counters.dropout,
+            'recv_rate': round(max(0, counters.bytes_recv - last.bytes_recv) / elapsed, 1) if last else None,
+            'sent_rate': round(max(0, counters.bytes_sent - last.bytes_sent) / elapsed, 1) if last else None,
+        })
+    return rows
+
+def run_once(args):
+    """
+    Print count readings, one per interval, as JSON lines or CSV, and exit.
+    With an interval of 0 a single reading of the cumulative counters is
+    printed without rates.
+    """
+    if args.format == 'csv':
+        import csv
+        writer = csv.DictWriter(sys.stdout, fieldnames=READING_FIELDS)
+        writer.writeheader()
+        emit = writer.writerows
+    else:
+        import json
+        def emit(rows):
+            for row in rows:
+                sys.stdout.write(json.dumps(row) + "\n")
+
+    count = 1 if args.once else args.count
+    previous, previous_time = read_counters(args.per_nic), time.time()
+    try:
+        if args.interval <= 0:
+            emit(readings(previous, None, previous_time, 0))
+            return
+        taken = 0
+        while count is None or taken < count:
+            time.sleep(max(0.0, previous_time + args.interval - time.time()))
+            current, now = read_counters(args.per_nic), time.time()
+            emit(readings(current, previous, now, now - previous_time))
+            sys.stdout.flush()
+            previous, previous_time = current, now
+            taken += 1
+    except (KeyboardInterrupt, BrokenPipeError):
+        pass
+
 def parse_arguments():
     parser = argparse.ArgumentParser(description='Bandwidth Monitoring Tool')
     parser.add_argument('-t', '--threshold', type=float, default=100.0,
@@ -340,11 +639,76 @@ def parse_arguments():
                         help='Refresh rate in seconds')
     parser.add_argument('-i', '--incremental', type=float,
                         help='Per-interval bandwidth threshold')
+    parser.add_argument('-p', '--processes', action='store_true',
+                        help='Show per-process usage from a persistent nettop (macOS)')
+    parser.add_argument('--nettop-command', type=str, default=None,
+                        help='Run this command instead of nettop for the per-process pane')
+    parser.add_argument('-Q', '--quotas', type=str, nargs='?', const='', default=None,
+                        help='Track the quotas defined in this file (default quotas.conf)')
+    parser.add_argument('--quota-state', type=str, default=None,
+                        help='File keeping quota usage across restarts (default quota_state.json)')
+    parser.add_argument('-R', '--rules', type=str, nargs='?', const='', default=None,
+                        help='Evaluate the threshold rules in this file (default threshold_rules.conf)')
+    parser.add_argument('-A', '--anomaly', type=float, nargs='?', const=4.0, default=None,
+                        help='Alert on unusual per-interface rates at this score (default 4)')
+    parser.add_argument('--anomaly-state', type=str, default=None,
+                        help='File keeping the anomaly baselines across restarts (default anomaly_state.json)')
+    parser.add_argument('-N', '--namespaces', action='store_true',
+                        help='Show usage per network namespace, i.e. per container or pod (Linux)')
+
+    scripting = parser.add_argument_group('one-shot mode', 'Print readings to stdout and exit, without the UI')
+    scripting.add_argument('--once', action='store_true',
+                           help='Print a single reading')
+    scripting.add_argument('--count', type=int, default=None,
+                           help='Print this many readings, one per interval')
+    scripting.add_argument('--interval', type=float, default=1.0,
+                           help='Seconds per reading; 0 prints the cumulative counters without rates')
+    scripting.add_argument('--format', choices=('json', 'csv'), default='json',
+                           help='JSON lines or CSV with a header')
+    scripting.add_argument('--per-nic', action='store_true',
+                           help='One row per interface instead of a total over all but loopback')
     return parser.parse_args()
 
 def main():
     args = parse_arguments()
-
+    if args.once or args.count is not None:
+        run_once(args)
+        return
+
+    import curses
+    import locale
+
+    process_backend = None
+    if args.processes:
+        from nettop_backend import NettopBackend
+        process_backend = NettopBackend(interval=args.refresh, command=args.nettop_command)
+        process_backend.start()
+
+    namespace_accounting = None
+    if args.namespaces:
+        from netns import NamespaceAccounting
+        namespace_accounting = NamespaceAccounting()
+        namespace_accounting.refresh()
+
+    quota_tracker = None
+    if args.quotas is not None:
+        from quota import DEFAULT_QUOTAS_PATH, DEFAULT_STATE_PATH, QuotaTracker, load_quotas
+        quota_tracker = QuotaTracker(load_quotas(args.quotas or DEFAULT_QUOTAS_PATH),
+                                     args.quota_state or DEFAULT_STATE_PATH)
+
+    rule_engine = None
+    if args.rules is not None:
+        from threshold_rules import DEFAULT_RULES_PATH, RuleEngine, load_rules
+        rule_engine = RuleEngine(load_rules(args.rules or DEFAULT_RULES_PATH))
+
+    anomaly_detector = None
+    if args.anomaly is not None:
+        from anomaly import DEFAULT_STATE_PATH as DEFAULT_ANOMALY_STATE_PATH, AnomalyDetector
+        args.anomaly_state = args.anomaly_state or DEFAULT_ANOMALY_STATE_PATH
+        anomaly_detector = AnomalyDetector(threshold=args.anomaly)
+        anomaly_detector.load(args.anomaly_state)
+
+    locale.setlocale(locale.LC_ALL, '')  # Unicode block and braille characters in the graphs
     stdscr = curses.initscr()
     curses.noecho()
     curses.cbreak()
@@ -355,13 +719,24 @@ def main():
             threshold=args.threshold,
             refresh_rate=args.refresh,
             incremental_threshold=10.0,
-            stdscr=stdscr
+            stdscr=stdscr,
+            process_backend=process_backend,
+            namespace_accounting=namespace_accounting,
+            quota_tracker=quota_tracker,
+            rule_engine=rule_engine,
+            anomaly_detector=anomaly_detector
         )
         monitor.run()
     except KeyboardInterrupt:
         print("\nInterrupted! Exiting...")
         monitor.quit()
     finally:
+        if process_backend is not None:
+            process_backend.stop()
+        if quota_tracker is not None:
+            quota_tracker.save()
+        if anomaly_detector is not None:
+            anomaly_detector.save(args.anomaly_state)
         curses.nocbreak()
         stdscr.keypad(False)
         curses.echo()
@@ -1,34 +1,45 @@
 # -*- mode: python ; coding: utf-8 -*-
 
+# bwm.py needs only the standard library, psutil and its own small modules.
+# Keep the rest of requirements.txt (capture, plotting, notebook and LLM
+# packages) out of the bundle; they are found through the other tools'
+# imports and would otherwise be frozen too.
+EXCLUDES = [
+    'pyshark', 'scapy', 'matplotlib', 'tabulate', 'numpy', 'pandas', 'PIL', 'cryptography',
+    'tkinter', '_tkinter', 'IPython', 'ipykernel', 'jupyter_client', 'jupyter_core', 'jedi',
+    'langchain', 'langchain_core', 'langchain_ollama', 'langsmith', 'altair', 'jsonschema',
+    'aiohttp', 'httpx', 'lxml', 'bs4', 'html5lib', 'git', 'streamlit', 'pydeck', 'pyarrow',
+    'traffic_categorizer', 'parallel_categorizer', 'process_usage', 'pcap_analyzer',
+    'usage_grapher', 'report', 'flow_table', 'unittest', 'pydoc', 'doctest',
+]
 
 a = Analysis(
     ['bwm.py'],
     pathex=[],
     binaries=[],
-    datas=[],
+    datas=[('quotas.conf', '.'), ('threshold_rules.conf', '.')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=EXCLUDES,
     noarchive=False,
     optimize=0,
 )
 pyz = PYZ(a.pure)
 
+# One-folder build: a one-file executable unpacks itself to a temporary
+# directory on every launch, which costs seconds; UPX adds decompression.
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
     [],
+    exclude_binaries=True,
     name='bwm',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
+    upx=False,
     console=False,
     disable_windowed_traceback=False,
     argv_emulation=False,
@@ -36,8 +47,16 @@ exe = EXE(
     codesign_identity=None,
     entitlements_file=None,
 )
-app = BUNDLE(
+coll = COLLECT(
     exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    name='bwm',
+)
+app = BUNDLE(
+    coll,
     name='bwm.app',
     icon=None,
     bundle_identifier=None,
@@ -0,0 +1,166 @@
+import os
+from collections import deque
+from prefix_trie import PrefixTrie
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'category_rules.conf')
+
+RULE_TYPES = ('domain', 'suffix', 'keyword', 'port', 'cidr')
+PROTOCOLS = {'tcp': 6, 'udp': 17}
+
+
+class AhoCorasick:
+    def __init__(self, patterns):
+        """
+        Multi-pattern substring matcher. Matching costs O(len(text)) however
+        many patterns there are.
+        :param patterns: Iterable of (pattern, value); on overlapping matches the
+                         value of the earliest pattern wins.
+        """
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [None]  # (priority, value) of the best pattern ending here
+
+        for priority, (pattern, value) in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(None)
+                state = next_state
+            if self._output[state] is None or self._output[state][0] > priority:
+                self._output[state] = (priority, value)
+
+        # Breadth-first pass for failure links; outputs inherit along them
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                inherited = self._output[self._fail[next_state]]
+                if inherited is not None and (self._output[next_state] is None or
+                                              inherited[0] < self._output[next_state][0]):
+                    self._output[next_state] = inherited
+
+    def search(self, text):
+        """
+        Return the value of the highest priority pattern found in text, or None.
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        best = None
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            found = output[state]
+            if found is not None and (best is None or found[0] < best[0]):
+                best = found
+        return best[1] if best else None
+
+
+class SuffixTrie:
+    def __init__(self):
+        """
+        Trie over reversed domain labels; lookups return the value of the
+        longest registered domain that the hostname equals or is a subdomain of.
+        """
+        self._root = {}
+
+    def add(self, domain, value, exact=False):
+        node = self._root
+        for label in reversed(domain.strip('.').split('.')):
+            node = node.setdefault(label, {})
+        node['\0=' if exact else '\0'] = value
+
+    def lookup(self, hostname):
+        node = self._root
+        best = None
+        labels = hostname.rstrip('.').split('.')
+        for depth, label in enumerate(reversed(labels), 1):
+            node = node.get(label)
+            if node is None:
+                break
+            if depth == len(labels) and '\0=' in node:
+                return node['\0=']
+            if '\0' in node:
+                best = node['\0']
+        return best
+
+
+class CategoryRules:
+    def __init__(self, rules):
+        """
+        Compile category rules once into matchers whose cost does not grow with
+        the number of rules.
+        :param rules: Iterable of (rule_type, pattern, category) in priority order.
+        """
+        self.categories = []
+        self._domains = SuffixTrie()
+        self._ports = {}
+        self._networks = PrefixTrie()
+        keywords = []
+
+        for rule_type, pattern, category in rules:
+            if category not in self.categories:
+                self.categories.append(category)
+            pattern = pattern.lower()
+            if rule_type == 'domain':
+                self._domains.add(pattern, category, exact=True)
+            elif rule_type == 'suffix':
+                self._domains.add(pattern, category)
+            elif rule_type == 'keyword':
+                keywords.append((pattern, category))
+            elif rule_type == 'port':
+                proto, _, port = pattern.rpartition('/')
+                protos = [PROTOCOLS[proto]] if proto else list(PROTOCOLS.values())
+                for number in protos:
+                    self._ports.setdefault((number, int(port)), category)
+            elif rule_type == 'cidr':
+                self._networks.insert(pattern, category)
+            else:
+                raise ValueError(f"Unknown rule type '{rule_type}', expected one of {RULE_TYPES}")
+
+        self._keywords = AhoCorasick(keywords)
+
+    @classmethod
+    def load(cls, path=DEFAULT_RULES_PATH):
+        """
+        Read a rules file: one 'type pattern category' rule per line, '#' comments.
+        """
+        rules = []
+        with open(path) as f:
+            for number, line in enumerate(f, 1):
+                line = line.split('#', 1)[0].strip()
+                if not line:
+                    continue
+                fields = line.split()
+                if len(fields) != 3 or fields[0] not in RULE_TYPES:
+                    raise ValueError(f"{path}:{number}: expected '<{'|'.join(RULE_TYPES)}> <pattern> <category>'")
+                rules.append(tuple(fields))
+        return cls(rules)
+
+    def match_hostname(self, hostname):
+        """
+        Categorize a hostname: domain and suffix rules first (most specific
+        wins), then keyword rules (earliest in the file wins).
+        """
+        hostname = hostname.lower()
+        return self._domains.lookup(hostname) or self._keywords.search(hostname)
+
+    def match_port(self, proto, port):
+        return self._ports.get((proto, port))
+
+    def match_address(self, address):
+        """
+        Return the category of the most specific CIDR rule containing address.
+        """
+        return self._networks.lookup(address)
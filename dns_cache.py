@@ -0,0 +1,67 @@
+from collections import OrderedDict
+from hostname_classifier import DNS_A, DNS_AAAA, parse_dns
+
+
+class DnsCache:
+    def __init__(self, max_entries=65536, min_ttl=30, max_ttl=86400):
+        """
+        IP -> hostname mappings learned passively from DNS responses.
+
+        Entries expire with the record TTL (clamped to [min_ttl, max_ttl] so a
+        connection opened right after a short-TTL answer still resolves), and
+        the least recently used entry is evicted once max_entries is reached.
+        """
+        self.max_entries = max_entries
+        self.min_ttl = min_ttl
+        self.max_ttl = max_ttl
+        self._entries = OrderedDict()  # ip -> (hostname, expires)
+        self.learned = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, ip, hostname, ttl, now):
+        ttl = min(max(ttl, self.min_ttl), self.max_ttl)
+        entries = self._entries
+        if ip in entries:
+            entries.move_to_end(ip)
+        elif len(entries) >= self.max_entries:
+            entries.popitem(last=False)
+        entries[ip] = (hostname, now + ttl)
+        self.learned += 1
+
+    def learn(self, message, now):
+        """
+        Record the A/AAAA answers of a DNS response under the queried name.
+        :param message: DnsMessage from hostname_classifier.parse_dns.
+        """
+        if not message.is_response:
+            return
+        for record in message.answers:
+            if record.rtype in (DNS_A, DNS_AAAA) and record.data:
+                self.add(record.data, message.qname, record.ttl, now)
+
+    def learn_payload(self, payload, now):
+        """
+        Parse a DNS payload and learn from it if it is a response.
+        """
+        message = parse_dns(payload)
+        if message is not None:
+            self.learn(message, now)
+        return message
+
+    def lookup(self, ip, now):
+        """
+        Return the hostname last resolved to ip, or None if unknown or expired.
+        """
+        entry = self._entries.get(ip)
+        if entry is None:
+            return None
+        if entry[1] < now:
+            del self._entries[ip]
+            return None
+        self._entries.move_to_end(ip)
+        return entry[0]
+
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,114 @@
+"""
+Downsampling of long time series before plotting.
+
+A line plot can only show about one point per horizontal pixel, so series far
+longer than the axes are reduced to a few points per pixel first:
+
+- lttb: Largest-Triangle-Three-Buckets keeps, per bucket, the point forming the
+  largest triangle with the point kept in the previous bucket and the average of
+  the next one, which preserves the visual shape including isolated spikes.
+- minmax: keeps the minimum and maximum of every bucket, so the envelope of the
+  series (every spike and dip) is preserved exactly.
+"""
+import numpy as np
+
+METHODS = ('lttb', 'minmax')
+
+
+def lttb(x, y, threshold):
+    """
+    Reduce (x, y) to threshold points with Largest-Triangle-Three-Buckets.
+    x must be sorted. The first and last points are always kept.
+    :return: (x, y) arrays of at most threshold points.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    # threshold - 2 buckets over the inner points; each holds at least one point
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+
+    # Average of every bucket from prefix sums; the last bucket looks ahead to the last point
+    sum_x = np.concatenate(([0.0], np.cumsum(x)))
+    sum_y = np.concatenate(([0.0], np.cumsum(y)))
+    counts = ends - starts
+    avg_x = np.append((sum_x[ends] - sum_x[starts]) / counts, x[-1])[1:]
+    avg_y = np.append((sum_y[ends] - sum_y[starts]) / counts, y[-1])[1:]
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+        ax, ay = x[a], y[a]
+        # Twice the triangle area, for every candidate of the bucket at once
+        area = np.abs((ax - avg_x[i]) * (y[start:end] - ay) - (ax - x[start:end]) * (avg_y[i] - ay))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return x[selected], y[selected]
+
+
+def min_max(x, y, buckets):
+    """
+    Reduce (x, y) to the minimum and maximum of each of buckets equal-width
+    index buckets, in time order (at most 2 * buckets points).
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if buckets < 1 or 2 * buckets >= n:
+        return x, y
+
+    width = -(-n // buckets)
+    rows = -(-n // width)
+    padded = np.full(rows * width, np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(rows, width)
+    offsets = np.arange(rows) * width
+    lows = np.nanargmin(blocks, axis=1) + offsets
+    highs = np.nanargmax(blocks, axis=1) + offsets
+    selected = np.unique(np.concatenate((lows, highs)))
+    return x[selected], y[selected]
+
+
+def downsample(x, y, points, method='lttb'):
+    """
+    Reduce (x, y) to about points points with the given method.
+    """
+    if method == 'lttb':
+        return lttb(x, y, points)
+    if method == 'minmax':
+        return min_max(x, y, points // 2)
+    raise ValueError(f"Unknown downsampling method '{method}', expected one of {METHODS}")
+
+
+def visible_range(x, lo, hi):
+    """
+    Return the slice of sorted x covering [lo, hi], plus one point on each side
+    so lines still reach the edges of the axes.
+    """
+    start = max(0, int(np.searchsorted(x, lo, side='left')) - 1)
+    end = min(len(x), int(np.searchsorted(x, hi, side='right')) + 1)
+    return slice(start, end)
+
+
+if __name__ == "__main__":
+    import time
+
+    # A week of 1 s samples with a few one-sample spikes
+    rng = np.random.default_rng(1)
+    n = 7 * 24 * 3600
+    x = np.arange(n, dtype=np.float64)
+    y = np.abs(rng.normal(0.5, 0.1, n))
+    spikes = rng.choice(n, 20, replace=False)
+    y[spikes] = 50.0
+    for method in METHODS:
+        start = time.perf_counter()
+        dx, dy = downsample(x, y, 4000, method)
+        elapsed = time.perf_counter() - start
+        kept = np.isin(spikes, dx.astype(np.int64)).sum()
+        print(f"{method:<7} {n} -> {len(dx)} points in {elapsed * 1000:.1f} ms, "
+              f"{kept}/{len(spikes)} spikes kept")
@@ -0,0 +1,68 @@
+import argparse
+import sys
+import time
+
+
+def read_samples(path):
+    """
+    Split recorded 'nettop -P -L' output into samples, each starting with its header line.
+    """
+    samples = []
+    with open(path) as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if not line:
+                continue
+            if line.startswith('time,') or not samples:
+                samples.append([])
+            samples[-1].append(line)
+    return samples
+
+
+def replay(samples, interval, loop):
+    """
+    Write the samples to stdout one per interval, like a live nettop. When
+    looping, counts keep growing from where the recording ended so they stay
+    cumulative.
+    """
+    offsets = {}
+    last = {}
+    while True:
+        for sample in samples:
+            for line in sample:
+                fields = line.split(',')
+                if len(fields) >= 4 and fields[1] and fields[2].isdigit() and fields[3].isdigit():
+                    base_in, base_out = offsets.get(fields[1], (0, 0))
+                    counts = (int(fields[2]) + base_in, int(fields[3]) + base_out)
+                    last[fields[1]] = counts
+                    fields[2], fields[3] = str(counts[0]), str(counts[1])
+                    line = ','.join(fields)
+                sys.stdout.write(line + '\n')
+            sys.stdout.flush()
+            time.sleep(interval)
+        if not loop:
+            break
+        offsets = dict(last)
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Stand-in for nettop that replays recorded output')
+    parser.add_argument('recording', type=str,
+                        help="Output of 'nettop -P -L <n> -x -J bytes_in,bytes_out'")
+    parser.add_argument('-s', '--interval', type=float, default=1.0,
+                        help='Seconds between samples')
+    parser.add_argument('--loop', action='store_true',
+                        help='Replay the recording forever')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    try:
+        replay(read_samples(args.recording), args.interval, args.loop)
+    except (KeyboardInterrupt, BrokenPipeError):
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+from collections import OrderedDict
+
+
+def flow_key(info):
+    """
+    Direction-independent 5-tuple of a decoded frame, so both directions of a
+    connection share one entry.
+    """
+    a = (info.src, info.sport)
+    b = (info.dst, info.dport)
+    return (info.proto, a, b) if a <= b else (info.proto, b, a)
+
+
+class FlowVerdictCache:
+    def __init__(self, max_flows=65536, idle_timeout=120.0, inspect_packets=8):
+        """
+        Map flows to their category verdict so each connection is classified once.
+
+        Entries are kept in least-recently-seen order: idle flows are expired
+        from the front and the cache never grows past max_flows.
+
+        :param max_flows: Maximum number of flows kept.
+        :param idle_timeout: Seconds without packets after which a flow is dropped.
+        :param inspect_packets: Packets inspected before an undecided flow
+                                settles on the default category.
+        """
+        self.max_flows = max_flows
+        self.idle_timeout = idle_timeout
+        self.inspect_packets = inspect_packets
+        self._flows = OrderedDict()  # key -> [verdict, last_seen, inspected, bytes]
+        self._next_expiry = 0.0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._flows)
+
+    def lookup(self, key, length, now):
+        """
+        Return the verdict of a decided flow and count the packet, or None if
+        the flow still has to be inspected.
+        """
+        if now >= self._next_expiry:
+            self.expire(now)
+        entry = self._flows.get(key)
+        if entry is None or entry[0] is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry[1] = now
+        entry[3] += length
+        self._flows.move_to_end(key)
+        return entry[0]
+
+    def record(self, key, category, length, now, default='text'):
+        """
+        Record the result of inspecting one packet of a flow.
+        :param category: Category found in this packet, or None.
+        :return: The flow's verdict once decided, otherwise None.
+        """
+        entry = self._flows.get(key)
+        if entry is None:
+            if len(self._flows) >= self.max_flows:
+                self._flows.popitem(last=False)
+            entry = self._flows[key] = [None, now, 0, 0]
+        else:
+            self._flows.move_to_end(key)
+        entry[1] = now
+        entry[2] += 1
+        entry[3] += length
+        if category is not None:
+            entry[0] = category
+        elif entry[2] >= self.inspect_packets:
+            entry[0] = default
+        return entry[0]
+
+    def expire(self, now):
+        """
+        Drop flows idle for longer than idle_timeout; oldest entries come first.
+        """
+        cutoff = now - self.idle_timeout
+        flows = self._flows
+        while flows:
+            key, entry = next(iter(flows.items()))
+            if entry[1] >= cutoff:
+                break
+            del flows[key]
+        self._next_expiry = now + 1.0
+
+    def clear(self):
+        self._flows.clear()
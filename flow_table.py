@@ -0,0 +1,342 @@
+import argparse
+import curses
+import sys
+import threading
+import time
+import numpy as np
+from net_utils import local_addresses, format_endpoint
+from ranking import WINDOWS
+
+PROTO_NAMES = {6: 'TCP', 17: 'UDP', 1: 'ICMP', 58: 'ICMPv6'}
+
+
+class FlowTable:
+    def __init__(self, max_flows=200000, idle_timeout=60.0, windows=WINDOWS, bucket_seconds=1.0):
+        """
+        Per-flow byte counters keyed by 5-tuple, with iftop-style sliding-window rates.
+
+        All per-flow state lives in preallocated NumPy arrays indexed by slot, so
+        memory is fixed by max_flows. Packets only touch two dicts; the arrays are
+        updated in one vectorized flush per bucket or query.
+
+        :param max_flows: Hard cap on tracked flows; the least recently seen are evicted.
+        :param idle_timeout: Seconds without traffic after which a flow expires.
+        :param windows: Averaging windows in seconds.
+        :param bucket_seconds: Width of one ring-buffer bucket in seconds.
+        """
+        self.max_flows = max_flows
+        self.idle_timeout = idle_timeout
+        self.windows = tuple(windows)
+        self.bucket_seconds = bucket_seconds
+        self._spans = [max(1, int(round(w / bucket_seconds))) for w in self.windows]
+        self._ring_size = max(self._spans)
+
+        self._ring = np.zeros((max_flows, self._ring_size), dtype=np.uint32)
+        self._window_sums = np.zeros((len(self.windows), max_flows), dtype=np.uint64)
+        self._sent = np.zeros(max_flows, dtype=np.uint64)
+        self._received = np.zeros(max_flows, dtype=np.uint64)
+        self._last_seen = np.zeros(max_flows, dtype=np.float64)
+        self._used = np.zeros(max_flows, dtype=bool)
+
+        self._slots = {}
+        self._keys = [None] * max_flows
+        self._free = list(range(max_flows - 1, -1, -1))
+        self._pending_sent = {}
+        self._pending_received = {}
+        self._bucket = None
+        self._lock = threading.Lock()
+        self.evicted = 0
+        self.expired = 0
+
+    def __len__(self):
+        return len(self._slots)
+
+    def _allocate(self, key, now):
+        if not self._free:
+            self._flush()  # pending bytes refresh last_seen, so active flows are not expired
+            self._expire(now)
+        if not self._free:
+            # Still full: evict the least recently seen 1% in one pass
+            self._flush()
+            used = np.flatnonzero(self._used)
+            count = max(1, len(used) // 100)
+            oldest = used[np.argpartition(self._last_seen[used], count - 1)[:count]]
+            self._release(oldest)
+            self.evicted += count
+        slot = self._free.pop()
+        self._slots[key] = slot
+        self._keys[slot] = key
+        self._used[slot] = True
+        self._last_seen[slot] = now
+        return slot
+
+    def _release(self, slots):
+        for slot in slots.tolist():
+            del self._slots[self._keys[slot]]
+            self._keys[slot] = None
+            self._pending_sent.pop(slot, None)
+            self._pending_received.pop(slot, None)
+            self._free.append(slot)
+        self._ring[slots] = 0
+        self._window_sums[:, slots] = 0
+        self._sent[slots] = 0
+        self._received[slots] = 0
+        self._used[slots] = False
+
+    def _flush(self):
+        """
+        Move pending per-packet counts into the ring buffers and totals.
+        """
+        if self._bucket is None:
+            return
+        column = self._bucket % self._ring_size
+        for pending, totals in ((self._pending_sent, self._sent), (self._pending_received, self._received)):
+            if not pending:
+                continue
+            slots = np.fromiter(pending.keys(), dtype=np.int64, count=len(pending))
+            counts = np.fromiter(pending.values(), dtype=np.uint64, count=len(pending))
+            totals[slots] += counts
+            self._ring[slots, column] += counts.astype(np.uint32)
+            self._window_sums[:, slots] += counts
+            self._last_seen[slots] = self._bucket * self.bucket_seconds
+            pending.clear()
+
+    def _advance(self, bucket):
+        """
+        Slide every flow's windows forward to the given bucket.
+        """
+        self._flush()
+        if self._bucket is not None:
+            if bucket - self._bucket >= self._ring_size:
+                # Idle for at least the longest window: every bucket has left every window
+                self._ring[:] = 0
+                self._window_sums[:] = 0
+            else:
+                for step in range(self._bucket + 1, bucket + 1):
+                    for i, span in enumerate(self._spans):
+                        self._window_sums[i] -= self._ring[:, (step - span) % self._ring_size]
+                    self._ring[:, step % self._ring_size] = 0
+        self._bucket = bucket
+
+    def _expire(self, now):
+        self._flush()
+        idle = np.flatnonzero(self._used & (self._last_seen < now - self.idle_timeout))
+        if len(idle):
+            self._release(idle)
+            self.expired += len(idle)
+
+    def add(self, key, sent=0, received=0, now=None):
+        """
+        Account the bytes of one packet to its flow.
+        :param key: Direction-normalized 5-tuple (proto, local, lport, remote, rport).
+        """
+        now = time.time() if now is None else now
+        bucket = int(now // self.bucket_seconds)
+        with self._lock:
+            if self._bucket is None or bucket > self._bucket:
+                self._advance(bucket)
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._allocate(key, now)
+            if sent:
+                self._pending_sent[slot] = self._pending_sent.get(slot, 0) + sent
+            if received:
+                self._pending_received[slot] = self._pending_received.get(slot, 0) + received
+
+    def top(self, n=20, window=WINDOWS[0], now=None):
+        """
+        Return the n flows with the highest rate over the given window.
+        :return: List of (key, {'sent', 'received', 'rates': {window: bytes/s}}).
+        """
+        now = time.time() if now is None else now
+        window_index = self.windows.index(window)
+        with self._lock:
+            bucket = int(now // self.bucket_seconds)
+            if self._bucket is None or bucket > self._bucket:
+                self._advance(bucket)
+            else:
+                self._flush()
+            self._expire(now)
+
+            used = np.flatnonzero(self._used)
+            if len(used) == 0:
+                return []
+            scores = self._window_sums[window_index, used]
+            if len(used) > n:
+                candidates = np.argpartition(-scores.astype(np.float64), n - 1)[:n]
+            else:
+                candidates = np.arange(len(used))
+            best = used[candidates[np.argsort(-scores[candidates].astype(np.float64), kind='stable')]]
+
+            return [(self._keys[slot], {
+                'sent': int(self._sent[slot]),
+                'received': int(self._received[slot]),
+                'rates': {w: int(self._window_sums[i, slot]) / w for i, w in enumerate(self.windows)},
+            }) for slot in best.tolist()]
+
+    def reset(self):
+        """
+        Forget every flow.
+        """
+        with self._lock:
+            used = np.flatnonzero(self._used)
+            self._release(used)
+            self._pending_sent.clear()
+            self._pending_received.clear()
+
+
+def format_rate(bytes_per_second):
+    """
+    Format a byte rate in bits per second, like iftop does.
+    """
+    bits = bytes_per_second * 8
+    for unit in ('b', 'Kb', 'Mb', 'Gb'):
+        if bits < 1000:
+            return f"{bits:.1f}{unit}"
+        bits /= 1000
+    return f"{bits:.1f}Tb"
+
+
+class FlowView:
+    def __init__(self, table, stdscr, interface, refresh_rate=2.0, window=WINDOWS[0]):
+        """
+        Curses view of the flow table sorted by rate.
+        """
+        self.table = table
+        self.stdscr = stdscr
+        self.interface = interface
+        self.refresh_rate = refresh_rate
+        self.window = window
+        self.running = True
+
+    def run(self):
+        """
+        Main loop for displaying flows and handling input.
+        """
+        self.stdscr.nodelay(True)
+        last_refresh_time = 0.0
+
+        while self.running:
+            key = self.stdscr.getch()
+            if key != -1:
+                key_char = chr(key).lower()
+                if key_char == 'q':
+                    self.running = False
+                elif key_char == 'w':
+                    windows = self.table.windows
+                    self.window = windows[(windows.index(self.window) + 1) % len(windows)]
+                    last_refresh_time = 0.0
+                elif key_char == 'r':
+                    self.table.reset()
+
+            current_time = time.time()
+            if current_time - last_refresh_time >= self.refresh_rate:
+                self.display_flows()
+                last_refresh_time = current_time
+
+            time.sleep(0.1)
+
+    def display_flows(self):
+        """
+        Display the flows with the highest rate in the selected window.
+        """
+        max_rows, max_cols = self.stdscr.getmaxyx()
+        self.stdscr.clear()
+
+        line = 0
+        self.stdscr.addstr(line, 0, "Flow Table"[:max_cols - 1])
+        self.stdscr.addstr(line + 1, 0, "=" * 20)
+
+        line += 3
+        status = (f"Interface: {self.interface} | Sorted by: {self.window}s rate | "
+                  f"Flows: {len(self.table)} | Expired: {self.table.expired} | Evicted: {self.table.evicted}")
+        self.stdscr.addstr(line, 0, status[:max_cols - 1])
+
+        line += 2
+        header = f"{'Proto':<7}{'Local':<42}{'Remote':<42}" + "".join(f"{str(w) + 's':>10}" for w in self.table.windows) + f"{'Total':>12}"
+        self.stdscr.addstr(line, 0, header[:max_cols - 1])
+        line += 1
+
+        rows = max(0, max_rows - line - 2)
+        for key, stats in self.table.top(rows, window=self.window):
+            proto, local, lport, remote, rport = key
+            rates = "".join(f"{format_rate(stats['rates'][w]):>10}" for w in self.table.windows)
+            total = (stats['sent'] + stats['received']) / (1024 * 1024)
+            text = (f"{PROTO_NAMES.get(proto, str(proto)):<7}{format_endpoint(local, lport):<42}"
+                    f"{format_endpoint(remote, rport):<42}{rates}{total:>9.2f} MB")
+            self.stdscr.addstr(line, 0, text[:max_cols - 1])
+            line += 1
+
+        if max_rows > line + 1:
+            self.stdscr.addstr(max_rows - 1, 0, "W: cycle window | R: reset | Q: quit"[:max_cols - 1])
+        self.stdscr.refresh()
+
+
+def capture_flows(table, interface):
+    """
+    Sniff packets on the interface and account them to the flow table.
+    """
+    from scapy.all import sniff
+
+    local = local_addresses()
+
+    def packet_callback(packet):
+        if 'IP' in packet:
+            ip = packet['IP']
+            proto = ip.proto
+        elif 'IPv6' in packet:
+            ip = packet['IPv6']
+            proto = ip.nh
+        else:
+            return
+        sport = dport = 0
+        if 'TCP' in packet or 'UDP' in packet:
+            l4 = packet['TCP'] if 'TCP' in packet else packet['UDP']
+            sport, dport = l4.sport, l4.dport
+        length = len(packet)
+        if ip.src in local:
+            table.add((proto, ip.src, sport, ip.dst, dport), sent=length)
+        else:
+            table.add((proto, ip.dst, dport, ip.src, sport), received=length)
+
+    sniff(prn=packet_callback, iface=interface, store=False)
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Per-flow connection table')
+    parser.add_argument('-I', '--interface', default='en0',
+                        help='Interface to capture on')
+    parser.add_argument('-r', '--refresh', type=float, default=2.0,
+                        help='Refresh rate in seconds')
+    parser.add_argument('--max-flows', type=int, default=200000,
+                        help='Hard cap on tracked flows')
+    parser.add_argument('--idle-timeout', type=float, default=60.0,
+                        help='Seconds of inactivity before a flow expires')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    table = FlowTable(max_flows=args.max_flows, idle_timeout=args.idle_timeout)
+
+    sniff_thread = threading.Thread(target=capture_flows, args=(table, args.interface), daemon=True)
+    sniff_thread.start()
+
+    stdscr = curses.initscr()
+    curses.noecho()
+    curses.cbreak()
+    stdscr.keypad(True)
+    try:
+        FlowView(table, stdscr, args.interface, refresh_rate=args.refresh).run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        curses.nocbreak()
+        stdscr.keypad(False)
+        curses.echo()
+        curses.endwin()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
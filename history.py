@@ -0,0 +1,28 @@
+"""
+Stored bandwidth sample history.
+
+A history file is plain CSV with one 'timestamp,incoming MB,outgoing MB' line
+per sample, appended as samples are taken (see usage_grapher --record).
+"""
+import numpy as np
+
+
+def format_sample(timestamp, incoming, outgoing):
+    """
+    Return the history line for one sample.
+    """
+    return f"{timestamp:.3f},{incoming:.6f},{outgoing:.6f}\n"
+
+
+def load_history(path):
+    """
+    Read a history file.
+    :return: (timestamps, incoming, outgoing) float arrays sorted by time.
+    """
+    data = np.loadtxt(path, delimiter=',', ndmin=2)
+    if not len(data):
+        empty = np.zeros(0)
+        return empty, empty, empty
+    if np.any(np.diff(data[:, 0]) < 0):
+        data = data[np.argsort(data[:, 0], kind='stable')]
+    return data[:, 0], data[:, 1], data[:, 2]
@@ -0,0 +1,241 @@
+import hashlib
+import hmac
+import ipaddress
+import struct
+from collections import namedtuple
+from raw_packet import IPPROTO_TCP, IPPROTO_UDP
+
+try:
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+except ImportError:  # QUIC Initial decryption is skipped without cryptography
+    Cipher = None
+
+DnsRecord = namedtuple('DnsRecord', ['name', 'rtype', 'ttl', 'data'])
+DnsMessage = namedtuple('DnsMessage', ['qname', 'is_response', 'answers'])
+
+DNS_A = 1
+DNS_CNAME = 5
+DNS_AAAA = 28
+
+# QUIC v1 initial salt (RFC 9001, section 5.2)
+QUIC_V1 = 0x00000001
+QUIC_V1_SALT = bytes.fromhex('38762cf7f55934b34d179ae6a4c80cadccbb7f0a')
+
+_u16 = struct.Struct('!H').unpack_from
+
+
+def parse_client_hello(data, offset=0):
+    """
+    Extract the server_name extension from a TLS ClientHello handshake message.
+    :param data: Bytes starting at the handshake header (type 1).
+    :return: Hostname or None.
+    """
+    try:
+        if data[offset] != 1:
+            return None
+        end = min(len(data), offset + 4 + int.from_bytes(data[offset + 1:offset + 4], 'big'))
+        pos = offset + 4 + 2 + 32  # handshake header, legacy_version, random
+        pos += 1 + data[pos]  # session id
+        pos += 2 + _u16(data, pos)[0]  # cipher suites
+        pos += 1 + data[pos]  # compression methods
+        extensions_end = min(end, pos + 2 + _u16(data, pos)[0])
+        pos += 2
+        while pos + 4 <= extensions_end:
+            ext_type, ext_len = struct.unpack_from('!HH', data, pos)
+            pos += 4
+            if ext_type == 0:
+                # server_name_list: length, then (name_type, length, name)
+                if data[pos + 2] == 0:
+                    name_len = _u16(data, pos + 3)[0]
+                    return bytes(data[pos + 5:pos + 5 + name_len]).decode('ascii', 'replace').lower()
+                return None
+            pos += ext_len
+    except (IndexError, struct.error):
+        pass
+    return None
+
+
+def parse_tls_sni(payload):
+    """
+    Extract the SNI hostname from a TCP payload carrying a TLS ClientHello record.
+    """
+    if len(payload) < 6 or payload[0] != 0x16 or payload[1] != 0x03:
+        return None
+    return parse_client_hello(payload, 5)
+
+
+def _read_varint(data, pos):
+    first = data[pos]
+    length = 1 << (first >> 6)
+    value = first & 0x3f
+    for i in range(1, length):
+        value = (value << 8) | data[pos + i]
+    return value, pos + length
+
+
+def _hkdf_expand_label(secret, label, length):
+    full_label = b'tls13 ' + label
+    info = struct.pack('!HB', length, len(full_label)) + full_label + b'\x00'
+    output, block, counter = b'', b'', 1
+    while len(output) < length:
+        block = hmac.new(secret, block + info + bytes([counter]), hashlib.sha256).digest()
+        output += block
+        counter += 1
+    return output[:length]
+
+
+def _quic_client_keys(dcid):
+    initial_secret = hmac.new(QUIC_V1_SALT, dcid, hashlib.sha256).digest()
+    client_secret = _hkdf_expand_label(initial_secret, b'client in', 32)
+    return (_hkdf_expand_label(client_secret, b'quic key', 16),
+            _hkdf_expand_label(client_secret, b'quic iv', 12),
+            _hkdf_expand_label(client_secret, b'quic hp', 16))
+
+
+def parse_quic_initial_sni(payload):
+    """
+    Decrypt a QUIC v1 client Initial packet with its public initial keys and
+    extract the SNI of the ClientHello carried in its CRYPTO frames.
+    Requires the optional cryptography package.
+    """
+    if Cipher is None or len(payload) < 1200 or payload[0] & 0xf0 != 0xc0:
+        return None
+    try:
+        payload = bytes(payload)
+        if struct.unpack_from('!I', payload, 1)[0] != QUIC_V1:
+            return None
+        dcid_len = payload[5]
+        dcid = payload[6:6 + dcid_len]
+        pos = 6 + dcid_len
+        pos += 1 + payload[pos]  # source connection id
+        token_len, pos = _read_varint(payload, pos)
+        pos += token_len
+        length, pn_offset = _read_varint(payload, pos)
+
+        key, iv, hp = _quic_client_keys(dcid)
+        sample = payload[pn_offset + 4:pn_offset + 20]
+        encryptor = Cipher(algorithms.AES(hp), modes.ECB()).encryptor()
+        mask = encryptor.update(sample) + encryptor.finalize()
+        first = payload[0] ^ (mask[0] & 0x0f)
+        pn_len = (first & 0x03) + 1
+        pn_bytes = bytes(b ^ m for b, m in zip(payload[pn_offset:pn_offset + pn_len], mask[1:1 + pn_len]))
+        header = bytes([first]) + payload[1:pn_offset] + pn_bytes
+        packet_number = int.from_bytes(pn_bytes, 'big')
+        nonce = bytes(a ^ b for a, b in zip(iv, packet_number.to_bytes(12, 'big')))
+        ciphertext = payload[pn_offset + pn_len:pn_offset + length]
+        plaintext = AESGCM(key).decrypt(nonce, ciphertext, header)
+    except Exception:
+        return None
+    return _sni_from_crypto_frames(plaintext)
+
+
+def _sni_from_crypto_frames(plaintext):
+    """
+    Reassemble the CRYPTO frames of one Initial packet and parse the ClientHello.
+    """
+    fragments = {}
+    pos = 0
+    try:
+        while pos < len(plaintext):
+            frame_type = plaintext[pos]
+            if frame_type in (0x00, 0x01):  # PADDING, PING
+                pos += 1
+            elif frame_type == 0x06:  # CRYPTO
+                offset, pos = _read_varint(plaintext, pos + 1)
+                length, pos = _read_varint(plaintext, pos)
+                fragments[offset] = plaintext[pos:pos + length]
+                pos += length
+            else:
+                break
+    except IndexError:
+        pass
+    stream, expected = b'', 0
+    for offset in sorted(fragments):
+        if offset > expected:
+            break
+        stream += fragments[offset][expected - offset:]
+        expected = len(stream)
+    return parse_client_hello(stream) if stream else None
+
+
+def _read_dns_name(data, pos, depth=0):
+    """
+    Read a possibly compressed DNS name; returns (name, position after the name).
+    """
+    labels = []
+    end = None
+    while True:
+        length = data[pos]
+        if length == 0:
+            pos += 1
+            break
+        if length & 0xc0 == 0xc0:
+            if depth > 16:
+                raise ValueError("DNS compression loop")
+            pointer = _u16(data, pos)[0] & 0x3fff
+            if end is None:
+                end = pos + 2
+            pos = pointer
+            depth += 1
+            continue
+        labels.append(bytes(data[pos + 1:pos + 1 + length]).decode('ascii', 'replace'))
+        pos += 1 + length
+    return '.'.join(labels).lower(), end if end is not None else pos
+
+
+def parse_dns(payload):
+    """
+    Parse a DNS message from a UDP payload.
+    :return: DnsMessage(qname, is_response, answers) or None.
+    """
+    try:
+        if len(payload) < 12:
+            return None
+        flags, qdcount, ancount = struct.unpack_from('!HHH', payload, 2)
+        if qdcount == 0:
+            return None
+        qname, pos = _read_dns_name(payload, 12)
+        pos += 4
+        for _ in range(qdcount - 1):
+            pos = _read_dns_name(payload, pos)[1] + 4
+        answers = []
+        for _ in range(ancount):
+            name, pos = _read_dns_name(payload, pos)
+            rtype, _, ttl, rdlength = struct.unpack_from('!HHIH', payload, pos)
+            pos += 10
+            if pos + rdlength > len(payload):
+                return None  # truncated record; a partial address must not be learned
+            if rtype == DNS_A and rdlength == 4:
+                data = '.'.join(str(b) for b in payload[pos:pos + 4])
+            elif rtype == DNS_AAAA and rdlength == 16:
+                data = str(ipaddress.IPv6Address(bytes(payload[pos:pos + 16])))
+            elif rtype == DNS_CNAME:
+                data = _read_dns_name(payload, pos)[0]
+            else:
+                data = None
+            answers.append(DnsRecord(name, rtype, ttl, data))
+            pos += rdlength
+        return DnsMessage(qname, bool(flags & 0x8000), answers)
+    except (IndexError, ValueError, struct.error):
+        return None
+
+
+def extract_hostname(info):
+    """
+    Find a hostname in the transport payload of a decoded frame: TLS SNI on
+    TCP, QUIC Initial SNI on UDP/443, or the question of a DNS message.
+    """
+    payload = info.payload
+    if not payload:
+        return None
+    if info.proto == IPPROTO_TCP:
+        return parse_tls_sni(payload)
+    if info.proto == IPPROTO_UDP:
+        if info.sport == 53 or info.dport == 53:
+            message = parse_dns(payload)
+            return message.qname if message else None
+        if info.dport == 443:
+            return parse_quic_initial_sni(payload)
+    return None
+
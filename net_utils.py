@@ -0,0 +1,21 @@
+import socket
+import psutil
+
+
+def local_addresses():
+    """
+    Return the set of addresses assigned to local interfaces.
+    """
+    addresses = set()
+    for addrs in psutil.net_if_addrs().values():
+        for addr in addrs:
+            if addr.family in (socket.AF_INET, socket.AF_INET6):
+                addresses.add(addr.address.split('%')[0])
+    return addresses
+
+
+def format_endpoint(address, port):
+    """
+    Render address:port, bracketing IPv6 addresses.
+    """
+    return f"[{address}]:{port}" if ':' in address else f"{address}:{port}"
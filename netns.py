@@ -0,0 +1,214 @@
+import argparse
+import json
+import os
+import re
+import time
+from collections import namedtuple
+
+# Interfaces that carry traffic already counted inside a container's namespace
+# (veth peers, bridges, overlay and CNI devices); excluded from the host total
+VIRTUAL_PREFIXES = ('lo', 'veth', 'docker', 'br-', 'cni', 'flannel', 'cali', 'vxlan', 'tunl', 'weave',
+                    'kube-', 'virbr', 'ifb')
+
+NetDevCounters = namedtuple('NetDevCounters', ['bytes_recv', 'packets_recv', 'errin', 'dropin',
+                                               'bytes_sent', 'packets_sent', 'errout', 'dropout'])
+
+_DOCKER_ID = re.compile(r'(?:docker[-/]|containerd[-/]|cri-containerd-|crio-|libpod-)([0-9a-f]{12,64})')
+_POD_UID = re.compile(r'pod([0-9a-f]{8}[-_][0-9a-f]{4}[-_][0-9a-f]{4}[-_][0-9a-f]{4}[-_][0-9a-f]{12})')
+
+
+def read_net_dev_interfaces(path):
+    """
+    Read /proc/<pid>/net/dev into {interface: NetDevCounters}.
+    """
+    interfaces = {}
+    with open(path) as f:
+        lines = f.read().splitlines()[2:]
+    for line in lines:
+        name, _, data = line.partition(':')
+        fields = data.split()
+        if len(fields) < 12:
+            continue
+        # rx bytes, packets, errs, drop ... tx bytes, packets, errs, drop
+        interfaces[name.strip()] = NetDevCounters(*(int(fields[column]) for column in (0, 1, 2, 3, 8, 9, 10, 11)))
+    return interfaces
+
+
+def read_net_dev(path, exclude=()):
+    """
+    Sum the counters of /proc/<pid>/net/dev over its interfaces, skipping those
+    whose name starts with one of exclude. One read per namespace.
+    """
+    totals = [0] * 8
+    for name, counters in read_net_dev_interfaces(path).items():
+        if not name.startswith(exclude):
+            for i, value in enumerate(counters):
+                totals[i] += value
+    return NetDevCounters(*totals)
+
+
+def container_label(proc, pid):
+    """
+    Name the container or pod a PID runs in from its cgroup path, falling
+    back to the process name.
+    """
+    try:
+        with open(f'{proc}/{pid}/cgroup') as f:
+            cgroup = f.read()
+    except OSError:
+        cgroup = ''
+    pod = _POD_UID.search(cgroup)
+    if pod:
+        return f"pod {pod.group(1).replace('_', '-')}"
+    container = _DOCKER_ID.search(cgroup)
+    if container:
+        return f"container {container.group(1)[:12]}"
+    try:
+        with open(f'{proc}/{pid}/comm') as f:
+            return f.read().strip()
+    except OSError:
+        return str(pid)
+
+
+class NamespaceAccounting:
+    def __init__(self, proc='/proc', discovery_interval=10.0, include_virtual=False):
+        """
+        Per network namespace traffic counters.
+
+        Namespaces are discovered from /proc/<pid>/ns/net and deduplicated by
+        namespace inode. Only PIDs not seen before are resolved, and discovery
+        runs at most every discovery_interval seconds, so a refresh costs one
+        /proc/<pid>/net/dev read per namespace. The host namespace leaves out
+        veth, bridge and overlay interfaces so container traffic is not counted
+        twice.
+        """
+        self.proc = proc
+        self.discovery_interval = discovery_interval
+        self.exclude = ('lo',) if include_virtual else VIRTUAL_PREFIXES
+        self.host_inode = self._netns_inode('self') or self._netns_inode(1)
+        self.namespaces = {}  # netns inode -> {'pid', 'label', 'counters', 'previous', 'time'}
+        self._pid_netns = {}  # pid -> netns inode
+        self._last_discovery = 0.0
+
+    def _netns_inode(self, pid):
+        try:
+            link = os.readlink(f'{self.proc}/{pid}/ns/net')
+        except OSError:
+            return None
+        return int(link[link.index('[') + 1:-1])
+
+    def discover(self, now=None):
+        """
+        Resolve the namespace of new PIDs and forget namespaces with no PID left.
+        """
+        self._last_discovery = time.time() if now is None else now
+        pids = set()
+        for entry in os.scandir(self.proc):
+            if entry.name.isdigit():
+                pids.add(int(entry.name))
+        for pid in list(self._pid_netns):
+            if pid not in pids:
+                del self._pid_netns[pid]
+        for pid in pids - self._pid_netns.keys():
+            inode = self._netns_inode(pid)
+            if inode is not None:
+                self._pid_netns[pid] = inode
+                if inode not in self.namespaces:
+                    label = 'host' if inode == self.host_inode else container_label(self.proc, pid)
+                    self.namespaces[inode] = {'pid': pid, 'label': label, 'counters': None,
+                                              'previous': None, 'time': None, 'previous_time': None}
+
+        live = set(self._pid_netns.values())
+        for inode in list(self.namespaces):
+            if inode not in live:
+                del self.namespaces[inode]
+        # Read counters through a PID that is still alive
+        for pid, inode in self._pid_netns.items():
+            namespace = self.namespaces[inode]
+            if namespace['pid'] not in self._pid_netns:
+                namespace['pid'] = pid
+
+    def refresh(self, now=None):
+        """
+        Read the counters of every namespace.
+        """
+        now = time.time() if now is None else now
+        if now - self._last_discovery >= self.discovery_interval:
+            self.discover(now)
+        for inode, namespace in self.namespaces.items():
+            exclude = self.exclude if inode == self.host_inode else ('lo',)
+            try:
+                counters = read_net_dev(f"{self.proc}/{namespace['pid']}/net/dev", exclude)
+            except OSError:
+                continue
+            namespace['previous'], namespace['previous_time'] = namespace['counters'], namespace['time']
+            namespace['counters'], namespace['time'] = counters, now
+
+    def usage(self):
+        """
+        Return one dict per namespace with its label, cumulative byte counts
+        and byte/packet rates since the previous refresh, busiest first.
+        """
+        rows = []
+        for inode, namespace in self.namespaces.items():
+            counters = namespace['counters']
+            if counters is None:
+                continue
+            previous = namespace['previous']
+            elapsed = (namespace['time'] - namespace['previous_time']) if previous else 0
+            rates = [max(0, c - p) / elapsed for c, p in zip(counters, previous)] if elapsed > 0 else [0.0] * 8
+            rows.append({
+                'netns': inode,
+                'label': namespace['label'],
+                'pid': namespace['pid'],
+                'bytes_recv': counters.bytes_recv,
+                'bytes_sent': counters.bytes_sent,
+                'recv_rate': rates[0],
+                'sent_rate': rates[4],
+                'pps': rates[1] + rates[5],
+                'drops': counters.dropin + counters.dropout,
+                'errors': counters.errin + counters.errout,
+            })
+        rows.sort(key=lambda row: row['recv_rate'] + row['sent_rate'], reverse=True)
+        return rows
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Traffic per network namespace (containers and pods)')
+    parser.add_argument('-r', '--refresh', type=float, default=5,
+                        help='Refresh rate in seconds')
+    parser.add_argument('--json', action='store_true',
+                        help='Print one JSON object per namespace and refresh instead of a table')
+    parser.add_argument('--include-virtual', action='store_true',
+                        help='Count veth/bridge interfaces in the host namespace too')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    accounting = NamespaceAccounting(include_virtual=args.include_virtual)
+    accounting.refresh()
+    try:
+        while True:
+            time.sleep(args.refresh)
+            start = time.perf_counter()
+            accounting.refresh()
+            elapsed = time.perf_counter() - start
+            rows = accounting.usage()
+            if args.json:
+                for row in rows:
+                    print(json.dumps({'time': round(time.time(), 3), **row}), flush=True)
+                continue
+            print(f"\n{'Namespace':<14}{'Container / Pod':<48}{'In (KB/s)':>12}{'Out (KB/s)':>12}"
+                  f"{'In (MB)':>12}{'Out (MB)':>12}")
+            for row in rows:
+                print(f"{row['netns']:<14}{row['label'][:47]:<48}{row['recv_rate'] / 1024:>12.1f}"
+                      f"{row['sent_rate'] / 1024:>12.1f}{row['bytes_recv'] / 1048576:>12.2f}"
+                      f"{row['bytes_sent'] / 1048576:>12.2f}")
+            print(f"{len(rows)} namespaces read in {elapsed * 1000:.1f} ms")
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+import argparse
+import os
+import selectors
+import shlex
+import subprocess
+import sys
+import threading
+import time
+
+# Logging mode (-L 0: forever), per-process summary, raw byte counts
+NETTOP_COMMAND = 'nettop -P -L 0 -x -J bytes_in,bytes_out -s {interval}'
+
+
+class NettopParser:
+    def __init__(self):
+        """
+        Incremental parser for the CSV stream of 'nettop -P -L 0 -J bytes_in,bytes_out'.
+
+        Every sample starts with a header line ('time,,bytes_in,bytes_out,')
+        followed by one 'time,process.pid,bytes_in,bytes_out,' line per process
+        with its byte counts since nettop started.
+        """
+        self._rows = {}  # pid -> (name, bytes_in, bytes_out) of the sample being read
+
+    def feed(self, line):
+        """
+        Parse one line.
+        :return: The previous sample as {pid: (name, bytes_in, bytes_out)} when
+                 the line starts a new sample, otherwise None.
+        """
+        fields = line.rstrip('\r\n').split(',')
+        if len(fields) < 4:
+            return None
+        if fields[0] == 'time' or fields[2] == 'bytes_in':
+            return self.flush()
+        name, _, pid = fields[1].rpartition('.')
+        try:
+            self._rows[int(pid)] = (name or fields[1], int(fields[2] or 0), int(fields[3] or 0))
+        except ValueError:
+            pass
+        return None
+
+    def flush(self):
+        """
+        Return the rows read since the last sample boundary, or None if there are none.
+        """
+        if not self._rows:
+            return None
+        rows, self._rows = self._rows, {}
+        return rows
+
+
+class NettopBackend:
+    def __init__(self, interval=1.0, command=None, idle_timeout=60.0):
+        """
+        Per-process bandwidth from one long-lived nettop child. Its CSV stream
+        is parsed as it arrives and turned into per-PID deltas.
+        :param interval: Seconds between nettop samples.
+        :param command: Command line to run instead of nettop, e.g. a stand-in
+                        replaying recorded output (fake_nettop.py).
+        :param idle_timeout: Seconds a PID may be missing from the samples
+                             (it exited or closed its sockets) before it is forgotten.
+        """
+        self.interval = interval
+        self.command = command or NETTOP_COMMAND.format(interval=max(1, int(round(interval))))
+        self.parser = NettopParser()
+        self.lock = threading.Lock()
+        self.processes = {}  # pid -> [name, bytes_in delta, bytes_out delta, total in, total out]
+        self.samples = 0
+        self.last_error = None
+        self.idle_timeout = idle_timeout
+        self._previous = {}  # pid -> (bytes_in, bytes_out) as last reported by nettop
+        self._last_seen = {}  # pid -> time of the last sample listing it
+        self._process = None
+        self._thread = None
+        self.running = False
+
+    def start(self):
+        args = shlex.split(self.command) if isinstance(self.command, str) else list(self.command)
+        self._process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                         stdin=subprocess.DEVNULL)
+        self.running = True
+        self._thread = threading.Thread(target=self._read, daemon=True)
+        self._thread.start()
+
+    def _read(self):
+        """
+        Read the child's output as it arrives. A sample is complete when the
+        next header arrives, or when no output came for half an interval (so
+        the last sample is not held back until the next one starts).
+        """
+        fd = self._process.stdout.fileno()
+        selector = selectors.DefaultSelector()
+        selector.register(fd, selectors.EVENT_READ)
+        pending = b''
+        try:
+            while self.running:
+                if not selector.select(timeout=self.interval / 2):
+                    sample = self.parser.flush()
+                    if sample:
+                        self.update(sample)
+                    continue
+                chunk = os.read(fd, 65536)
+                if not chunk:
+                    sample = self.parser.flush()
+                    if sample:
+                        self.update(sample)
+                    self.last_error = f"nettop exited with code {self._process.wait()}"
+                    break
+                *lines, pending = (pending + chunk).split(b'\n')
+                for line in lines:
+                    sample = self.parser.feed(line.decode('utf-8', 'replace'))
+                    if sample:
+                        self.update(sample)
+        finally:
+            selector.close()
+            self.running = False
+
+    def update(self, sample, now=None):
+        """
+        Turn one sample of cumulative counts into per-PID deltas and totals.
+        """
+        now = time.time() if now is None else now
+        with self.lock:
+            for process in self.processes.values():
+                process[1] = process[2] = 0
+            for pid, (name, bytes_in, bytes_out) in sample.items():
+                previous = self._previous.get(pid)
+                if previous is None:
+                    # First sight of a process: its counts cover an unknown period
+                    delta_in = delta_out = 0
+                elif bytes_in < previous[0] or bytes_out < previous[1]:
+                    # Counter restarted (PID reused)
+                    delta_in, delta_out = bytes_in, bytes_out
+                else:
+                    delta_in, delta_out = bytes_in - previous[0], bytes_out - previous[1]
+                self._previous[pid] = (bytes_in, bytes_out)
+                process = self.processes.get(pid)
+                if process is None:
+                    process = self.processes[pid] = [name, 0, 0, 0, 0]
+                process[0] = name
+                process[1], process[2] = delta_in, delta_out
+                process[3] += delta_in
+                process[4] += delta_out
+                self._last_seen[pid] = now
+            horizon = now - self.idle_timeout
+            for pid in [pid for pid, seen in self._last_seen.items() if seen < horizon]:
+                del self._last_seen[pid]
+                self._previous.pop(pid, None)
+                self.processes.pop(pid, None)
+            self.samples += 1
+
+    def top(self, n=10, by='rate'):
+        """
+        Return the n busiest processes as (pid, name, delta in, delta out, total in, total out),
+        by the latest sample ('rate') or since start ('total').
+        """
+        index = (1, 2) if by == 'rate' else (3, 4)
+        with self.lock:
+            rows = [(pid, *process) for pid, process in self.processes.items()]
+        rows.sort(key=lambda row: row[index[0] + 1] + row[index[1] + 1], reverse=True)
+        return rows[:n]
+
+    def reset(self):
+        with self.lock:
+            for process in self.processes.values():
+                process[3] = process[4] = 0
+
+    def stop(self):
+        self.running = False
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Per-process bandwidth from a persistent nettop stream')
+    parser.add_argument('-r', '--refresh', type=float, default=2,
+                        help='Sampling interval in seconds')
+    parser.add_argument('-n', '--top', type=int, default=10,
+                        help='Number of processes to show')
+    parser.add_argument('--command', type=str, default=None,
+                        help='Run this command instead of nettop (e.g. "python fake_nettop.py recording.csv")')
+    return parser.parse_args()
+
+
+def _wait_for_key(timeout):
+    """
+    Wait up to timeout seconds for a key press on the terminal.
+    :return: The key, or '' if none was pressed or stdin is not a terminal.
+    """
+    if not sys.stdin.isatty():
+        time.sleep(timeout)
+        return ''
+    with selectors.DefaultSelector() as selector:
+        selector.register(sys.stdin, selectors.EVENT_READ)
+        if not selector.select(timeout=timeout):
+            return ''
+    return sys.stdin.read(1)
+
+
+def main():
+    args = parse_arguments()
+    backend = NettopBackend(interval=args.refresh, command=args.command)
+    backend.start()
+    terminal = None
+    if sys.stdin.isatty():
+        import termios
+        import tty
+
+        # Single key presses without Enter or echo, as the old read -k1 loop did
+        terminal = termios.tcgetattr(sys.stdin)
+        tty.setcbreak(sys.stdin)
+    try:
+        while backend.running:
+            key = _wait_for_key(args.refresh)
+            if key == 'q':
+                break
+            if key == 'r':
+                backend.reset()
+            print(f"\n{'PID':<9}{'Process':<30}{'In (MB)':>12}{'Out (MB)':>12}{'Total In':>12}{'Total Out':>12}")
+            for pid, name, delta_in, delta_out, total_in, total_out in backend.top(args.top):
+                print(f"{pid:<9}{name[:29]:<30}{delta_in / 1048576:>12.2f}{delta_out / 1048576:>12.2f}"
+                      f"{total_in / 1048576:>12.2f}{total_out / 1048576:>12.2f}")
+            print("Press 'r' to reset the totals, 'q' to quit.")
+        if backend.last_error:
+            print(backend.last_error, file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if terminal is not None:
+            import termios
+
+            termios.tcsetattr(sys.stdin, termios.TCSADRAIN, terminal)
+        backend.stop()
+
+if __name__ == "__main__":
+    main()
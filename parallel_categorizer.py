@@ -0,0 +1,395 @@
+import argparse
+import copy
+import curses
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from category_rules import DEFAULT_RULES_PATH
+from prefix_trie import DEFAULT_RANGES_PATH
+from raw_packet import LINKTYPES_BY_LAYER, LINKTYPE_ETHERNET, flow_endpoints
+from sampling import PacketSampler, SampledEstimates
+from sketches import HyperLogLog, SpaceSaving
+
+
+def _categorize_worker(index, interface, rules_path, ranges_path, tick, inbox, outbox):
+    """
+    Worker process: categorize the frames of the flows hashed to this shard
+    with its own flow cache, DNS cache and counters, and report the running
+    totals to the aggregator every tick.
+
+    Inbox messages are ('frames', generation, linktype, [(frame, weight), ...])
+    where weight 0 marks a DNS response only to be learned from, ('reset',
+    generation), or None to stop.
+    """
+    from traffic_categorizer import TrafficCategorizer
+
+    categorizer = TrafficCategorizer(interface=interface, rules_path=rules_path, ranges_path=ranges_path)
+    generation = 0
+    packets = 0
+    last_report = time.time()
+
+    def report():
+        now = time.time()
+        hostnames = {host: categorizer.dns_cache.lookup(host, now)
+                     for host, _, _ in categorizer.remote_traffic.hosts.top(50)}
+        outbox.put({
+            'worker': index,
+            'generation': generation,
+            'packets': packets,
+            'categories': dict(categorizer.categories),
+            # Queue.put pickles in a feeder thread; send copies taken now, not
+            # objects the loop below keeps changing
+            'estimates': copy.deepcopy(categorizer.category_estimates),
+            # Flows are sharded, not hosts: the aggregator merges whole summaries
+            'hosts': copy.deepcopy(categorizer.remote_traffic.hosts),
+            'hostnames': {host: name for host, name in hostnames.items() if name},
+            'owners': copy.deepcopy(categorizer.remote_traffic.asns),
+            'unique_hosts': categorizer.remote_traffic.end_interval(),
+            'flows': len(categorizer.flow_cache),
+            'last_error': categorizer.last_error,
+        })
+
+    while True:
+        try:
+            message = inbox.get(timeout=tick)
+        except queue.Empty:
+            message = ()
+        if message is None:
+            report()
+            break
+        if message and message[0] == 'reset':
+            generation = message[1]
+            packets = 0
+            categorizer.reset()
+            categorizer.flow_cache.clear()
+        elif message and message[0] == 'frames' and message[1] >= generation:
+            # Batches tagged before a reset can arrive after its message; they are dropped
+            _, generation, categorizer.linktype, frames = message
+            for frame, weight in frames:
+                if weight:
+                    categorizer.categorize_frame(frame, weight)
+                    packets += 1
+                else:
+                    categorizer.learn_dns(frame)
+        if time.time() - last_report >= tick:
+            report()
+            last_report = time.time()
+
+
+class ParallelCategorizer:
+    def __init__(self, interface='en0', workers=None, batch_size=256, tick=1.0, sample_rate=1,
+                 cpu_budget=None, rules_path=DEFAULT_RULES_PATH, ranges_path=DEFAULT_RANGES_PATH):
+        """
+        Categorize traffic across worker processes.
+
+        The capture stage hashes every frame by its direction-independent flow
+        to one of N workers, so each flow is always inspected by the same
+        process and its cached verdict stays consistent. DNS responses are
+        also sent to every other worker so all of them learn the hostnames.
+        Workers report running totals every tick and the aggregator merges them.
+
+        :param interface: Network interface to capture packets.
+        :param workers: Number of worker processes (default: CPU count - 1).
+        :param batch_size: Frames sent to a worker per message.
+        :param tick: Seconds between worker reports.
+        """
+        self.interface = interface
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.batch_size = batch_size
+        self.tick = tick
+        self.rules_path = rules_path
+        self.ranges_path = ranges_path
+        self.sampler = PacketSampler(rate=sample_rate, cpu_budget=cpu_budget)
+        self.linktype = LINKTYPE_ETHERNET
+        self.running = False
+        self.last_error = None
+        self.submitted = 0
+
+        self._processes = []
+        self._inboxes = []
+        self._outbox = None
+        self._batches = []
+        self._batch_lock = threading.Lock()  # submit() runs in the capture thread, flush() also elsewhere
+        self._capture_thread = None
+        self._last_flush = 0.0
+        self._generation = 0
+        self._reports = {}  # worker -> latest report
+        self._lock = threading.Lock()
+
+    def start(self):
+        context = multiprocessing.get_context('spawn')
+        self._outbox = context.Queue()
+        for index in range(self.workers):
+            inbox = context.Queue(maxsize=64)
+            process = context.Process(target=_categorize_worker, daemon=True,
+                                      args=(index, self.interface, self.rules_path, self.ranges_path,
+                                            self.tick, inbox, self._outbox))
+            process.start()
+            self._inboxes.append(inbox)
+            self._processes.append(process)
+        self._batches = [[] for _ in range(self.workers)]
+        self._last_flush = time.time()
+        self.running = True
+
+    def submit(self, frame, weight=1):
+        """
+        Route a frame to the worker owning its flow.
+        """
+        endpoints = flow_endpoints(frame, self.linktype)
+        if endpoints is None:
+            return
+        key, is_dns_response = endpoints
+        shard = hash(key) % self.workers
+        with self._batch_lock:
+            batches = self._batches
+            batches[shard].append((frame, weight))
+            if is_dns_response:
+                for other in range(self.workers):
+                    if other != shard:
+                        batches[other].append((frame, 0))
+            self.submitted += 1
+            if len(batches[shard]) >= self.batch_size:
+                self._send(shard)
+            elif time.time() - self._last_flush >= 0.05:
+                self._flush()
+
+    def _send(self, shard):
+        # Callers hold _batch_lock
+        with self._lock:
+            generation = self._generation
+        self._inboxes[shard].put(('frames', generation, self.linktype, self._batches[shard]))
+        self._batches[shard] = []
+
+    def _flush(self):
+        for shard, batch in enumerate(self._batches):
+            if batch:
+                self._send(shard)
+        self._last_flush = time.time()
+
+    def flush(self):
+        """
+        Send all partially filled batches.
+        """
+        with self._batch_lock:
+            self._flush()
+
+    def poll(self):
+        """
+        Merge the reports the workers sent since the last poll.
+        """
+        while True:
+            try:
+                report = self._outbox.get_nowait()
+            except (queue.Empty, OSError, ValueError):
+                break
+            with self._lock:
+                if report['generation'] == self._generation:
+                    self._reports[report['worker']] = report
+
+    def snapshot(self, top_n=5):
+        """
+        Aggregate the latest worker reports into the shape of
+        TrafficCategorizer.snapshot, so CategoryView can display either.
+        """
+        self.poll()
+        with self._lock:
+            reports = list(self._reports.values())
+
+        categories = {}
+        estimates = SampledEstimates()
+        hosts = None
+        owners = None
+        hostnames = {}
+        unique_hosts = None
+        for report in reports:
+            for category, usage in report['categories'].items():
+                categories[category] = categories.get(category, 0.0) + usage
+            estimates.merge(report['estimates'])
+            if hosts is None:
+                hosts = SpaceSaving(report['hosts'].capacity)
+                owners = SpaceSaving(report['owners'].capacity)
+            hosts.merge(report['hosts'])
+            owners.merge(report['owners'])
+            hostnames.update(report['hostnames'])
+            if unique_hosts is None:
+                unique_hosts = HyperLogLog(report['unique_hosts'].precision)
+            unique_hosts.merge(report['unique_hosts'])
+            if report['last_error']:
+                self.last_error = report['last_error']
+
+        return {
+            'categories': [(category, usage, estimates.interval(category)[1])
+                           for category, usage in categories.items()],
+            'hosts': [(host, hostnames.get(host, ''), count, error)
+                      for host, count, error in (hosts.top(top_n) if hosts else [])],
+            'owners': owners.top(top_n) if owners else [],
+            'unique_hosts': unique_hosts.count() if unique_hosts else 0,
+            'sample_rate': self.sampler.rate,
+            'packets': sum(report['packets'] for report in reports),
+            'flows': sum(report['flows'] for report in reports),
+        }
+
+    def reset(self):
+        """
+        Reset the counters of all workers; reports from before the reset are ignored.
+        """
+        with self._lock:
+            self._generation += 1
+            self._reports.clear()
+        for inbox in self._inboxes:
+            inbox.put(('reset', self._generation))
+
+    def stop(self, timeout=5.0):
+        """
+        Flush pending frames, wait for the final worker reports and stop the workers.
+        """
+        if not self.running:
+            return
+        self.running = False
+        # The capture thread leaves its loop at the next packet; the lock
+        # covers a submit() still in progress if it does not within a second
+        if self._capture_thread is not None:
+            self._capture_thread.join(1.0)
+        self.flush()
+        for inbox in self._inboxes:
+            inbox.put(None)
+        deadline = time.time() + timeout
+        for process in self._processes:
+            process.join(max(0.0, deadline - time.time()))
+        self.poll()
+        for process in self._processes:
+            if process.is_alive():
+                process.terminate()
+
+    def capture(self):
+        """
+        Capture packets and hand them to the workers until stopped.
+        """
+        import asyncio
+        import pyshark
+
+        asyncio.set_event_loop(asyncio.new_event_loop())
+        capture = pyshark.LiveCapture(interface=self.interface, use_json=True, include_raw=True)
+        linktype = None
+        last_adjust_time = time.time()
+        try:
+            for packet in capture.sniff_continuously():
+                if not self.running:
+                    break
+                weight = self.sampler.sample()
+                if not weight:
+                    continue
+                start = time.perf_counter()
+                if linktype is None:
+                    linktype = self.linktype = LINKTYPES_BY_LAYER.get(packet.layers[0].layer_name,
+                                                                      LINKTYPE_ETHERNET)
+                self.submit(packet.get_raw_packet(), weight)
+                self.sampler.record_cost(time.perf_counter() - start)
+                if time.time() - last_adjust_time >= 5:
+                    self.sampler.adjust()
+                    last_adjust_time = time.time()
+        except Exception as e:
+            self.last_error = f"Capture stopped: {e}"
+        finally:
+            capture.close()
+
+    def replay(self, path):
+        """
+        Feed the frames of a pcap/pcapng file to the workers as fast as they
+        accept them.
+        """
+        from pcap_analyzer import iter_records
+
+        for buf, offsets, caplens, _, _, linktypes in iter_records(path):
+            view = memoryview(buf)
+            for offset, caplen, linktype in zip(offsets.tolist(), caplens.tolist(), linktypes.tolist()):
+                if linktype != self.linktype:
+                    self.flush()
+                    self.linktype = linktype
+                self.submit(bytes(view[offset:offset + caplen]))
+        self.flush()
+
+    def start_categorizing(self, refresh_rate=1.0):
+        """
+        Start the workers and the capture thread, and display the merged usage.
+        """
+        from traffic_categorizer import CategoryView
+
+        self.start()
+        self._capture_thread = threading.Thread(target=self.capture, daemon=True)
+        self._capture_thread.start()
+
+        stdscr = curses.initscr()
+        curses.noecho()
+        curses.cbreak()
+        stdscr.keypad(True)
+        try:
+            CategoryView(self, stdscr, refresh_rate=refresh_rate).run()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            curses.nocbreak()
+            stdscr.keypad(False)
+            curses.echo()
+            curses.endwin()
+            self.stop()
+            self.final_summary()
+
+    def final_summary(self, top_n=10):
+        """
+        Print the merged usage per category and the heaviest remote hosts.
+        """
+        snapshot = self.snapshot(top_n)
+        print(f"\nFinal Summary of Categorized Usage ({self.workers} workers, "
+              f"{snapshot['packets']} packets, {snapshot['flows']} flows):")
+        print(f"{'Category':<20}{'Usage (MB)':<20}{'95% CI (MB)':<20}")
+        for category, usage, margin in snapshot['categories']:
+            print(f"{category.capitalize():<20}{usage:<20.2f}{'±' + format(margin, '.2f'):<20}")
+        print(f"\n{'Remote Host':<40}{'Hostname':<40}{'Usage (MB)':<20}")
+        for host, hostname, count, _ in snapshot['hosts']:
+            print(f"{host:<40}{hostname[:39]:<40}{count / (1024 * 1024):<20.2f}")
+        print(f"Unique remote hosts (estimate): {snapshot['unique_hosts']:.0f}")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Categorize traffic across worker processes')
+    parser.add_argument('-I', '--interface', type=str, default='en0',
+                        help='Network interface to capture packets')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help='Number of worker processes (default: CPU count - 1)')
+    parser.add_argument('-r', '--refresh', type=float, default=1.0,
+                        help='Display refresh rate in seconds')
+    parser.add_argument('--batch', type=int, default=256,
+                        help='Frames sent to a worker per message')
+    parser.add_argument('--sample', type=int, default=1,
+                        help='Categorize 1 in N packets')
+    parser.add_argument('--cpu-budget', type=float, default=None,
+                        help='Fraction of one core for the capture stage; adjusts the sampling rate')
+    parser.add_argument('--pcap', type=str, default=None,
+                        help='Categorize a capture file instead of a live interface')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    categorizer = ParallelCategorizer(interface=args.interface, workers=args.workers, batch_size=args.batch,
+                                      sample_rate=args.sample, cpu_budget=args.cpu_budget)
+    if args.pcap:
+        start = time.time()
+        categorizer.start()
+        try:
+            categorizer.replay(args.pcap)
+        finally:
+            categorizer.stop(timeout=600)
+        elapsed = time.time() - start
+        categorizer.final_summary()
+        print(f"\nCategorized {categorizer.submitted} frames in {elapsed:.2f}s "
+              f"({categorizer.submitted / max(elapsed, 1e-9):.0f} frames/s)")
+    else:
+        categorizer.start_categorizing(refresh_rate=args.refresh)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,565 @@
+import argparse
+import ipaddress
+import struct
+import time
+import numpy as np
+from category_rules import CategoryRules, DEFAULT_RULES_PATH
+from dns_cache import DnsCache
+from prefix_trie import DEFAULT_RANGES_PATH, IpRanges
+
+# One row per captured IP packet, filled with vectorized header extraction.
+# Addresses are 16 bytes wide; IPv4 is stored IPv4-mapped (::ffff:a.b.c.d).
+PACKET_DTYPE = np.dtype([
+    ('ts', '<f8'),
+    ('src', 'V16'),
+    ('dst', 'V16'),
+    ('sport', '<u2'),
+    ('dport', '<u2'),
+    ('proto', 'u1'),
+    ('length', '<u4'),
+])
+
+# Direction-normalized flow key. Addresses are split into big-endian 64-bit
+# words so that group-bys sort plain integer columns.
+FLOW_DTYPE = np.dtype([
+    ('local_hi', '<u8'),
+    ('local_lo', '<u8'),
+    ('remote_hi', '<u8'),
+    ('remote_lo', '<u8'),
+    ('lport', '<u2'),
+    ('rport', '<u2'),
+    ('proto', 'u1'),
+])
+
+# Link-layer types (https://www.tcpdump.org/linktypes.html)
+LINKTYPE_NULL = 0
+LINKTYPE_ETHERNET = 1
+LINKTYPE_RAW = 101
+LINKTYPE_LOOP = 108
+LINKTYPE_LINUX_SLL = 113
+LINKTYPE_IPV4 = 228
+LINKTYPE_IPV6 = 229
+LINKTYPE_LINUX_SLL2 = 276
+
+PROTO_NAMES = {1: 'ICMP', 6: 'TCP', 17: 'UDP', 58: 'ICMPv6', 132: 'SCTP'}
+
+DEFAULT_LOCAL_NETWORKS = (
+    '10.0.0.0/8', '172.16.0.0/12', '192.168.0.0/16', '169.254.0.0/16',
+    '127.0.0.0/8', 'fc00::/7', 'fe80::/10', '::1/128',
+)
+
+_IPV4_MAPPED = np.array([0] * 10 + [0xff, 0xff], dtype=np.uint8)
+
+
+class PcapFormatError(Exception):
+    pass
+
+
+def _read_records_pcap(f, chunk_size, endian, ts_divisor, linktype):
+    """
+    Walk classic pcap records chunk by chunk. Only the record lengths are read
+    in the loop; the record headers are decoded in one vectorized pass.
+    Yields (buffer, offsets, caplens, origlens, timestamps, linktypes).
+    """
+    unpack_from = struct.Struct(endian + '8xI').unpack_from
+    header_dtype = np.dtype(endian + 'u4')
+    leftover = b''
+    while True:
+        data = f.read(chunk_size)
+        if not data and not leftover:
+            return
+        buf = leftover + data
+        size = len(buf)
+        records = []
+        append = records.append
+        pos = 0
+        while pos + 16 <= size:
+            end = pos + 16 + unpack_from(buf, pos)[0]
+            if end > size:
+                break
+            append(pos)
+            pos = end
+        leftover = buf[pos:]
+        if records:
+            starts = np.array(records, dtype=np.int64)
+            raw = np.frombuffer(buf, dtype=np.uint8)
+            headers = raw[starts[:, None] + np.arange(16)].view(header_dtype).astype(np.int64)
+            yield (buf, starts + 16, headers[:, 2], headers[:, 3],
+                   headers[:, 0] + headers[:, 1] / ts_divisor,
+                   np.full(len(records), linktype, dtype=np.int64))
+        if not data:
+            if leftover:
+                raise PcapFormatError("Truncated pcap record at end of file")
+            return
+
+
+def _read_records_pcapng(f, chunk_size):
+    """
+    Walk pcapng blocks chunk by chunk, tracking interface link types and
+    timestamp resolutions. Enhanced and simple packet blocks are returned.
+    """
+    endian = '<'
+    interfaces = []  # (linktype, ts_divisor)
+    leftover = b''
+    while True:
+        data = f.read(chunk_size)
+        if not data and not leftover:
+            return
+        buf = leftover + data
+        size = len(buf)
+        offsets, caplens, origlens, timestamps, linktypes = [], [], [], [], []
+        pos = 0
+        while pos + 12 <= size:
+            block_type = struct.unpack_from(endian + 'I', buf, pos)[0]
+            if block_type == 0x0A0D0D0A:
+                bom = buf[pos + 8:pos + 12]
+                endian = '<' if bom == b'\x4d\x3c\x2b\x1a' else '>'
+            block_len = struct.unpack_from(endian + 'I', buf, pos + 4)[0]
+            if block_len < 12:
+                raise PcapFormatError(f"Invalid pcapng block length {block_len}")
+            if pos + block_len > size:
+                break
+            if block_type == 0x0A0D0D0A:
+                interfaces = []
+            elif block_type == 1:
+                linktype = struct.unpack_from(endian + 'H', buf, pos + 8)[0]
+                interfaces.append((linktype, _pcapng_ts_divisor(buf, pos + 16, pos + block_len - 4, endian)))
+            elif block_type == 6:
+                iface, ts_high, ts_low, caplen, origlen = struct.unpack_from(endian + 'IIIII', buf, pos + 8)
+                linktype, divisor = interfaces[iface]
+                offsets.append(pos + 28)
+                caplens.append(caplen)
+                origlens.append(origlen)
+                timestamps.append(((ts_high << 32) | ts_low) / divisor)
+                linktypes.append(linktype)
+            elif block_type == 3:
+                origlen = struct.unpack_from(endian + 'I', buf, pos + 8)[0]
+                linktype, _ = interfaces[0]
+                offsets.append(pos + 12)
+                caplens.append(min(origlen, block_len - 16))
+                origlens.append(origlen)
+                timestamps.append(0.0)
+                linktypes.append(linktype)
+            pos += block_len
+        leftover = buf[pos:]
+        if offsets:
+            yield (buf, np.array(offsets, dtype=np.int64), np.array(caplens, dtype=np.int64),
+                   np.array(origlens, dtype=np.int64), np.array(timestamps, dtype=np.float64),
+                   np.array(linktypes, dtype=np.int64))
+        if not data:
+            if leftover:
+                raise PcapFormatError("Truncated pcapng block at end of file")
+            return
+
+
+def _pcapng_ts_divisor(buf, start, end, endian):
+    """
+    Read the if_tsresol option of an interface description block.
+    """
+    pos = start
+    while pos + 4 <= end:
+        code, length = struct.unpack_from(endian + 'HH', buf, pos)
+        if code == 0:
+            break
+        if code == 9 and length >= 1:
+            resol = buf[pos + 4]
+            return float(2 ** (resol & 0x7f)) if resol & 0x80 else float(10 ** resol)
+        pos += 4 + ((length + 3) & ~3)
+    return 1e6
+
+
+def iter_records(path, chunk_size=64 * 1024 * 1024):
+    """
+    Open a pcap or pcapng file and yield raw record batches.
+    """
+    with open(path, 'rb') as f:
+        magic = f.read(4)
+        if magic == b'\x0a\x0d\x0d\x0a':
+            f.seek(0)
+            yield from _read_records_pcapng(f, chunk_size)
+            return
+        formats = {
+            b'\xd4\xc3\xb2\xa1': ('<', 1e6), b'\xa1\xb2\xc3\xd4': ('>', 1e6),
+            b'\x4d\x3c\xb2\xa1': ('<', 1e9), b'\xa1\xb2\x3c\x4d': ('>', 1e9),
+        }
+        if magic not in formats:
+            raise PcapFormatError(f"{path}: not a pcap or pcapng file")
+        endian, divisor = formats[magic]
+        rest = f.read(20)
+        if len(rest) < 20:
+            raise PcapFormatError(f"{path}: truncated pcap header")
+        linktype = struct.unpack(endian + 'I', rest[16:20])[0] & 0x0fffffff
+        yield from _read_records_pcap(f, chunk_size, endian, divisor, linktype)
+
+
+def extract_headers(buf, offsets, caplens, origlens, timestamps, linktypes, dns_payloads=None):
+    """
+    Vectorized extraction of IP/TCP/UDP header fields for a batch of frames.
+    :param dns_payloads: Optional list; the UDP payloads sent from port 53
+                         (DNS responses) are appended to it.
+    :return: (PACKET_DTYPE array of IP packets, bytes of non-IP frames)
+    """
+    # Pad so that reading a fixed header window never runs off the buffer
+    data = np.frombuffer(buf + bytes(64), dtype=np.uint8)
+    ends = offsets + caplens
+
+    def byte(idx):
+        return data[idx].astype(np.int64)
+
+    l3 = np.full(len(offsets), -1, dtype=np.int64)
+
+    eth = linktypes == LINKTYPE_ETHERNET
+    if eth.any():
+        o = offsets[eth]
+        ethertype = byte(o + 12) << 8 | byte(o + 13)
+        vlan = (ethertype == 0x8100) | (ethertype == 0x88a8)
+        start = np.where(vlan, o + 18, o + 14)
+        ethertype = np.where(vlan, byte(o + 16) << 8 | byte(o + 17), ethertype)
+        l3[eth] = np.where((ethertype == 0x0800) | (ethertype == 0x86dd), start, -1)
+
+    loop = (linktypes == LINKTYPE_NULL) | (linktypes == LINKTYPE_LOOP)
+    if loop.any():
+        o = offsets[loop]
+        family = byte(o) | byte(o + 3)
+        l3[loop] = np.where(np.isin(family, (2, 24, 28, 30)), o + 4, -1)
+
+    raw = np.isin(linktypes, (LINKTYPE_RAW, 12, 14, LINKTYPE_IPV4, LINKTYPE_IPV6))
+    l3[raw] = offsets[raw]
+
+    sll = linktypes == LINKTYPE_LINUX_SLL
+    if sll.any():
+        o = offsets[sll]
+        proto = byte(o + 14) << 8 | byte(o + 15)
+        l3[sll] = np.where((proto == 0x0800) | (proto == 0x86dd), o + 16, -1)
+
+    sll2 = linktypes == LINKTYPE_LINUX_SLL2
+    if sll2.any():
+        o = offsets[sll2]
+        proto = byte(o) << 8 | byte(o + 1)
+        l3[sll2] = np.where((proto == 0x0800) | (proto == 0x86dd), o + 20, -1)
+
+    # Keep frames whose IP header was captured
+    valid = l3 >= 0
+    version = np.zeros(len(offsets), dtype=np.int64)
+    version[valid] = byte(l3[valid]) >> 4
+    is4 = valid & (version == 4) & (l3 + 20 <= ends)
+    is6 = valid & (version == 6) & (l3 + 40 <= ends)
+    keep = is4 | is6
+    non_ip_bytes = int(origlens[~keep].sum())
+
+    l3, ends, is4 = l3[keep], ends[keep], is4[keep]
+    packets = np.zeros(len(l3), dtype=PACKET_DTYPE)
+    packets['ts'] = timestamps[keep]
+    packets['length'] = origlens[keep]
+
+    src = np.empty((len(l3), 16), dtype=np.uint8)
+    dst = np.empty((len(l3), 16), dtype=np.uint8)
+    proto = np.empty(len(l3), dtype=np.int64)
+    l4 = np.empty(len(l3), dtype=np.int64)
+    first_fragment = np.ones(len(l3), dtype=bool)
+
+    if is4.any():
+        o = l3[is4]
+        four = np.arange(4)
+        src[is4, :12] = _IPV4_MAPPED
+        dst[is4, :12] = _IPV4_MAPPED
+        src[is4, 12:] = data[o[:, None] + 12 + four]
+        dst[is4, 12:] = data[o[:, None] + 16 + four]
+        proto[is4] = byte(o + 9)
+        l4[is4] = o + (byte(o) & 0x0f) * 4
+        first_fragment[is4] = ((byte(o + 6) & 0x1f) << 8 | byte(o + 7)) == 0
+
+    is6 = ~is4
+    if is6.any():
+        o = l3[is6]
+        sixteen = np.arange(16)
+        src[is6] = data[o[:, None] + 8 + sixteen]
+        dst[is6] = data[o[:, None] + 24 + sixteen]
+        proto[is6] = byte(o + 6)
+        l4[is6] = o + 40
+
+    packets['src'] = src.view('V16').ravel()
+    packets['dst'] = dst.view('V16').ravel()
+    packets['proto'] = proto
+
+    has_ports = np.isin(proto, (6, 17, 132)) & first_fragment & (l4 + 4 <= ends)
+    o = l4[has_ports]
+    packets['sport'][has_ports] = byte(o) << 8 | byte(o + 1)
+    packets['dport'][has_ports] = byte(o + 2) << 8 | byte(o + 3)
+    if dns_payloads is not None:
+        dns = np.flatnonzero((proto == 17) & (packets['sport'] == 53) & (l4 + 8 < ends))
+        dns_payloads.extend(buf[start:end] for start, end in zip((l4[dns] + 8).tolist(), ends[dns].tolist()))
+    return packets, non_ip_bytes
+
+
+def read_packets(path, chunk_size=64 * 1024 * 1024, dns_payloads=None):
+    """
+    Yield (PACKET_DTYPE array, non-IP bytes) per chunk of a capture file.
+    :param dns_payloads: Optional list receiving the DNS responses of each chunk (see extract_headers).
+    """
+    for batch in iter_records(path, chunk_size):
+        yield extract_headers(*batch, dns_payloads=dns_payloads)
+
+
+def _split_address(addresses):
+    words = np.ascontiguousarray(addresses).view('>u8').reshape(-1, 2)
+    return words[:, 0].astype(np.uint64), words[:, 1].astype(np.uint64)
+
+
+def _network_masks(cidr):
+    network = ipaddress.ip_network(cidr, strict=False)
+    if network.version == 4:
+        address = int(ipaddress.IPv6Address(f'::ffff:{network.network_address}'))
+        prefix = 96 + network.prefixlen
+    else:
+        address = int(network.network_address)
+        prefix = network.prefixlen
+    mask = ((1 << 128) - 1) ^ ((1 << (128 - prefix)) - 1)
+    return address >> 64, address & (2 ** 64 - 1), mask >> 64, mask & (2 ** 64 - 1)
+
+
+def format_address(hi, lo):
+    """
+    Render an address split into two 64-bit words as a string.
+    """
+    address = ipaddress.IPv6Address((int(hi) << 64) | int(lo))
+    return str(address.ipv4_mapped or address)
+
+
+def format_endpoint(hi, lo, port):
+    """
+    Render address:port, bracketing IPv6 addresses.
+    """
+    address = format_address(hi, lo)
+    return f"[{address}]:{port}" if ':' in address else f"{address}:{port}"
+
+
+def _group_sum(keys, *weights):
+    """
+    Vectorized group-by over the integer fields of a structured array (or a
+    plain integer array): unique keys and the per-key sum of every weight array.
+    """
+    if len(keys) == 0:
+        return keys, [np.zeros(0) for _ in weights]
+    columns = [keys[name] for name in keys.dtype.names] if keys.dtype.names else [keys]
+    order = np.lexsort(columns[::-1])
+    change = np.zeros(len(order), dtype=bool)
+    change[0] = True
+    for column in columns:
+        ordered = column[order]
+        change[1:] |= ordered[1:] != ordered[:-1]
+    starts = np.flatnonzero(change)
+    sums = [np.add.reduceat(w[order], starts) for w in weights]
+    return keys[order[starts]], sums
+
+
+class PcapAnalyzer:
+    def __init__(self, local_networks=DEFAULT_LOCAL_NETWORKS, bucket_seconds=60):
+        """
+        Aggregate traffic of capture files per flow, port, remote host and time bucket.
+        :param local_networks: CIDRs considered local; the other endpoint is the remote one.
+        :param bucket_seconds: Width of the time buckets in seconds.
+        """
+        self.local_masks = [_network_masks(cidr) for cidr in local_networks]
+        self.bucket_seconds = bucket_seconds
+        self.packet_count = 0
+        self.total_bytes = 0
+        self.non_ip_bytes = 0
+        # Hostnames from the capture's DNS responses, for the hostname category
+        # rules. Offline, the latest answer for an address wins whatever its TTL.
+        self.dns_cache = DnsCache()
+        self._partials = {'flows': [], 'hosts': [], 'ports': [], 'buckets': []}
+
+    def _is_local(self, addresses):
+        hi, lo = _split_address(addresses)
+        local = np.zeros(len(addresses), dtype=bool)
+        for net_hi, net_lo, mask_hi, mask_lo in self.local_masks:
+            local |= ((hi & np.uint64(mask_hi)) == np.uint64(net_hi)) & \
+                     ((lo & np.uint64(mask_lo)) == np.uint64(net_lo))
+        return local
+
+    def add_packets(self, packets):
+        """
+        Aggregate one chunk of packets into partial group-by results.
+        """
+        if len(packets) == 0:
+            return
+        self.packet_count += len(packets)
+        length = packets['length'].astype(np.float64)
+        self.total_bytes += int(length.sum())
+
+        outbound = self._is_local(packets['src'])
+        sent = np.where(outbound, length, 0.0)
+        received = length - sent
+
+        src_hi, src_lo = _split_address(packets['src'])
+        dst_hi, dst_lo = _split_address(packets['dst'])
+        flows = np.zeros(len(packets), dtype=FLOW_DTYPE)
+        flows['local_hi'] = np.where(outbound, src_hi, dst_hi)
+        flows['local_lo'] = np.where(outbound, src_lo, dst_lo)
+        flows['remote_hi'] = np.where(outbound, dst_hi, src_hi)
+        flows['remote_lo'] = np.where(outbound, dst_lo, src_lo)
+        flows['lport'] = np.where(outbound, packets['sport'], packets['dport'])
+        flows['rport'] = np.where(outbound, packets['dport'], packets['sport'])
+        flows['proto'] = packets['proto']
+        ones = np.ones(len(packets))
+
+        self._partials['flows'].append(_group_sum(flows, sent, received, ones))
+        self._partials['hosts'].append(_group_sum(flows[['remote_hi', 'remote_lo']], sent, received, ones))
+        self._partials['ports'].append(_group_sum(flows[['rport', 'proto']], sent, received, ones))
+        buckets = np.floor(packets['ts'] / self.bucket_seconds).astype(np.int64)
+        self._partials['buckets'].append(_group_sum(buckets, sent, received, ones))
+
+    def analyze(self, path, chunk_size=64 * 1024 * 1024):
+        """
+        Read a capture file chunk by chunk and aggregate it.
+        """
+        dns_payloads = []
+        for packets, non_ip_bytes in read_packets(path, chunk_size, dns_payloads):
+            self.non_ip_bytes += non_ip_bytes
+            self.total_bytes += non_ip_bytes
+            self.add_packets(packets)
+            for payload in dns_payloads:
+                self.dns_cache.learn_payload(payload, 0)
+            dns_payloads.clear()
+
+    def result(self, name):
+        """
+        Merge the partial results of one aggregation.
+        :param name: 'flows', 'hosts', 'ports' or 'buckets'.
+        :return: (keys, sent, received, packets) arrays.
+        """
+        partials = self._partials[name]
+        if not partials:
+            return np.array([]), np.array([]), np.array([]), np.array([])
+        keys = np.concatenate([p[0] for p in partials])
+        weights = [np.concatenate([p[1][i] for p in partials]) for i in range(3)]
+        unique, sums = _group_sum(keys, *weights)
+        self._partials[name] = [(unique, sums)]
+        return unique, sums[0], sums[1], sums[2]
+
+    def top(self, name, top_n=10):
+        """
+        Return the top N rows of an aggregation by total bytes.
+        """
+        keys, sent, received, packets = self.result(name)
+        order = np.argsort(-(sent + received), kind='stable')[:top_n]
+        return [(keys[i], sent[i], received[i], int(packets[i])) for i in order]
+
+    def categories(self, rules, ranges):
+        """
+        Usage per traffic category. Flows are classified as TrafficCategorizer
+        does: the published IP range of the remote address, then the hostname
+        rules on the name it was resolved from in the capture, then CIDR and
+        port rules; unmatched flows count as text.
+        :param rules: CategoryRules.
+        :param ranges: IpRanges.
+        :return: List of (category, sent, received, packets), largest first.
+        """
+        keys, sent, received, packets = self.result('flows')
+        if not len(keys):
+            return []
+        hosts, host_index = np.unique(keys[['remote_hi', 'remote_lo']], return_inverse=True)
+        host_categories = []
+        for hi, lo in zip(hosts['remote_hi'].tolist(), hosts['remote_lo'].tolist()):
+            address = format_address(hi, lo)
+            category = ranges.category(address)
+            if category is None:
+                hostname = self.dns_cache.lookup(address, 0)
+                category = rules.match_hostname(hostname) if hostname else None
+            host_categories.append(category or rules.match_address(address))
+
+        totals = {}
+        for i, (host, proto, rport) in enumerate(zip(host_index.tolist(), keys['proto'].tolist(),
+                                                     keys['rport'].tolist())):
+            category = host_categories[host] or rules.match_port(proto, rport) or 'text'
+            entry = totals.setdefault(category, [0.0, 0.0, 0])
+            entry[0] += sent[i]
+            entry[1] += received[i]
+            entry[2] += int(packets[i])
+        rows = [(category, *entry) for category, entry in totals.items()]
+        rows.sort(key=lambda row: row[1] + row[2], reverse=True)
+        return rows
+
+
+def _mb(value):
+    return f"{value / (1024 * 1024):.2f} MB"
+
+
+def print_report(analyzer, top_n=10, rules=None, ranges=None):
+    """
+    Print the aggregations with the same Sent/Received MB grid used by process_usage.py.
+    :param rules: CategoryRules; with ranges, adds the usage per category.
+    :param ranges: IpRanges.
+    """
+    from tabulate import tabulate
+
+    rows = []
+    for key, sent, received, packets in analyzer.top('flows', top_n):
+        proto = PROTO_NAMES.get(int(key['proto']), str(key['proto']))
+        rows.append([proto, format_endpoint(key['local_hi'], key['local_lo'], key['lport']),
+                     format_endpoint(key['remote_hi'], key['remote_lo'], key['rport']),
+                     packets, _mb(sent), _mb(received)])
+    print("\nTop flows")
+    print(tabulate(rows, headers=["Proto", "Local", "Remote", "Packets", "Sent", "Received"], tablefmt="grid"))
+
+    rows = [[format_address(key['remote_hi'], key['remote_lo']), packets, _mb(sent), _mb(received)]
+            for key, sent, received, packets in analyzer.top('hosts', top_n)]
+    print("\nTop remote hosts")
+    print(tabulate(rows, headers=["Remote Host", "Packets", "Sent", "Received"], tablefmt="grid"))
+
+    rows = [[key['rport'], PROTO_NAMES.get(int(key['proto']), str(key['proto'])), packets, _mb(sent), _mb(received)]
+            for key, sent, received, packets in analyzer.top('ports', top_n)]
+    print("\nTop remote ports")
+    print(tabulate(rows, headers=["Port", "Proto", "Packets", "Sent", "Received"], tablefmt="grid"))
+
+    if rules is not None and ranges is not None:
+        rows = [[category.capitalize(), packets, _mb(sent), _mb(received)]
+                for category, sent, received, packets in analyzer.categories(rules, ranges)]
+        print("\nUsage per category")
+        print(tabulate(rows, headers=["Category", "Packets", "Sent", "Received"], tablefmt="grid"))
+
+    # The busiest buckets, in time order
+    buckets = sorted(analyzer.top('buckets', top_n), key=lambda row: row[0])
+    rows = [[time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(key * analyzer.bucket_seconds)),
+             packets, _mb(sent), _mb(received)]
+            for key, sent, received, packets in buckets]
+    print(f"\nBusiest {len(rows)} of {len(analyzer.result('buckets')[0])} {analyzer.bucket_seconds}s buckets")
+    print(tabulate(rows, headers=["Start", "Packets", "Sent", "Received"], tablefmt="grid"))
+
+    print(f"\nPackets: {analyzer.packet_count} | Total: {_mb(analyzer.total_bytes)} | Non-IP: {_mb(analyzer.non_ip_bytes)}")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Offline pcap/pcapng bandwidth analysis')
+    parser.add_argument('files', nargs='+', help='Capture files to analyze')
+    parser.add_argument('-n', '--top', type=int, default=10,
+                        help='Number of rows per table')
+    parser.add_argument('-b', '--bucket', type=int, default=60,
+                        help='Time bucket width in seconds')
+    parser.add_argument('-l', '--local-net', action='append',
+                        help='Local network CIDR (repeatable, defaults to private ranges)')
+    parser.add_argument('--chunk-mb', type=int, default=64,
+                        help='Read size per chunk in MB')
+    parser.add_argument('--rules', type=str, default=DEFAULT_RULES_PATH,
+                        help='Category rules file')
+    parser.add_argument('--ranges', type=str, default=DEFAULT_RANGES_PATH,
+                        help='Published IP ranges file')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    analyzer = PcapAnalyzer(local_networks=args.local_net or DEFAULT_LOCAL_NETWORKS,
+                            bucket_seconds=args.bucket)
+    start = time.time()
+    for path in args.files:
+        analyzer.analyze(path, chunk_size=args.chunk_mb * 1024 * 1024)
+    rules = CategoryRules.load(args.rules)
+    ranges = IpRanges.load(args.ranges)
+    print_report(analyzer, top_n=args.top, rules=rules, ranges=ranges)
+    print(f"Analyzed in {time.time() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
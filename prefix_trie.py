@@ -0,0 +1,153 @@
+import os
+import socket
+
+DEFAULT_RANGES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ip_ranges.conf')
+
+_FAMILIES = {4: socket.AF_INET, 16: socket.AF_INET6}
+
+
+def _pack_address(address):
+    """
+    Return the packed bytes of an IPv4/IPv6 address given as text or bytes.
+    """
+    if isinstance(address, (bytes, bytearray)):
+        return bytes(address)
+    if ':' in address:
+        return socket.inet_pton(socket.AF_INET6, address)
+    return socket.inet_pton(socket.AF_INET, address)
+
+
+class PrefixTrie:
+    def __init__(self):
+        """
+        Longest-prefix-match table for IPv4 and IPv6 networks.
+
+        Each family is a multibit trie consuming one address byte per level:
+        a node holds 256 slots, and a prefix ending inside a level is expanded
+        over the slots it covers, keeping the longest prefix per slot. A lookup
+        therefore visits at most prefix length / 8 nodes (4 for IPv4, 16 for
+        IPv6) however many prefixes are loaded.
+        """
+        self._roots = {4: self._node(), 16: self._node()}
+        self._defaults = {4: None, 16: None}  # value of a /0 route
+        self.size = 0
+
+    @staticmethod
+    def _node():
+        # [children per byte value, (prefix length, value) per byte value]
+        return [[None] * 256, [None] * 256]
+
+    def __len__(self):
+        return self.size
+
+    def insert(self, network, value):
+        """
+        Map a network to a value. When the same network is inserted twice the
+        first value is kept.
+        :param network: 'address/length' string, or a bare address for a host route.
+        """
+        address, _, length = network.partition('/')
+        packed = _pack_address(address)
+        width = len(packed)
+        length = int(length) if length else width * 8
+        if not 0 <= length <= width * 8:
+            raise ValueError(f"Invalid prefix length in '{network}'")
+        self.size += 1
+        if length == 0:
+            if self._defaults[width] is None:
+                self._defaults[width] = (0, value)
+            return
+
+        level = (length - 1) // 8
+        node = self._roots[width]
+        for byte in packed[:level]:
+            children = node[0]
+            if children[byte] is None:
+                children[byte] = self._node()
+            node = children[byte]
+
+        span = 1 << (8 - (length - level * 8))
+        first = packed[level] & ~(span - 1) & 0xff
+        slots = node[1]
+        for slot in range(first, first + span):
+            current = slots[slot]
+            if current is None or current[0] < length:
+                slots[slot] = (length, value)
+
+    def lookup(self, address, default=None):
+        """
+        Return the value of the longest prefix containing address.
+        :param address: IPv4/IPv6 address as text or packed bytes.
+        """
+        try:
+            packed = _pack_address(address)
+            node = self._roots[len(packed)]
+            best = self._defaults[len(packed)]
+        except (OSError, KeyError):
+            return default
+        for byte in packed:
+            entry = node[1][byte]
+            if entry is not None:
+                best = entry
+            node = node[0][byte]
+            if node is None:
+                break
+        return best[1] if best is not None else default
+
+    def __contains__(self, address):
+        return self.lookup(address) is not None
+
+
+class IpRanges:
+    def __init__(self, trie=None):
+        """
+        Published address ranges mapped to a traffic category and an owner.
+        """
+        self.trie = trie if trie is not None else PrefixTrie()
+        self.categories = []
+
+    def __len__(self):
+        return len(self.trie)
+
+    def add(self, network, category=None, owner=None):
+        if category and category not in self.categories:
+            self.categories.append(category)
+        self.trie.insert(network, (category, owner))
+
+    @classmethod
+    def load(cls, path=DEFAULT_RANGES_PATH):
+        """
+        Read a ranges file: one '<network> <category|-> [owner]' entry per line,
+        '#' comments. A missing file yields an empty table.
+        """
+        ranges = cls()
+        if not os.path.exists(path):
+            return ranges
+        with open(path) as f:
+            for number, line in enumerate(f, 1):
+                fields = line.split('#', 1)[0].split(None, 2)
+                if not fields:
+                    continue
+                if len(fields) < 2:
+                    raise ValueError(f"{path}:{number}: expected '<network> <category|-> [owner]'")
+                category = None if fields[1] == '-' else fields[1]
+                owner = fields[2].strip() if len(fields) > 2 else None
+                try:
+                    ranges.add(fields[0], category, owner)
+                except (OSError, ValueError) as e:
+                    raise ValueError(f"{path}:{number}: {e}")
+        return ranges
+
+    def category(self, address):
+        """
+        Return the category of the most specific range containing address, or None.
+        """
+        entry = self.trie.lookup(address)
+        return entry[0] if entry is not None else None
+
+    def owner(self, address):
+        """
+        Return the owner of the most specific range containing address, or None.
+        """
+        entry = self.trie.lookup(address)
+        return entry[1] if entry is not None else None
@@ -0,0 +1,279 @@
+import os
+import socket
+import struct
+import time
+
+IPPROTO_TCP = 6
+IPPROTO_UDP = 17
+
+# /proc/net table -> (protocol, address family)
+PROC_NET_TABLES = {
+    'tcp': (IPPROTO_TCP, socket.AF_INET),
+    'tcp6': (IPPROTO_TCP, socket.AF_INET6),
+    'udp': (IPPROTO_UDP, socket.AF_INET),
+    'udp6': (IPPROTO_UDP, socket.AF_INET6),
+}
+WILDCARDS = ('0.0.0.0', '::')
+
+_address_cache = {}  # hex address from /proc/net -> text address
+
+
+def _normalize(address):
+    """
+    Strip the IPv4-mapped prefix so dual-stack sockets match IPv4 packets.
+    """
+    return address[7:] if address.startswith('::ffff:') and '.' in address else address
+
+
+def decode_address(text, family):
+    """
+    Decode a /proc/net address such as '0100007F:0035' into (address, port).
+    Addresses are stored as native-endian 32-bit words, hence the re-packing.
+    """
+    host, _, port = text.partition(':')
+    address = _address_cache.get(host)
+    if address is None:
+        words = [int(host[i:i + 8], 16) for i in range(0, len(host), 8)]
+        address = _normalize(socket.inet_ntop(family, struct.pack(f'={len(words)}I', *words)))
+        if len(_address_cache) < 65536:
+            _address_cache[host] = address
+    return address, int(port, 16)
+
+
+def parse_proc_net(path, proto, family):
+    """
+    Yield (proto, local address, local port, remote address, remote port, inode)
+    for every socket listed in a /proc/net/{tcp,tcp6,udp,udp6} table.
+    """
+    try:
+        with open(path) as f:
+            lines = f.read().splitlines()[1:]
+    except OSError:
+        return
+    for line in lines:
+        fields = line.split()
+        if len(fields) < 10 or fields[9] == '0':
+            continue
+        local, lport = decode_address(fields[1], family)
+        remote, rport = decode_address(fields[2], family)
+        yield proto, local, lport, remote, rport, int(fields[9])
+
+
+class SocketTable:
+    def __init__(self):
+        """
+        Socket endpoints -> socket inode (or any owner key), indexed for packet lookups.
+        """
+        self.connections = {}  # (proto, local, lport, remote, rport) -> inode
+        self.bound = {}  # (proto, local, lport) -> inode, for unconnected and listening sockets
+        self.wildcard = {}  # (proto, lport) -> inode, for sockets bound to every address
+
+    def add(self, proto, local, lport, remote, rport, inode):
+        if rport:
+            self.connections[(proto, local, lport, remote, rport)] = inode
+        elif local in WILDCARDS:
+            self.wildcard.setdefault((proto, lport), inode)
+        else:
+            self.bound.setdefault((proto, local, lport), inode)
+
+    def find(self, proto, local, lport, remote, rport):
+        """
+        Return the inode of the socket carrying a packet between local and remote.
+        """
+        inode = self.connections.get((proto, local, lport, remote, rport))
+        if inode is None:
+            inode = self.bound.get((proto, local, lport))
+            if inode is None:
+                inode = self.wildcard.get((proto, lport))
+        return inode
+
+    def inodes(self):
+        return set(self.connections.values()) | set(self.bound.values()) | set(self.wildcard.values())
+
+
+class ProcSocketMapper:
+    def __init__(self, proc='/proc', min_interval=1.0, scan_budget=20000):
+        """
+        Map packets to PIDs on Linux from /proc without walking every
+        process's fds on every refresh.
+
+        The socket tables are re-read on each refresh (one read per
+        /proc/net file). Inode owners are cached between refreshes, and
+        /proc/<pid>/fd is only rescanned for new PIDs, PIDs whose open fd count
+        changed (kernels reporting it as the fd directory size), or, up to
+        scan_budget fds per refresh, to find sockets whose owner is still
+        unknown.
+        :param min_interval: Minimum seconds between refreshes.
+        :param scan_budget: fd links read per refresh when searching for unknown owners.
+        """
+        self.proc = proc
+        self.min_interval = min_interval
+        self.scan_budget = scan_budget
+        self.table = SocketTable()
+        self.owners = {}  # socket inode -> pid
+        self._pid_fds = {}  # pid -> (fd count or None, socket inodes)
+        self._unreadable = set()
+        self._search_cursor = -1  # last PID scanned by the budgeted owner search
+        self._last_refresh = 0.0
+        self.scanned_fds = 0
+
+    def refresh(self, now=None):
+        now = time.time() if now is None else now
+        self._last_refresh = now
+        table = SocketTable()
+        for name, (proto, family) in PROC_NET_TABLES.items():
+            for entry in parse_proc_net(os.path.join(self.proc, 'net', name), proto, family):
+                table.add(*entry)
+        self.table = table
+        self._update_owners(table.inodes())
+
+    def _update_owners(self, live_inodes):
+        pids = set()
+        for entry in os.scandir(self.proc):
+            if entry.name.isdigit():
+                pids.add(int(entry.name))
+        for pid in list(self._pid_fds):
+            if pid not in pids:
+                for inode in self._pid_fds.pop(pid)[1]:
+                    if self.owners.get(inode) == pid:
+                        del self.owners[inode]
+        self._unreadable &= pids
+
+        # Rescan new PIDs and PIDs whose fd count changed
+        unchanged = []
+        for pid in pids:
+            if pid in self._unreadable:
+                continue
+            count = self._fd_count(pid)
+            cached = self._pid_fds.get(pid)
+            if cached is None or (count is not None and cached[0] != count):
+                self._scan(pid, count)
+            else:
+                unchanged.append(pid)
+
+        # Sockets can be replaced without changing the fd count, and some
+        # kernels do not report it; search for still unknown owners within
+        # the budget. Each search resumes after the last PID scanned, so every
+        # PID is reached over successive refreshes however small the budget
+        unknown = live_inodes - self.owners.keys()
+        if unknown:
+            budget = self.scan_budget
+            cursor = self._search_cursor
+            unchanged.sort(key=lambda pid: (pid <= cursor, pid))
+            for pid in unchanged:
+                if budget <= 0 or not unknown:
+                    break
+                budget -= self._scan(pid, self._pid_fds[pid][0])
+                unknown -= self.owners.keys()
+                self._search_cursor = pid
+
+        for inode in list(self.owners):
+            if inode not in live_inodes:
+                del self.owners[inode]
+
+    def _fd_count(self, pid):
+        """
+        Number of open fds of a PID from the size of its fd directory, or None
+        on kernels that report 0 there.
+        """
+        try:
+            size = os.stat(f'{self.proc}/{pid}/fd').st_size
+        except OSError:
+            return None
+        return size or None
+
+    def _scan(self, pid, count):
+        """
+        Read the fd links of one PID and record the sockets it owns.
+        :return: Number of fd links read.
+        """
+        inodes = set()
+        read = 0
+        try:
+            with os.scandir(f'{self.proc}/{pid}/fd') as entries:
+                for entry in entries:
+                    read += 1
+                    try:
+                        target = os.readlink(entry.path)
+                    except OSError:
+                        continue
+                    if target.startswith('socket:['):
+                        inodes.add(int(target[8:-1]))
+        except PermissionError:
+            self._unreadable.add(pid)
+            return read
+        except OSError:
+            return read
+        self.scanned_fds += read
+        self._pid_fds[pid] = (count, inodes)
+        for inode in inodes:
+            self.owners[inode] = pid
+        return read
+
+    def lookup(self, proto, src, sport, dst, dport, now=None):
+        """
+        Return (pid, outgoing) for a packet, or None when no local socket
+        carries it. outgoing is True when src is the local side.
+        """
+        now = time.time() if now is None else now
+        if now - self._last_refresh >= self.min_interval:
+            self.refresh(now)
+        src, dst = _normalize(src), _normalize(dst)
+        for local, lport, remote, rport, outgoing in ((src, sport, dst, dport, True),
+                                                     (dst, dport, src, sport, False)):
+            inode = self.table.find(proto, local, lport, remote, rport)
+            if inode is not None:
+                pid = self.owners.get(inode)
+                if pid is not None:
+                    return pid, outgoing
+        return None
+
+
+class PsutilSocketMapper:
+    def __init__(self, min_interval=1.0):
+        """
+        Fallback for systems without /proc (macOS): the same lookups over a
+        psutil.net_connections() snapshot taken at most every min_interval.
+        """
+        self.min_interval = min_interval
+        self.table = SocketTable()
+        self._last_refresh = 0.0
+
+    def refresh(self, now=None):
+        import psutil
+
+        self._last_refresh = time.time() if now is None else now
+        table = SocketTable()
+        try:
+            connections = psutil.net_connections(kind='inet')
+        except psutil.AccessDenied:
+            connections = []
+        for conn in connections:
+            if conn.pid is None or not conn.laddr:
+                continue
+            proto = IPPROTO_TCP if conn.type == socket.SOCK_STREAM else IPPROTO_UDP
+            remote, rport = (conn.raddr.ip, conn.raddr.port) if conn.raddr else ('', 0)
+            table.add(proto, _normalize(conn.laddr.ip), conn.laddr.port, _normalize(remote), rport, conn.pid)
+        self.table = table
+
+    def lookup(self, proto, src, sport, dst, dport, now=None):
+        now = time.time() if now is None else now
+        if now - self._last_refresh >= self.min_interval:
+            self.refresh(now)
+        src, dst = _normalize(src), _normalize(dst)
+        pid = self.table.find(proto, src, sport, dst, dport)
+        if pid is not None:
+            return pid, True
+        pid = self.table.find(proto, dst, dport, src, sport)
+        if pid is not None:
+            return pid, False
+        return None
+
+
+def socket_mapper(min_interval=1.0):
+    """
+    Return the /proc mapper on Linux, otherwise the psutil fallback.
+    """
+    if os.path.exists('/proc/net/tcp'):
+        return ProcSocketMapper(min_interval=min_interval)
+    return PsutilSocketMapper(min_interval=min_interval)
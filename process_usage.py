@@ -1,63 +1,114 @@
 import time
+import argparse
 import psutil
-from scapy.all import sniff
-from collections import defaultdict
 import threading
-from tabulate import tabulate
+from dns_cache import DnsCache
+from net_utils import local_addresses
+from proc_sockets import socket_mapper
+from ranking import RateRanker, SORT_MODES, WINDOWS
+from sampling import PacketSampler, SampledEstimates
+from sketches import RemoteTrafficSketch
 
-# Global dictionary to store bandwidth usage per process
-process_bandwidth = defaultdict(lambda: {'sent': 0, 'received': 0})
+# Incremental ranking of bandwidth usage per process; processes without
+# traffic for 5 minutes (exited ones included) are forgotten
+process_bandwidth = RateRanker(idle_timeout=300)
+
+# Bounded-memory heavy hitters for remote hosts and ports
+remote_traffic = RemoteTrafficSketch()
+local_ips = local_addresses()
+
+# Hostnames learned from DNS responses, and the last remote peer per process
+dns_cache = DnsCache()
+process_peers = {}
+
+# Packet -> owning PID, from socket tables refreshed at most once per second
+socket_owners = socket_mapper()
+
+# 1-in-N packet sampling; the default inspects every packet
+sampler = PacketSampler()
+process_estimates = SampledEstimates()
 
 def packet_callback(packet):
+    weight = sampler.sample()
+    if not weight:
+        return
+    start = time.perf_counter()
+    inspect_packet(packet, weight)
+    sampler.record_cost(time.perf_counter() - start)
+
+
+def inspect_packet(packet, weight=1):
+    """
+    Attribute a sampled packet, scaling its size by the sampling weight.
+    """
     if 'IP' in packet:
         src_ip = packet['IP'].src
         dst_ip = packet['IP'].dst
         packet_len = len(packet)
-
-        matched = False
-        for conn in psutil.net_connections(kind='inet'):
-            try:
-                if conn.laddr and conn.raddr:
-                    if conn.laddr.ip == src_ip:
-                        process_bandwidth[conn.pid]['sent'] += packet_len
-                        matched = True
-                    elif conn.raddr.ip == dst_ip:
-                        process_bandwidth[conn.pid]['received'] += packet_len
-                        matched = True
-            except (psutil.AccessDenied, psutil.NoSuchProcess):
-                pass
-        
-        if not matched:
+        scaled_len = packet_len * weight
+
+        # Track the remote side of the packet in the heavy-hitter sketches
+        outgoing = src_ip in local_ips
+        remote_port = 0
+        proto = sport = dport = None
+        for layer in ('TCP', 'UDP'):
+            if layer in packet:
+                proto = packet['IP'].proto
+                sport, dport = packet[layer].sport, packet[layer].dport
+                remote_port = dport if outgoing else sport
+                break
+        remote_ip = dst_ip if outgoing else src_ip
+        remote_traffic.observe(remote_ip, remote_port, scaled_len)
+        if 'UDP' in packet and packet['UDP'].sport == 53:
+            dns_cache.learn_payload(bytes(packet['UDP'].payload), time.time())
+
+        owner = socket_owners.lookup(proto, src_ip, sport, dst_ip, dport) if proto else None
+        if owner is None:
             print(f"Unmatched packet: {src_ip} -> {dst_ip}, Length: {packet_len}")
+            return
+        pid, sent = owner
+        if sent:
+            process_bandwidth.add(pid, sent=scaled_len)
+        else:
+            process_bandwidth.add(pid, received=scaled_len)
+        process_estimates.add(pid, packet_len, weight)
+        process_peers[pid] = remote_ip
 
 
 def monitor_traffic(interface='eth0'):
     """
     Monitor packets on the given interface.
     """
+    from scapy.all import sniff
+
     print(f"Starting packet capture on {interface}...")
     sniff(prn=packet_callback, iface=interface, store=False)
 
 
-def monitor_top_processes(interval=5, top_n=5):
+def monitor_top_processes(interval=5, top_n=5, sort_mode='rate', window=WINDOWS[0]):
     """
     Monitor and display the top N processes by bandwidth usage every interval seconds.
+    :param sort_mode: One of 'rate', 'total', 'sent' or 'received'.
+    :param window: Averaging window in seconds used by the 'rate' sort mode.
     """
-    print(f"Monitoring top {top_n} processes by bandwidth usage every {interval} seconds...")
-    
+    from tabulate import tabulate
+
+    print(f"Monitoring top {top_n} processes by {sort_mode} every {interval} seconds...")
+
     while True:
         time.sleep(interval)
 
-        # Sort processes by bandwidth usage
-        sorted_bandwidth = sorted(
-            process_bandwidth.items(),
-            key=lambda x: x[1]['sent'] + x[1]['received'],
-            reverse=True
-        )[:top_n]
+        for pid in process_bandwidth.expire():
+            process_estimates.discard(pid)
+            process_peers.pop(pid, None)
+
+        # Rank processes incrementally instead of sorting every entry
+        top_bandwidth = process_bandwidth.top(top_n, mode=sort_mode, window=window)
 
         # Prepare data for table
+        now = time.time()
         table_data = []
-        for pid, usage in sorted_bandwidth:
+        for pid, usage in top_bandwidth:
             proc_name = None
             try:
                 proc_name = psutil.Process(pid).name()
@@ -66,28 +117,65 @@ def monitor_top_processes(interval=5, top_n=5):
 
             sent = usage['sent'] / (1024 * 1024)  # Convert to MB
             received = usage['received'] / (1024 * 1024)  # Convert to MB
-            table_data.append([pid, proc_name, f"{sent:.2f} MB", f"{received:.2f} MB"])
+            rates = [f"{usage['rates'][w] / 1024:.1f} KB/s" for w in WINDOWS]
+            _, margin = process_estimates.interval(pid)
+            peer = process_peers.get(pid, '')
+            peer = dns_cache.lookup(peer, now) or peer
+            table_data.append([pid, proc_name, peer, *rates, f"{sent:.2f} MB", f"{received:.2f} MB",
+                               f"±{margin / (1024 * 1024):.2f} MB"])
 
         # Print table
-        print("\n" + tabulate(table_data, headers=["PID", "Process Name", "Sent", "Received"], tablefmt="grid"))
+        rate_headers = [f"{w}s" for w in WINDOWS]
+        print(f"\nSampling 1 in {sampler.rate} packets | Inspection CPU: {sampler.cpu_usage():.0%}")
+        print(tabulate(table_data, headers=["PID", "Process Name", "Remote Host", *rate_headers, "Sent", "Received", "95% CI"], tablefmt="grid"))
+        sampler.adjust()
+
+        # Print remote heavy hitters; counts overestimate by at most the shown error
+        host_data = [[host, dns_cache.lookup(host, now) or '', f"{count / (1024 * 1024):.2f} MB", f"±{error / (1024 * 1024):.2f} MB"]
+                     for host, count, error in remote_traffic.hosts.top(top_n)]
+        port_data = [[port, f"{count / (1024 * 1024):.2f} MB", f"±{error / (1024 * 1024):.2f} MB"]
+                     for port, count, error in remote_traffic.ports.top(top_n)]
+        print(f"Unique remote hosts this interval: ~{remote_traffic.unique_hosts():.0f}")
+        print(tabulate(host_data, headers=["Remote Host", "Hostname", "Usage", "Error"], tablefmt="grid"))
+        print(tabulate(port_data, headers=["Remote Port", "Usage", "Error"], tablefmt="grid"))
+        remote_traffic.end_interval()
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Per-process bandwidth usage')
+    parser.add_argument('-I', '--interface', default='en2',
+                        help="Interface to capture on (e.g., 'Wi-Fi', 'en0' for macOS)")
+    parser.add_argument('-r', '--refresh', type=int, default=5,
+                        help='Refresh rate in seconds')
+    parser.add_argument('-n', '--top', type=int, default=5,
+                        help='Number of processes to show')
+    parser.add_argument('-s', '--sort', choices=SORT_MODES, default='rate',
+                        help='Sort by current rate or by cumulative totals')
+    parser.add_argument('-w', '--window', type=int, choices=WINDOWS, default=WINDOWS[0],
+                        help='Averaging window in seconds for the rate sort mode')
+    parser.add_argument('--sample', type=int, default=1,
+                        help='Inspect 1 in N packets and scale the estimates up')
+    parser.add_argument('--sample-mode', choices=('count', 'random'), default='count',
+                        help='Sample every Nth packet or each packet with probability 1/N')
+    parser.add_argument('--cpu-budget', type=float,
+                        help='Fraction of one core for packet inspection; adjusts N automatically')
+    return parser.parse_args()
 
 def main():
     """
     Main function to run the combined packet monitoring and bandwidth display.
     """
+    global sampler
+    args = parse_arguments()
+    sampler = PacketSampler(rate=args.sample, mode=args.sample_mode, cpu_budget=args.cpu_budget)
     try:
-        # Set interface for packet monitoring
-        interface = 'en2'  # Replace with your interface (e.g., 'Wi-Fi', 'en0' for macOS)
-
         # Start packet sniffing in a separate thread
-        sniff_thread = threading.Thread(target=monitor_traffic, args=(interface,))
+        sniff_thread = threading.Thread(target=monitor_traffic, args=(args.interface,))
         sniff_thread.daemon = True
         sniff_thread.start()
 
         # Start monitoring top processes
-        interval = 5
-        top_n = 5
-        monitor_top_processes(interval=interval, top_n=top_n)
+        monitor_top_processes(interval=args.refresh, top_n=args.top,
+                              sort_mode=args.sort, window=args.window)
     except KeyboardInterrupt:
         print("\nMonitoring stopped by user.")
 
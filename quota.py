@@ -0,0 +1,244 @@
+import argparse
+import calendar
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+DEFAULT_QUOTAS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'quotas.conf')
+DEFAULT_STATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'quota_state.json')
+
+PERIODS = ('monthly', 'daily', 'rolling')
+RETENTION_HOURS = 62 * 24  # enough for any monthly window plus the previous one
+
+
+class Quota:
+    def __init__(self, name, period, limit, start=None, alerts=(80, 90, 100)):
+        """
+        One usage quota.
+        :param period: 'monthly' (calendar billing month), 'daily' or 'rolling'.
+        :param limit: Limit in MB for one window.
+        :param start: Day of the month a monthly window starts (1-31, clamped to
+                      the month's length), hour of the day a daily window starts
+                      (0-23), or length in hours of a rolling window (default 24).
+        :param alerts: Percentages of the limit at which to alert.
+        """
+        if period not in PERIODS:
+            raise ValueError(f"unknown quota period '{period}', expected one of {', '.join(PERIODS)}")
+        self.name = name
+        self.period = period
+        self.limit = float(limit)
+        if start is None:
+            start = {'monthly': 1, 'daily': 0, 'rolling': 24}[period]
+        self.start = int(start)
+        self.alerts = tuple(sorted(float(a) for a in alerts))
+
+    def window(self, now):
+        """
+        Return (start, end) timestamps of the window containing now, in local time.
+        """
+        if self.period == 'rolling':
+            return now - self.start * 3600, now
+        today = datetime.fromtimestamp(now)
+        if self.period == 'daily':
+            start = today.replace(hour=self.start, minute=0, second=0, microsecond=0)
+            if start > today:
+                start -= timedelta(days=1)
+            return start.timestamp(), (start + timedelta(days=1)).timestamp()
+
+        def month_start(year, month):
+            day = min(self.start, calendar.monthrange(year, month)[1])
+            return datetime(year, month, day)
+
+        start = month_start(today.year, today.month)
+        if start > today:
+            year, month = (today.year, today.month - 1) if today.month > 1 else (today.year - 1, 12)
+            start = month_start(year, month)
+        year, month = (start.year, start.month + 1) if start.month < 12 else (start.year + 1, 1)
+        return start.timestamp(), month_start(year, month).timestamp()
+
+
+def load_quotas(path=DEFAULT_QUOTAS_PATH):
+    """
+    Read a quotas file: one '<name> <monthly|daily|rolling> <limit MB> [start|-] [alert%,...]'
+    entry per line, '#' comments. A missing file yields no quotas.
+    """
+    quotas = []
+    if not os.path.exists(path):
+        return quotas
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            fields = line.split('#', 1)[0].split()
+            if not fields:
+                continue
+            if len(fields) < 3:
+                raise ValueError(f"{path}:{number}: expected '<name> <period> <limit MB> [start|-] [alert%,...]'")
+            try:
+                start = None if len(fields) < 4 or fields[3] == '-' else int(fields[3])
+                alerts = [float(a) for a in fields[4].split(',')] if len(fields) > 4 else (80, 90, 100)
+                quotas.append(Quota(fields[0], fields[1], float(fields[2]), start, alerts))
+            except ValueError as e:
+                raise ValueError(f"{path}:{number}: {e}")
+    return quotas
+
+
+class QuotaTracker:
+    def __init__(self, quotas, state_path=DEFAULT_STATE_PATH, save_interval=60.0):
+        """
+        Usage per quota window, kept across restarts.
+
+        Usage is stored as hourly prefix sums: prefix[i] is the usage recorded
+        before hour (first_hour + i), and the last entry is the running total.
+        The usage of any window is then the difference of two entries, O(1)
+        however long the window. Windows are resolved to whole hours, so a
+        rolling window may include up to one extra hour.
+        :param state_path: JSON file holding the prefix sums and fired alerts.
+        :param save_interval: Minimum seconds between saves from add().
+        """
+        self.quotas = quotas
+        self.state_path = state_path
+        self.save_interval = save_interval
+        self.first_hour = None  # set by the first add()
+        self.prefix = [0.0]
+        self.fired = {}  # quota name -> [window start, fired alert percentages]
+        self._last_save = time.time()
+        self.load()
+
+    def load(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        with open(self.state_path) as f:
+            state = json.load(f)
+        self.first_hour = state['first_hour']
+        self.prefix = state['prefix']
+        self.fired = state.get('fired', {})
+
+    def save(self):
+        """
+        Write the state atomically, so a crash never leaves a truncated file.
+        """
+        if not self.state_path:
+            return
+        temporary = f"{self.state_path}.tmp"
+        with open(temporary, 'w') as f:
+            json.dump({'first_hour': self.first_hour, 'prefix': self.prefix, 'fired': self.fired}, f)
+        os.replace(temporary, self.state_path)
+        self._last_save = time.time()
+
+    def _advance(self, hour):
+        """
+        Extend the prefix sums so the last entry covers hour, carrying the
+        total over hours with no samples, and drop hours past the retention.
+        """
+        if self.first_hour is None:
+            self.first_hour = hour
+        missing = hour + 1 - (self.first_hour + len(self.prefix) - 1)
+        if missing > 0:
+            self.prefix.extend([self.prefix[-1]] * missing)
+        excess = len(self.prefix) - RETENTION_HOURS - 1
+        if excess > 0:
+            del self.prefix[:excess]
+            self.first_hour += excess
+
+    def _before(self, hour):
+        """
+        Usage recorded before hour (clamped to the retained history).
+        """
+        if self.first_hour is None:
+            return 0.0
+        index = min(max(hour - self.first_hour, 0), len(self.prefix) - 1)
+        return self.prefix[index]
+
+    def usage_between(self, start, end):
+        """
+        Usage in MB between two timestamps, to whole hours.
+        """
+        return self._before(int(-(-end // 3600))) - self._before(int(start // 3600))
+
+    def usage(self, quota, now=None):
+        now = time.time() if now is None else now
+        start, _ = quota.window(now)
+        return self.prefix[-1] - self._before(int(start // 3600))
+
+    def add(self, usage, now=None):
+        """
+        Record usage in MB and check every quota.
+        :return: List of (quota, percentage, usage) for alert levels newly reached.
+        """
+        now = time.time() if now is None else now
+        self._advance(int(now // 3600))
+        self.prefix[-1] += usage
+        alerts = self.check(now)
+        if alerts or now - self._last_save >= self.save_interval:
+            self.save()
+        return alerts
+
+    def check(self, now=None):
+        now = time.time() if now is None else now
+        alerts = []
+        for quota in self.quotas:
+            start, _ = quota.window(now)
+            used = self.usage(quota, now)
+            percent = used / quota.limit * 100 if quota.limit else 0.0
+            fired = self.fired.get(quota.name)
+            if fired is None or (quota.period != 'rolling' and fired[0] != start):
+                fired = self.fired[quota.name] = [start, []]
+            if quota.period == 'rolling':
+                # The window slides, so a level can be reached again after usage falls below it
+                fired[1] = [level for level in fired[1] if percent >= level]
+            for level in quota.alerts:
+                if percent >= level and level not in fired[1]:
+                    fired[1].append(level)
+                    alerts.append((quota, level, used))
+        return alerts
+
+    def status(self, now=None):
+        """
+        Return (quota, usage MB, percentage of the limit, window end) per quota.
+        """
+        now = time.time() if now is None else now
+        rows = []
+        for quota in self.quotas:
+            used = self.usage(quota, now)
+            rows.append((quota, used, used / quota.limit * 100 if quota.limit else 0.0, quota.window(now)[1]))
+        return rows
+
+
+def format_status(row):
+    quota, used, percent, end = row
+    if quota.period == 'rolling':
+        window = f"last {quota.start} h"
+    else:
+        window = f"{quota.period} until {time.strftime('%m-%d %H:%M', time.localtime(end))}"
+    return f"{quota.name:<14}{used:>10.1f} / {quota.limit:<10.0f} MB {percent:>6.1f}%  ({window})"
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Quota usage per billing window')
+    parser.add_argument('-Q', '--quotas', type=str, default=DEFAULT_QUOTAS_PATH,
+                        help='Quota definitions file')
+    parser.add_argument('--state', type=str, default=DEFAULT_STATE_PATH,
+                        help='Quota state file')
+    parser.add_argument('--import-history', type=str, default=None,
+                        help='Add the usage of a history CSV (see usage_grapher --record) to the state first')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    tracker = QuotaTracker(load_quotas(args.quotas), args.state)
+    if args.import_history:
+        from history import load_history
+
+        timestamps, incoming, outgoing = load_history(args.import_history)
+        for timestamp, usage in zip(timestamps, incoming + outgoing):
+            for quota, level, used in tracker.add(float(usage), float(timestamp)):
+                print(f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(timestamp))}: "
+                      f"{quota.name} reached {level:.0f}% ({used:.1f} MB)")
+        tracker.save()
+    for row in tracker.status():
+        print(format_status(row))
+
+
+if __name__ == "__main__":
+    main()
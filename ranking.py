@@ -0,0 +1,232 @@
+import heapq
+import threading
+import time
+
+# Averaging windows in seconds, the same 2s/10s/40s columns iftop shows
+WINDOWS = (2, 10, 40)
+
+# Sort modes understood by RateRanker.top()
+SORT_MODES = ('rate', 'total', 'sent', 'received')
+
+
+class _Entry:
+    """
+    Per-key counters: cumulative totals plus a ring of per-bucket byte counts
+    with a running sum for every averaging window.
+    """
+    __slots__ = ('sent', 'received', 'ring', 'window_sums', 'last_bucket', 'last_seen')
+
+    def __init__(self, ring_size, window_count, bucket):
+        self.sent = 0
+        self.received = 0
+        self.ring = [0] * ring_size
+        self.window_sums = [0] * window_count
+        self.last_bucket = bucket
+        self.last_seen = bucket  # bucket of the latest bytes; last_bucket also moves on reads
+
+
+class RateRanker:
+    def __init__(self, windows=WINDOWS, bucket_seconds=1.0, idle_timeout=None):
+        """
+        Incremental top-N ranking of keys (PIDs, flows, hosts...) by current
+        rate or by cumulative totals.
+
+        Adding bytes is O(1): the key is only marked dirty. A lazy max-heap is
+        kept per (mode, window) and is brought up to date when it is queried,
+        so a top-N query costs O((k + d) log n) for k results and d keys that
+        changed since that heap was last read, instead of a full sort.
+
+        :param windows: Averaging windows in seconds.
+        :param bucket_seconds: Width of one ring-buffer bucket in seconds.
+        :param idle_timeout: Seconds without bytes after which expire() forgets
+                             a key; None keeps every key.
+        """
+        self.bucket_seconds = bucket_seconds
+        self.idle_timeout = idle_timeout
+        self.windows = tuple(windows)
+        self._window_buckets = [max(1, int(round(w / bucket_seconds))) for w in self.windows]
+        self._ring_size = max(self._window_buckets)
+
+        self._entries = {}
+        self._dirty = set()
+        self._heaps = {}  # (mode, window) -> [heap, latest_seq, pending]
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def _bucket(self, now):
+        return int(now // self.bucket_seconds)
+
+    def _roll(self, entry, bucket):
+        """
+        Advance an entry's ring to the given bucket, dropping the buckets that
+        fall out of each window. Amortized O(1) per elapsed bucket.
+        """
+        gap = bucket - entry.last_bucket
+        if gap <= 0:
+            return
+        ring = entry.ring
+        size = self._ring_size
+        if gap >= size:
+            for i in range(size):
+                ring[i] = 0
+            for i in range(len(entry.window_sums)):
+                entry.window_sums[i] = 0
+        else:
+            for step in range(entry.last_bucket + 1, bucket + 1):
+                for i, span in enumerate(self._window_buckets):
+                    entry.window_sums[i] -= ring[(step - span) % size]
+                ring[step % size] = 0
+        entry.last_bucket = bucket
+
+    def add(self, key, sent=0, received=0, now=None):
+        """
+        Account bytes for a key.
+        :param key: Hashable key (PID, 5-tuple, remote host...).
+        :param sent: Bytes sent by the key.
+        :param received: Bytes received by the key.
+        :param now: Timestamp of the bytes, defaults to time.time().
+        """
+        bucket = self._bucket(time.time() if now is None else now)
+        nbytes = sent + received
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = _Entry(self._ring_size, len(self.windows), bucket)
+                self._entries[key] = entry
+            elif bucket > entry.last_bucket:
+                self._roll(entry, bucket)
+            entry.sent += sent
+            entry.received += received
+            entry.last_seen = bucket
+            if bucket == entry.last_bucket:
+                entry.ring[bucket % self._ring_size] += nbytes
+                for i in range(len(entry.window_sums)):
+                    entry.window_sums[i] += nbytes
+            self._dirty.add(key)
+
+    def remove(self, key):
+        """
+        Forget a key. Stale heap entries for it are discarded lazily.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._dirty.discard(key)
+            for _, latest, pending in self._heaps.values():
+                latest.pop(key, None)
+                pending.discard(key)
+
+    def expire(self, now=None):
+        """
+        Forget the keys that received no bytes for idle_timeout seconds.
+        :return: List of the forgotten keys.
+        """
+        if self.idle_timeout is None:
+            return []
+        horizon = self._bucket(time.time() if now is None else now) - self.idle_timeout / self.bucket_seconds
+        with self._lock:
+            idle = [key for key, entry in self._entries.items() if entry.last_seen < horizon]
+        for key in idle:
+            self.remove(key)
+        return idle
+
+    def reset(self):
+        """
+        Drop every key and heap.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._dirty.clear()
+            self._heaps.clear()
+
+    def _score(self, entry, mode, window_index, bucket):
+        if mode == 'rate':
+            self._roll(entry, bucket)
+            return entry.window_sums[window_index]
+        if mode == 'total':
+            return entry.sent + entry.received
+        if mode == 'sent':
+            return entry.sent
+        return entry.received
+
+    def _push(self, heap, latest, key, score):
+        self._seq += 1
+        latest[key] = self._seq
+        heapq.heappush(heap, (-score, self._seq, key))
+
+    def top(self, n=5, mode='rate', window=WINDOWS[0], now=None):
+        """
+        Return the n highest ranked keys.
+        :param n: Number of rows to return.
+        :param mode: One of SORT_MODES.
+        :param window: Averaging window (seconds) used by the 'rate' mode.
+        :param now: Reference timestamp for rates, defaults to time.time().
+        :return: List of (key, stats) tuples, stats as returned by stats().
+        """
+        if mode not in SORT_MODES:
+            raise ValueError(f"Unknown sort mode '{mode}', expected one of {SORT_MODES}")
+        window_index = self.windows.index(window) if mode == 'rate' else 0
+        heap_key = (mode, window if mode == 'rate' else None)
+        bucket = self._bucket(time.time() if now is None else now)
+
+        with self._lock:
+            # Hand the keys changed since the last query to every heap
+            for _, _, pending in self._heaps.values():
+                pending |= self._dirty
+            if heap_key not in self._heaps:
+                self._heaps[heap_key] = [[], {}, set(self._entries)]
+            self._dirty.clear()
+            heap, latest, pending = self._heaps[heap_key]
+
+            for key in pending:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._push(heap, latest, key, self._score(entry, mode, window_index, bucket))
+            pending.clear()
+
+            # Rates only decay between updates, so every heap score is an upper
+            # bound of the key's current score: re-score the head until it holds.
+            results = []
+            while heap and len(results) < n:
+                neg_score, seq, key = heapq.heappop(heap)
+                if latest.get(key) != seq:
+                    continue
+                entry = self._entries[key]
+                score = self._score(entry, mode, window_index, bucket)
+                if score != -neg_score:
+                    self._push(heap, latest, key, score)
+                    continue
+                results.append((neg_score, seq, key))
+            for item in results:
+                heapq.heappush(heap, item)
+
+            # Compact once stale entries outnumber live ones
+            if len(heap) > 2 * len(latest) + 64:
+                heap[:] = [item for item in heap if latest.get(item[2]) == item[1]]
+                heapq.heapify(heap)
+
+            return [(key, self._stats(self._entries[key], bucket)) for _, _, key in results]
+
+    def _stats(self, entry, bucket):
+        self._roll(entry, bucket)
+        rates = {
+            window: entry.window_sums[i] / window
+            for i, window in enumerate(self.windows)
+        }
+        return {'sent': entry.sent, 'received': entry.received, 'rates': rates}
+
+    def stats(self, key, now=None):
+        """
+        Return {'sent', 'received', 'rates': {window: bytes/s}} for a key.
+        """
+        bucket = self._bucket(time.time() if now is None else now)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            return self._stats(entry, bucket)
@@ -0,0 +1,128 @@
+import socket
+import struct
+from collections import namedtuple
+
+# Link-layer types (https://www.tcpdump.org/linktypes.html)
+LINKTYPE_NULL = 0
+LINKTYPE_ETHERNET = 1
+LINKTYPE_RAW = 101
+LINKTYPE_LOOP = 108
+LINKTYPE_LINUX_SLL = 113
+LINKTYPE_LINUX_SLL2 = 276
+
+# Layer name of the first layer pyshark reports -> link-layer type
+LINKTYPES_BY_LAYER = {
+    'eth': LINKTYPE_ETHERNET,
+    'null': LINKTYPE_NULL,
+    'loop': LINKTYPE_LOOP,
+    'sll': LINKTYPE_LINUX_SLL,
+    'sll2': LINKTYPE_LINUX_SLL2,
+    'raw': LINKTYPE_RAW,
+    'ip': LINKTYPE_RAW,
+    'ipv6': LINKTYPE_RAW,
+}
+
+IPPROTO_TCP = 6
+IPPROTO_UDP = 17
+
+FrameInfo = namedtuple('FrameInfo', ['src', 'dst', 'proto', 'sport', 'dport', 'payload'])
+
+_u16 = struct.Struct('!H').unpack_from
+
+
+def _l3_offset(frame, linktype):
+    """
+    Return the offset of the IP header in a link-layer frame, or -1.
+    """
+    if linktype == LINKTYPE_ETHERNET:
+        if len(frame) < 14:
+            return -1
+        ethertype = _u16(frame, 12)[0]
+        offset = 14
+        while ethertype in (0x8100, 0x88a8) and len(frame) >= offset + 4:
+            ethertype = _u16(frame, offset + 2)[0]
+            offset += 4
+        return offset if ethertype in (0x0800, 0x86dd) else -1
+    if linktype in (LINKTYPE_NULL, LINKTYPE_LOOP):
+        return 4 if len(frame) >= 4 and (frame[0] | frame[3]) in (2, 24, 28, 30) else -1
+    if linktype == LINKTYPE_RAW:
+        return 0
+    if linktype == LINKTYPE_LINUX_SLL:
+        return 16 if len(frame) >= 16 and _u16(frame, 14)[0] in (0x0800, 0x86dd) else -1
+    if linktype == LINKTYPE_LINUX_SLL2:
+        return 20 if len(frame) >= 20 and _u16(frame, 0)[0] in (0x0800, 0x86dd) else -1
+    return -1
+
+
+def parse_frame(frame, linktype=LINKTYPE_ETHERNET):
+    """
+    Decode the IP and TCP/UDP headers of a raw frame without a dissector.
+    :param frame: Frame bytes as captured.
+    :param linktype: Link-layer type of the capture.
+    :return: FrameInfo with string addresses and a memoryview of the transport
+             payload, or None for non-IP frames.
+    """
+    offset = _l3_offset(frame, linktype)
+    if offset < 0 or len(frame) < offset + 20:
+        return None
+    version = frame[offset] >> 4
+    if version == 4:
+        header_len = (frame[offset] & 0x0f) * 4
+        proto = frame[offset + 9]
+        src = socket.inet_ntop(socket.AF_INET, frame[offset + 12:offset + 16])
+        dst = socket.inet_ntop(socket.AF_INET, frame[offset + 16:offset + 20])
+        fragment = _u16(frame, offset + 6)[0] & 0x1fff
+        l4 = offset + header_len
+        if fragment:
+            return FrameInfo(src, dst, proto, 0, 0, memoryview(b''))
+    elif version == 6 and len(frame) >= offset + 40:
+        proto = frame[offset + 6]
+        src = socket.inet_ntop(socket.AF_INET6, frame[offset + 8:offset + 24])
+        dst = socket.inet_ntop(socket.AF_INET6, frame[offset + 24:offset + 40])
+        l4 = offset + 40
+    else:
+        return None
+
+    if proto == IPPROTO_TCP and len(frame) >= l4 + 20:
+        sport, dport = struct.unpack_from('!HH', frame, l4)
+        data_offset = (frame[l4 + 12] >> 4) * 4
+        return FrameInfo(src, dst, proto, sport, dport, memoryview(frame)[l4 + data_offset:])
+    if proto == IPPROTO_UDP and len(frame) >= l4 + 8:
+        sport, dport = struct.unpack_from('!HH', frame, l4)
+        return FrameInfo(src, dst, proto, sport, dport, memoryview(frame)[l4 + 8:])
+    return FrameInfo(src, dst, proto, 0, 0, memoryview(b''))
+
+
+def flow_endpoints(frame, linktype=LINKTYPE_ETHERNET):
+    """
+    Return the direction-independent (proto, endpoint, endpoint) of a frame with
+    addresses left packed, plus whether it is a DNS response; cheaper than
+    parse_frame when only the flow identity is needed.
+    :return: ((proto, (address, port), (address, port)), is_dns_response) or None.
+    """
+    offset = _l3_offset(frame, linktype)
+    if offset < 0 or len(frame) < offset + 20:
+        return None
+    version = frame[offset] >> 4
+    if version == 4:
+        proto = frame[offset + 9]
+        src = bytes(frame[offset + 12:offset + 16])
+        dst = bytes(frame[offset + 16:offset + 20])
+        l4 = offset + (frame[offset] & 0x0f) * 4
+        if _u16(frame, offset + 6)[0] & 0x1fff:
+            l4 = -1
+    elif version == 6 and len(frame) >= offset + 40:
+        proto = frame[offset + 6]
+        src = bytes(frame[offset + 8:offset + 24])
+        dst = bytes(frame[offset + 24:offset + 40])
+        l4 = offset + 40
+    else:
+        return None
+
+    sport = dport = 0
+    if proto in (IPPROTO_TCP, IPPROTO_UDP) and l4 >= 0 and len(frame) >= l4 + (20 if proto == IPPROTO_TCP else 8):
+        sport, dport = struct.unpack_from('!HH', frame, l4)
+    a = (src, sport)
+    b = (dst, dport)
+    key = (proto, a, b) if a <= b else (proto, b, a)
+    return key, proto == IPPROTO_UDP and sport == 53
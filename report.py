@@ -0,0 +1,278 @@
+import argparse
+import html
+import time
+import numpy as np
+from history import load_history
+
+
+def _utc_offset(timestamp):
+    """
+    Local UTC offset in seconds at timestamp, used to align day and hour buckets
+    to local time.
+    """
+    return time.localtime(timestamp).tm_gmtoff
+
+
+def local_offsets(timestamps):
+    """
+    Local UTC offset in seconds of every timestamp, so buckets stay aligned
+    across daylight saving changes. The offset is looked up once per distinct
+    day, and per sample only on the days where it changes.
+    """
+    days, inverse = np.unique(np.floor(timestamps / 86400).astype(np.int64), return_inverse=True)
+    first = np.array([_utc_offset(day * 86400) for day in days], dtype=np.int64)
+    last = np.array([_utc_offset(day * 86400 + 86399) for day in days], dtype=np.int64)
+    offsets = first[inverse]
+    changing = np.flatnonzero((first != last)[inverse])
+    offsets[changing] = [_utc_offset(timestamps[i]) for i in changing]
+    return offsets
+
+
+def bucket_totals(timestamps, incoming, outgoing, seconds, offset=0):
+    """
+    Sum incoming and outgoing usage into fixed buckets of the given length.
+    :param offset: Seconds added to timestamps before bucketing (local time),
+                   one per sample or the same for all.
+    :return: (bucket start timestamps, incoming sums, outgoing sums).
+    """
+    offset = np.broadcast_to(offset, np.shape(timestamps))
+    buckets = np.floor((timestamps + offset) / seconds).astype(np.int64)
+    # timestamps are sorted, so equal buckets are contiguous
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    return (buckets[starts] * seconds - offset[starts],
+            np.add.reduceat(incoming, starts), np.add.reduceat(outgoing, starts))
+
+
+def peak_intervals(timestamps, incoming, outgoing, top_n=10):
+    """
+    Return the top_n samples with the highest total usage, largest first,
+    as (timestamp, incoming, outgoing) arrays.
+    """
+    totals = incoming + outgoing
+    top_n = min(top_n, len(totals))
+    if not top_n:
+        return timestamps[:0], incoming[:0], outgoing[:0]
+    best = np.argpartition(totals, -top_n)[-top_n:]
+    best = best[np.argsort(totals[best])[::-1]]
+    return timestamps[best], incoming[best], outgoing[best]
+
+
+def threshold_breaches(timestamps, usage, threshold):
+    """
+    Find runs of consecutive samples whose usage exceeds threshold.
+    :return: List of (start, end, samples, peak, total) per run.
+    """
+    above = usage > threshold
+    if not above.any():
+        return []
+    edges = np.diff(np.concatenate(([0], above.astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    peaks = np.maximum.reduceat(usage, starts)
+    totals = np.add.reduceat(usage, starts)
+    # reduceat sums to the next start; mask out the samples below threshold
+    totals -= np.add.reduceat(np.where(above, 0.0, usage), starts)
+    return [(timestamps[s], timestamps[e - 1], int(e - s), float(p), float(t))
+            for s, e, p, t in zip(starts, ends, peaks, totals)]
+
+
+def build_report(timestamps, incoming, outgoing, interval_threshold=None, daily_threshold=None, top_n=10):
+    """
+    Aggregate a sample history into the figures shown in the report.
+    """
+    offset = local_offsets(timestamps)
+    days = bucket_totals(timestamps, incoming, outgoing, 86400, offset)
+    hours = bucket_totals(timestamps, incoming, outgoing, 3600, offset)
+    report = {
+        'start': timestamps[0] if len(timestamps) else 0,
+        'end': timestamps[-1] if len(timestamps) else 0,
+        'samples': len(timestamps),
+        'incoming': float(incoming.sum()),
+        'outgoing': float(outgoing.sum()),
+        'days': days,
+        'hours': hours,
+        'peaks': peak_intervals(timestamps, incoming, outgoing, top_n),
+        'interval_threshold': interval_threshold,
+        'daily_threshold': daily_threshold,
+        'interval_breaches': [],
+        'daily_breaches': [],
+    }
+    if interval_threshold is not None:
+        report['interval_breaches'] = threshold_breaches(timestamps, incoming + outgoing, interval_threshold)
+    if daily_threshold is not None:
+        day_totals = days[1] + days[2]
+        report['daily_breaches'] = [(days[0][i], float(day_totals[i]))
+                                    for i in np.flatnonzero(day_totals > daily_threshold)]
+    return report
+
+
+def _format_time(timestamp, fmt="%Y-%m-%d %H:%M:%S"):
+    return time.strftime(fmt, time.localtime(timestamp))
+
+
+def svg_bars(starts, incoming, outgoing, label_format, width=900, height=220, threshold=None):
+    """
+    Render stacked incoming/outgoing bars as an inline SVG element.
+    """
+    count = len(starts)
+    if not count:
+        return '<p>No data.</p>'
+    totals = incoming + outgoing
+    top = max(float(totals.max()), threshold or 0.0) or 1.0
+    margin_left, margin_bottom = 60, 40
+    plot_width, plot_height = width - margin_left - 10, height - margin_bottom - 10
+    slot = plot_width / count
+    bar_width = max(1.0, slot * 0.8)
+    scale = plot_height / top
+
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+             f'font-family="sans-serif" font-size="10">']
+    for fraction in (0, 0.5, 1):
+        y = 10 + plot_height * (1 - fraction)
+        parts.append(f'<line x1="{margin_left}" y1="{y:.1f}" x2="{width - 10}" y2="{y:.1f}" stroke="#ddd"/>')
+        parts.append(f'<text x="{margin_left - 4}" y="{y + 3:.1f}" text-anchor="end">{top * fraction:.0f}</text>')
+
+    xs = margin_left + np.arange(count) * slot
+    in_heights = incoming * scale
+    out_heights = outgoing * scale
+    for i in range(count):
+        x = xs[i]
+        tooltip = (f'{_format_time(starts[i], label_format)}: in {incoming[i]:.2f} MB, '
+                   f'out {outgoing[i]:.2f} MB')
+        parts.append(f'<g><title>{html.escape(tooltip)}</title>'
+                     f'<rect x="{x:.1f}" y="{10 + plot_height - in_heights[i]:.1f}" width="{bar_width:.1f}" '
+                     f'height="{in_heights[i]:.1f}" fill="#1f77b4"/>'
+                     f'<rect x="{x:.1f}" y="{10 + plot_height - in_heights[i] - out_heights[i]:.1f}" '
+                     f'width="{bar_width:.1f}" height="{out_heights[i]:.1f}" fill="#ff7f0e"/></g>')
+
+    if threshold is not None:
+        y = 10 + plot_height - threshold * scale
+        parts.append(f'<line x1="{margin_left}" y1="{y:.1f}" x2="{width - 10}" y2="{y:.1f}" '
+                     f'stroke="#d62728" stroke-dasharray="4 3"/>')
+
+    step = max(1, count // 12)
+    for i in range(0, count, step):
+        parts.append(f'<text x="{xs[i] + bar_width / 2:.1f}" y="{height - margin_bottom + 14}" text-anchor="middle">'
+                     f'{html.escape(_format_time(starts[i], label_format))}</text>')
+    parts.append('</svg>')
+    return ''.join(parts)
+
+
+def _table(headers, rows):
+    head = ''.join(f'<th>{html.escape(h)}</th>' for h in headers)
+    body = ''.join('<tr>' + ''.join(f'<td>{html.escape(str(cell))}</td>' for cell in row) + '</tr>'
+                   for row in rows)
+    return f'<table><tr>{head}</tr>{body}</table>'
+
+
+def render_html(report, title="Bandwidth Usage Report"):
+    """
+    Render the report as one self-contained HTML page (inline CSS and SVG).
+    """
+    day_starts, day_in, day_out = report['days']
+    hour_starts, hour_in, hour_out = report['hours']
+    peak_times, peak_in, peak_out = report['peaks']
+    total = report['incoming'] + report['outgoing']
+
+    sections = [
+        f'<h1>{html.escape(title)}</h1>',
+        f'<p>{_format_time(report["start"])} &ndash; {_format_time(report["end"])} '
+        f'({report["samples"]} samples)<br>'
+        f'Incoming {report["incoming"]:.2f} MB, outgoing {report["outgoing"]:.2f} MB, '
+        f'total {total:.2f} MB ({total / 1024:.2f} GB)</p>',
+        '<p><span class="in">&#9632;</span> Incoming <span class="out">&#9632;</span> Outgoing</p>',
+        '<h2>Daily usage (MB)</h2>',
+        svg_bars(day_starts, day_in, day_out, "%m-%d", threshold=report['daily_threshold']),
+        '<h2>Hourly usage (MB)</h2>',
+        svg_bars(hour_starts, hour_in, hour_out, "%m-%d %H:00"),
+        '<h2>Peak intervals</h2>',
+        _table(['Time', 'Incoming (MB)', 'Outgoing (MB)', 'Total (MB)'],
+               [(_format_time(t), f'{i:.2f}', f'{o:.2f}', f'{i + o:.2f}')
+                for t, i, o in zip(peak_times, peak_in, peak_out)]),
+    ]
+    if report['daily_threshold'] is not None:
+        sections.append(f'<h2>Days over {report["daily_threshold"]:.2f} MB</h2>')
+        sections.append(_table(['Day', 'Total (MB)'],
+                               [(_format_time(day, "%Y-%m-%d"), f'{usage:.2f}')
+                                for day, usage in report['daily_breaches']]))
+    if report['interval_threshold'] is not None:
+        breaches = report['interval_breaches']
+        sections.append(f'<h2>Intervals over {report["interval_threshold"]:.2f} MB '
+                        f'({len(breaches)} breaches)</h2>')
+        sections.append(_table(['Start', 'End', 'Samples', 'Peak (MB)', 'Total (MB)'],
+                               [(_format_time(start), _format_time(end), samples, f'{peak:.2f}', f'{usage:.2f}')
+                                for start, end, samples, peak, usage in breaches[:100]]))
+
+    style = ('body{font-family:sans-serif;margin:2em;color:#222}'
+             'table{border-collapse:collapse;margin-bottom:1em}'
+             'td,th{border:1px solid #ccc;padding:2px 8px;text-align:right}'
+             '.in{color:#1f77b4}.out{color:#ff7f0e}')
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{html.escape(title)}</title>'
+            f'<style>{style}</style></head><body>{"".join(sections)}</body></html>')
+
+
+def render_png(report, path):
+    """
+    Render the daily and hourly bars to a PNG with matplotlib's Agg backend,
+    which needs no display.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(2, 1, figsize=(12, 8))
+    for ax, (starts, incoming, outgoing), label in zip(axes, (report['days'], report['hours']), ('Daily', 'Hourly')):
+        x = np.arange(len(starts))
+        ax.bar(x, incoming, label="Incoming (MB)", width=0.8)
+        ax.bar(x, outgoing, bottom=incoming, label="Outgoing (MB)", width=0.8)
+        ax.set_title(f"{label} usage")
+        ax.set_ylabel("Usage (MB)")
+        step = max(1, len(starts) // 12)
+        ax.set_xticks(x[::step])
+        ax.set_xticklabels([_format_time(t, "%m-%d" if label == 'Daily' else "%m-%d %H:00")
+                            for t in starts[::step]], rotation=30, fontsize=8)
+        ax.legend(loc="upper left")
+    if report['daily_threshold'] is not None:
+        axes[0].axhline(report['daily_threshold'], color='red', linestyle='--')
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Generate a bandwidth usage report from sample history')
+    parser.add_argument('history', type=str,
+                        help='History CSV file (see usage_grapher --record)')
+    parser.add_argument('-o', '--output', type=str, default='report.html',
+                        help='HTML report file')
+    parser.add_argument('--png', type=str, default=None,
+                        help='Also write the usage bars to this PNG file')
+    parser.add_argument('-i', '--incremental', type=float, default=None,
+                        help='Per-interval threshold in MB; report the intervals exceeding it')
+    parser.add_argument('-d', '--daily', type=float, default=None,
+                        help='Daily threshold in MB; report the days exceeding it')
+    parser.add_argument('-n', '--top', type=int, default=10,
+                        help='Number of peak intervals to list')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    start = time.time()
+    timestamps, incoming, outgoing = load_history(args.history)
+    if not len(timestamps):
+        print(f"No samples in {args.history}")
+        return
+    report = build_report(timestamps, incoming, outgoing, interval_threshold=args.incremental,
+                          daily_threshold=args.daily, top_n=args.top)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        f.write(render_html(report))
+    print(f"Wrote {args.output}")
+    if args.png:
+        render_png(report, args.png)
+        print(f"Wrote {args.png}")
+    print(f"{len(timestamps)} samples in {time.time() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
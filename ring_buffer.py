@@ -0,0 +1,53 @@
+import numpy as np
+
+
+class RingBuffer:
+    def __init__(self, capacity, width=1, dtype=np.float64):
+        """
+        Fixed-capacity buffer of rows backed by one preallocated NumPy array;
+        once full, each append overwrites the oldest row.
+        :param capacity: Number of rows kept.
+        :param width: Number of columns per row.
+        """
+        self.capacity = capacity
+        self.width = width
+        self._data = np.zeros((capacity, width), dtype=dtype)
+        self._head = 0  # index the next row is written to
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, *row):
+        self._data[self._head] = row
+        self._head = (self._head + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def values(self):
+        """
+        Return the stored rows, oldest first, as a (len, width) array copy.
+        """
+        if self._count < self.capacity:
+            return self._data[:self._count].copy()
+        return np.concatenate((self._data[self._head:], self._data[:self._head]))
+
+    def column(self, index):
+        """
+        Return one column of the stored rows, oldest first.
+        """
+        if self._count < self.capacity:
+            return self._data[:self._count, index].copy()
+        return np.concatenate((self._data[self._head:, index], self._data[:self._head, index]))
+
+    def latest(self):
+        """
+        Return the most recent row, or None when empty.
+        """
+        if not self._count:
+            return None
+        return self._data[self._head - 1].copy()
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
@@ -0,0 +1,130 @@
+import math
+import random
+import time
+
+
+class PacketSampler:
+    def __init__(self, rate=1, mode='count', cpu_budget=None, max_rate=4096):
+        """
+        Decide which packets to inspect at high packet rates.
+
+        Every sampled packet carries a weight of 1/p (the sampling rate N at the
+        time it was picked) so scaled-up sums stay unbiased when N changes.
+
+        :param rate: Inspect 1 in N packets.
+        :param mode: 'count' for every Nth packet, 'random' for probability 1/N.
+        :param cpu_budget: Fraction of one core the inspection may use (e.g. 0.2);
+                           when set, N is adjusted by adjust().
+        :param max_rate: Upper limit for N when adjusting automatically.
+        """
+        if mode not in ('count', 'random'):
+            raise ValueError(f"Unknown sampling mode '{mode}', expected 'count' or 'random'")
+        self.rate = max(1, int(rate))
+        self.mode = mode
+        self.cpu_budget = cpu_budget
+        self.max_rate = max_rate
+        self.seen = 0
+        self.sampled = 0
+        self._countdown = self.rate
+        self._busy = 0.0
+        self._window_start = time.perf_counter()
+
+    def sample(self):
+        """
+        Return the weight of the current packet, or 0 if it should be skipped.
+        """
+        self.seen += 1
+        if self.mode == 'count':
+            self._countdown -= 1
+            if self._countdown > 0:
+                return 0
+            self._countdown = self.rate
+        elif self.rate > 1 and random.random() * self.rate >= 1.0:
+            return 0
+        self.sampled += 1
+        return self.rate
+
+    def record_cost(self, seconds):
+        """
+        Account the time spent inspecting one sampled packet.
+        """
+        self._busy += seconds
+
+    def cpu_usage(self):
+        """
+        Return the fraction of wall time spent inspecting since the last adjust().
+        """
+        elapsed = time.perf_counter() - self._window_start
+        return self._busy / elapsed if elapsed > 0 else 0.0
+
+    def adjust(self):
+        """
+        Retune N so inspection stays under the CPU budget. Call once per interval.
+        :return: The sampling rate N in effect for the next interval.
+        """
+        if self.cpu_budget:
+            usage = self.cpu_usage()
+            if usage > self.cpu_budget:
+                self.rate = min(self.max_rate, int(math.ceil(self.rate * usage / self.cpu_budget)))
+            elif usage < self.cpu_budget / 4 and self.rate > 1:
+                self.rate = max(1, self.rate // 2)
+            self._countdown = min(self._countdown, self.rate)
+        self._busy = 0.0
+        self._window_start = time.perf_counter()
+        return self.rate
+
+
+class SampledEstimates:
+    def __init__(self):
+        """
+        Scaled-up totals per key with their sampling variance.
+
+        For a packet of size x sampled with probability p = 1/w, the key total is
+        estimated by sum(w * x) with variance estimate sum(x^2 * (w^2 - w)),
+        which gives a normal-approximation confidence interval per key.
+        """
+        self._estimates = {}  # key -> [estimate, variance, sampled packets]
+
+    def add(self, key, size, weight):
+        entry = self._estimates.get(key)
+        if entry is None:
+            entry = self._estimates[key] = [0.0, 0.0, 0]
+        entry[0] += size * weight
+        entry[1] += size * size * (weight * weight - weight)
+        entry[2] += 1
+
+    def estimate(self, key):
+        entry = self._estimates.get(key)
+        return entry[0] if entry else 0.0
+
+    def interval(self, key, z=1.96):
+        """
+        Return (estimate, half_width) of the confidence interval for a key;
+        z = 1.96 gives 95% confidence.
+        """
+        entry = self._estimates.get(key)
+        if entry is None:
+            return 0.0, 0.0
+        return entry[0], z * math.sqrt(entry[1])
+
+    def keys(self):
+        return self._estimates.keys()
+
+    def discard(self, key):
+        self._estimates.pop(key, None)
+
+    def merge(self, other):
+        """
+        Add the totals of another SampledEstimates; estimates and variances of
+        independent samples add up.
+        """
+        for key, (estimate, variance, packets) in other._estimates.items():
+            entry = self._estimates.get(key)
+            if entry is None:
+                entry = self._estimates[key] = [0.0, 0.0, 0]
+            entry[0] += estimate
+            entry[1] += variance
+            entry[2] += packets
+
+    def reset(self):
+        self._estimates.clear()
@@ -0,0 +1,301 @@
+"""
+Fixed-memory streaming summaries for remote traffic.
+
+Error bounds, with N the total weight (bytes) added since the last reset:
+
+- SpaceSaving(capacity=m): every reported count overestimates the true count
+  by at most its recorded error, and that error is at most N / m. Any key whose
+  true count exceeds N / m is guaranteed to be tracked.
+- CountMinSketch(epsilon, delta): estimates never undercount, and overcount by
+  more than epsilon * N with probability at most delta.
+- HyperLogLog(precision=p): distinct-count estimate with a relative standard
+  error of about 1.04 / sqrt(2 ** p) (1.6% for the default p = 12).
+
+Keys are hashed with blake2b of their str(), not hash(): string hashes are
+randomized per process, which would make sketches built in different
+processes (e.g. parallel_categorizer workers) disagree on the same key.
+"""
+import hashlib
+import heapq
+import math
+import random
+
+
+def _hash64(key):
+    """
+    Stable 64-bit hash of a key, identical across processes and runs.
+    """
+    return int.from_bytes(hashlib.blake2b(str(key).encode(), digest_size=8).digest(), 'little')
+
+
+def _mix64(value):
+    """
+    splitmix64 finalizer; spreads a seeded hash over all 64 bits.
+    """
+    value &= 0xFFFFFFFFFFFFFFFF
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return value ^ (value >> 31)
+
+
+class SpaceSaving:
+    def __init__(self, capacity=1000):
+        """
+        Weighted Space-Saving heavy-hitter summary tracking at most capacity keys.
+        :param capacity: Number of counters (m); the error per key is at most total / m.
+        """
+        self.capacity = capacity
+        self.total = 0
+        self._counts = {}  # key -> [count, error]
+        self._heap = []  # lazy min-heap of (count, seq, key)
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._counts)
+
+    def add(self, key, weight=1):
+        """
+        Add weight to a key, replacing the smallest counter when full.
+        """
+        self.total += weight
+        entry = self._counts.get(key)
+        if entry is not None:
+            # Counts only grow, so the heap entry stays a lower bound
+            entry[0] += weight
+            return
+        if len(self._counts) < self.capacity:
+            self._counts[key] = [weight, 0]
+            self._push(key, weight)
+            return
+
+        heap = self._heap
+        while True:
+            count, _, victim = heapq.heappop(heap)
+            current = self._counts.get(victim)
+            if current is None:
+                continue
+            if current[0] != count:
+                self._push(victim, current[0])
+                continue
+            break
+        del self._counts[victim]
+        self._counts[key] = [count + weight, count]
+        self._push(key, count + weight)
+
+    def _push(self, key, count):
+        self._seq += 1
+        heapq.heappush(self._heap, (count, self._seq, key))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(entry[0], i, k) for i, (k, entry) in enumerate(self._counts.items())]
+            heapq.heapify(self._heap)
+
+    def top(self, n=10):
+        """
+        Return the n largest counters as (key, count, error) tuples. The true
+        count of each key lies in [count - error, count].
+        """
+        best = heapq.nlargest(n, self._counts.items(), key=lambda item: item[1][0])
+        return [(key, count, error) for key, (count, error) in best]
+
+    def estimate(self, key):
+        """
+        Return (count, error) for a key, or (0, total / capacity) if untracked.
+        """
+        entry = self._counts.get(key)
+        if entry is None:
+            return 0, self.error_bound()
+        return entry[0], entry[1]
+
+    def merge(self, other):
+        """
+        Fold in another summary, e.g. one kept by another worker. Counts of
+        keys tracked by both add up. A key missing from a full summary may
+        have counted up to that summary's smallest counter there, so that
+        amount is added to its count and its error. Only the capacity largest
+        counters are kept, and errors stay within the combined total / capacity.
+        """
+        floor = min(entry[0] for entry in self._counts.values()) if len(self._counts) >= self.capacity else 0
+        other_floor = (min(entry[0] for entry in other._counts.values())
+                       if len(other._counts) >= other.capacity else 0)
+        merged = {}
+        for key, (count, error) in self._counts.items():
+            entry = other._counts.get(key)
+            if entry is None:
+                merged[key] = [count + other_floor, error + other_floor]
+            else:
+                merged[key] = [count + entry[0], error + entry[1]]
+        for key, (count, error) in other._counts.items():
+            if key not in merged:
+                merged[key] = [count + floor, error + floor]
+        if len(merged) > self.capacity:
+            merged = dict(heapq.nlargest(self.capacity, merged.items(), key=lambda item: item[1][0]))
+        self.total += other.total
+        self._counts = merged
+        self._heap = [(entry[0], i, key) for i, (key, entry) in enumerate(merged.items())]
+        heapq.heapify(self._heap)
+        self._seq = len(self._heap)
+
+    def error_bound(self):
+        """
+        Worst-case overestimate of any counter: total / capacity.
+        """
+        return self.total / self.capacity
+
+    def reset(self):
+        self.total = 0
+        self._counts.clear()
+        self._heap.clear()
+
+
+class CountMinSketch:
+    def __init__(self, epsilon=0.001, delta=0.01):
+        """
+        Count-Min sketch for point queries on arbitrary keys.
+        :param epsilon: Overestimate bound as a fraction of the total weight.
+        :param delta: Probability of exceeding that bound.
+        """
+        self.width = int(math.ceil(math.e / epsilon))
+        self.depth = int(math.ceil(math.log(1.0 / delta)))
+        self.epsilon = epsilon
+        self.delta = delta
+        self.total = 0
+        self._rows = [[0] * self.width for _ in range(self.depth)]
+        self._seed = random.getrandbits(64)
+
+    def _indexes(self, key):
+        # Double hashing (Kirsch-Mitzenmacher): one 64-bit mix yields all rows
+        h = _mix64(_hash64(key) ^ self._seed)
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        width = self.width
+        return [(h1 + i * h2) % width for i in range(self.depth)]
+
+    def add(self, key, weight=1):
+        """
+        Add weight to a key using conservative update (only the minimal
+        counters are raised), which tightens estimates without breaking the bound.
+        """
+        self.total += weight
+        indexes = self._indexes(key)
+        rows = self._rows
+        target = min(row[i] for row, i in zip(rows, indexes)) + weight
+        for row, i in zip(rows, indexes):
+            if row[i] < target:
+                row[i] = target
+
+    def estimate(self, key):
+        """
+        Return the estimated weight of a key; never below the true weight.
+        """
+        return min(row[i] for row, i in zip(self._rows, self._indexes(key)))
+
+    def error_bound(self):
+        return self.epsilon * self.total
+
+    def reset(self):
+        self.total = 0
+        for row in self._rows:
+            for i in range(self.width):
+                row[i] = 0
+
+
+class HyperLogLog:
+    def __init__(self, precision=12):
+        """
+        HyperLogLog distinct counter using 2 ** precision one-byte registers.
+        """
+        self.precision = precision
+        self.m = 1 << precision
+        self._registers = bytearray(self.m)
+        if self.m >= 128:
+            self._alpha = 0.7213 / (1 + 1.079 / self.m)
+        else:
+            self._alpha = {16: 0.673, 32: 0.697, 64: 0.709}[self.m]
+
+    def add(self, key):
+        value = _hash64(key)
+        index = value >> (64 - self.precision)
+        rest = (value << self.precision) & 0xFFFFFFFFFFFFFFFF
+        rank = 64 - self.precision + 1 if rest == 0 else 65 - rest.bit_length()
+        if rank > self._registers[index]:
+            self._registers[index] = rank
+
+    def count(self):
+        """
+        Return the estimated number of distinct keys added since the last reset.
+        """
+        registers = self._registers
+        estimate = self._alpha * self.m * self.m / sum(2.0 ** -r for r in registers)
+        zeros = registers.count(0)
+        if estimate <= 2.5 * self.m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            return self.m * math.log(self.m / zeros)
+        return estimate
+
+    def relative_error(self):
+        return 1.04 / math.sqrt(self.m)
+
+    def merge(self, other):
+        """
+        Fold in another counter of the same precision; the result estimates the
+        distinct keys added to either.
+        """
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog counters of different precision")
+        self._registers = bytearray(map(max, self._registers, other._registers))
+
+    def reset(self):
+        self._registers = bytearray(self.m)
+
+
+class RemoteTrafficSketch:
+    def __init__(self, capacity=1000, hll_precision=12, asn_lookup=None):
+        """
+        Bounded-memory heavy hitters for remote hosts, remote ports and ASNs,
+        plus a per-interval estimate of distinct remote hosts.
+        :param capacity: Counters per heavy-hitter summary.
+        :param hll_precision: HyperLogLog precision for the distinct-host count.
+        :param asn_lookup: Optional callable mapping a remote address to its ASN or owner.
+        """
+        self.hosts = SpaceSaving(capacity)
+        self.ports = SpaceSaving(capacity)
+        self.asns = SpaceSaving(capacity)
+        self.host_bytes = CountMinSketch()
+        self.interval_hosts = HyperLogLog(hll_precision)
+        self.asn_lookup = asn_lookup
+
+    def observe(self, remote_ip, remote_port, nbytes):
+        """
+        Account one packet exchanged with a remote endpoint.
+        """
+        self.hosts.add(remote_ip, nbytes)
+        self.host_bytes.add(remote_ip, nbytes)
+        if remote_port:
+            self.ports.add(remote_port, nbytes)
+        if self.asn_lookup is not None:
+            asn = self.asn_lookup(remote_ip)
+            if asn is not None:
+                self.asns.add(asn, nbytes)
+        self.interval_hosts.add(remote_ip)
+
+    def unique_hosts(self):
+        """
+        Return the estimated number of distinct remote hosts this interval.
+        """
+        return self.interval_hosts.count()
+
+    def end_interval(self):
+        """
+        Start a new distinct-host interval; heavy hitters keep accumulating.
+        :return: HyperLogLog of the interval that ended.
+        """
+        finished = self.interval_hosts
+        self.interval_hosts = HyperLogLog(finished.precision)
+        return finished
+
+    def reset(self):
+        self.hosts.reset()
+        self.ports.reset()
+        self.asns.reset()
+        self.host_bytes.reset()
+        self.interval_hosts.reset()
+
@@ -0,0 +1,151 @@
+import argparse
+import os
+import time
+from netns import read_net_dev
+
+# (section, field) counters sampled from /proc/net/snmp and /proc/net/netstat
+SNMP_COUNTERS = {
+    'tcp_in': ('Tcp', 'InSegs'),
+    'tcp_out': ('Tcp', 'OutSegs'),
+    'tcp_retrans': ('Tcp', 'RetransSegs'),
+    'tcp_errors': ('Tcp', 'InErrs'),
+    'udp_in': ('Udp', 'InDatagrams'),
+    'udp_out': ('Udp', 'OutDatagrams'),
+    'udp_errors': ('Udp', 'InErrors'),
+    'udp_buffer_drops': ('Udp', 'RcvbufErrors'),
+    'icmp_in': ('Icmp', 'InMsgs'),
+    'icmp_out': ('Icmp', 'OutMsgs'),
+    'ip_in_discards': ('Ip', 'InDiscards'),
+    'ip_out_discards': ('Ip', 'OutDiscards'),
+    'listen_drops': ('TcpExt', 'ListenDrops'),
+}
+
+
+def read_snmp(path, sections=None):
+    """
+    Parse a /proc/net/snmp style file, where every section is a header line
+    of field names followed by a line of values with the same prefix.
+    :return: {section: {field: value}}, limited to sections if given.
+    """
+    stats = {}
+    try:
+        with open(path) as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return stats
+    for header, values in zip(lines[::2], lines[1::2]):
+        section, _, names = header.partition(':')
+        if sections is not None and section not in sections:
+            continue
+        stats[section] = {name: int(value) for name, value in zip(names.split(), values.partition(':')[2].split())}
+    return stats
+
+
+class KernelStats:
+    def __init__(self, proc='/proc', exclude=('lo',)):
+        """
+        Packet, protocol, retransmit, drop and error rates from the kernel's
+        own counters, without packet capture.
+
+        Each sample reads /proc/net/snmp, /proc/net/netstat and /proc/net/dev
+        once. Where /proc is missing (macOS) only the per-NIC packet, error
+        and drop counts from psutil are available.
+        :param exclude: Interface name prefixes left out of the NIC counters.
+        """
+        self.proc = proc
+        self.exclude = exclude
+        self.has_snmp = os.path.exists(os.path.join(proc, 'net', 'snmp'))
+        self.counters = None
+        self.previous = None
+        self.time = None
+        self.previous_time = None
+
+    def sample(self):
+        """
+        Read all counters in one pass.
+        :return: {name: cumulative count}.
+        """
+        if not self.has_snmp:
+            import psutil
+
+            nic = psutil.net_io_counters()
+            return {'packets_in': nic.packets_recv, 'packets_out': nic.packets_sent,
+                    'nic_errors': nic.errin + nic.errout, 'nic_drops': nic.dropin + nic.dropout}
+
+        nic = read_net_dev(os.path.join(self.proc, 'net', 'dev'), self.exclude)
+        stats = read_snmp(os.path.join(self.proc, 'net', 'snmp'), ('Ip', 'Icmp', 'Tcp', 'Udp'))
+        stats.update(read_snmp(os.path.join(self.proc, 'net', 'netstat'), ('TcpExt',)))
+        counters = {'packets_in': nic.packets_recv, 'packets_out': nic.packets_sent,
+                    'nic_errors': nic.errin + nic.errout, 'nic_drops': nic.dropin + nic.dropout}
+        for name, (section, field) in SNMP_COUNTERS.items():
+            value = stats.get(section, {}).get(field)
+            if value is not None:
+                counters[name] = value
+        return counters
+
+    def refresh(self, now=None):
+        now = time.time() if now is None else now
+        self.previous, self.previous_time = self.counters, self.time
+        self.counters, self.time = self.sample(), now
+
+    def rates(self):
+        """
+        Per-second rates between the last two refreshes, plus summary figures:
+        'drops' (NIC drops, IP discards, UDP buffer overruns and listen queue
+        drops), 'errors' and 'retrans_ratio' (share of sent TCP segments that
+        were retransmissions). Empty until two refreshes have been made.
+        """
+        if self.previous is None or self.time <= self.previous_time:
+            return {}
+        elapsed = self.time - self.previous_time
+        rates = {name: max(0, value - self.previous.get(name, value)) / elapsed
+                 for name, value in self.counters.items()}
+        rates['drops'] = sum(rates.get(name, 0.0) for name in ('nic_drops', 'ip_in_discards', 'ip_out_discards',
+                                                                'udp_buffer_drops', 'listen_drops'))
+        rates['errors'] = sum(rates.get(name, 0.0) for name in ('nic_errors', 'tcp_errors', 'udp_errors'))
+        if 'tcp_out' in rates:
+            rates['retrans_ratio'] = rates['tcp_retrans'] / rates['tcp_out'] if rates['tcp_out'] else 0.0
+        return rates
+
+
+def format_rates(rates):
+    """
+    Summarize rates() as display lines: drops, errors and retransmits, then
+    the per-protocol breakdown when the kernel provides it.
+    """
+    if not rates:
+        return []
+    summary = f"Drops: {rates['drops']:.1f}/s  Errors: {rates['errors']:.1f}/s"
+    if 'tcp_out' not in rates:
+        return [summary]
+    return [f"{summary}  Retransmits: {rates['tcp_retrans']:.1f}/s ({rates['retrans_ratio'] * 100:.2f}% of TCP out)",
+            f"TCP {rates['tcp_in']:.0f}/{rates['tcp_out']:.0f} seg/s  |  "
+            f"UDP {rates.get('udp_in', 0):.0f}/{rates.get('udp_out', 0):.0f} dgram/s  |  "
+            f"ICMP {rates.get('icmp_in', 0):.0f}/{rates.get('icmp_out', 0):.0f} msg/s  (in/out)"]
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Protocol, retransmit, drop and error rates from kernel counters')
+    parser.add_argument('-r', '--refresh', type=float, default=2,
+                        help='Refresh rate in seconds')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_arguments()
+    stats = KernelStats()
+    stats.refresh()
+    try:
+        while True:
+            time.sleep(args.refresh)
+            stats.refresh()
+            rates = stats.rates()
+            if rates:
+                print(f"Packets In: {rates['packets_in']:.0f}/s  Out: {rates['packets_out']:.0f}/s", flush=True)
+            print('\n'.join(format_rates(rates)) + '\n', flush=True)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Text graphs for the curses UI, drawn with Unicode block and braille characters.
+Only the standard library is used, so graphing adds nothing to startup time.
+"""
+from collections import deque
+
+BLOCKS = ' ▁▂▃▄▅▆▇█'
+BAR_EIGHTHS = ' ▏▎▍▌▋▊▉█'
+
+# Braille dot bits, indexed by [row from the top][column]
+_BRAILLE_DOTS = ((0x01, 0x08), (0x02, 0x10), (0x04, 0x20), (0x40, 0x80))
+
+
+class History:
+    def __init__(self, size=120):
+        """
+        Fixed-size history of samples; the oldest sample is dropped once full.
+        """
+        self.samples = deque(maxlen=size)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def append(self, value):
+        self.samples.append(value)
+
+    def last(self, n):
+        """
+        Return the latest n samples, oldest first.
+        """
+        if n >= len(self.samples):
+            return list(self.samples)
+        return list(self.samples)[-n:]
+
+    def clear(self):
+        self.samples.clear()
+
+
+def sparkline(values, width=None, maximum=None):
+    """
+    Render values as one line of block characters, one character per value.
+    :param width: Render only the latest width values.
+    :param maximum: Value drawn as a full block (default: the largest value).
+    """
+    if width is not None:
+        values = values[-width:] if width > 0 else []
+    if not values:
+        return ''
+    top = maximum if maximum else max(values)
+    if top <= 0:
+        return BLOCKS[0] * len(values)
+    levels = len(BLOCKS) - 1
+    # Any non-zero value gets at least the lowest block so it is not drawn as a gap
+    return ''.join(BLOCKS[min(levels, max(1 if v > 0 else 0, int(round(v / top * levels))))] for v in values)
+
+
+def braille(values, width, height, maximum=None):
+    """
+    Render values as an area chart of height rows of braille characters,
+    two values per character and four dot rows per character row.
+    :return: List of height strings, top row first.
+    """
+    values = values[-2 * width:]
+    top = maximum if maximum else (max(values) if values else 0)
+    dot_rows = 4 * height
+    levels = [int(round(v / top * dot_rows)) if top > 0 else 0 for v in values]
+    levels = [0] * (2 * width - len(levels)) + levels
+
+    rows = []
+    for row in range(height):
+        # Dot rows covered by this character row, counted from the bottom
+        base = (height - row - 1) * 4
+        chars = []
+        for column in range(width):
+            code = 0x2800
+            for side in (0, 1):
+                filled = levels[2 * column + side] - base
+                for dot in range(min(4, max(0, filled))):
+                    code |= _BRAILLE_DOTS[3 - dot][side]
+            chars.append(chr(code))
+        rows.append(''.join(chars))
+    return rows
+
+
+def bar(value, maximum, width):
+    """
+    Render a horizontal bar of value / maximum * width characters with
+    eighth-block precision.
+    """
+    if maximum <= 0 or value <= 0:
+        return ''
+    eighths = int(round(min(value, maximum) / maximum * width * 8))
+    full, rest = divmod(eighths, 8)
+    return BAR_EIGHTHS[-1] * full + (BAR_EIGHTHS[rest] if rest else '')
+
+
+def histogram(values, bins=5, width=30):
+    """
+    Bucket values into equal-width bins and render one bar per bin.
+    :return: List of (low, high, count, bar) tuples, lowest bin first.
+    """
+    if not values:
+        return []
+    low, high = min(values), max(values)
+    step = (high - low) / bins if high > low else 1.0
+    counts = [0] * bins
+    for value in values:
+        counts[min(bins - 1, int((value - low) / step))] += 1
+    largest = max(counts)
+    return [(low + i * step, low + (i + 1) * step, count, bar(count, largest, width))
+            for i, count in enumerate(counts)]
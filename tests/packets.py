@@ -0,0 +1,43 @@
+"""
+Hand-built frames and payloads for the tests.
+"""
+import socket
+import struct
+
+
+def udp_frame(src, dst, sport, dport, payload=b'x' * 100):
+    """
+    Ethernet + IPv4 + UDP frame (checksums left at zero).
+    """
+    udp = struct.pack('!HHHH', sport, dport, 8 + len(payload), 0) + payload
+    ip = struct.pack('!BBHHHBBH4s4s', 0x45, 0, 20 + len(udp), 0, 0, 64, 17, 0,
+                     socket.inet_aton(src), socket.inet_aton(dst))
+    return b'\x02' * 6 + b'\x04' * 6 + b'\x08\x00' + ip + udp
+
+
+def dns_name(name):
+    return b''.join(bytes([len(label)]) + label.encode() for label in name.split('.')) + b'\x00'
+
+
+def dns_response(qname, addresses, ttl=300):
+    """
+    DNS response to an A query for qname answering with the given IPv4 addresses.
+    """
+    message = struct.pack('!HHHHHH', 0x1234, 0x8180, 1, len(addresses), 0, 0)
+    message += dns_name(qname) + struct.pack('!HH', 1, 1)
+    for address in addresses:
+        # Name compressed as a pointer to the question
+        message += struct.pack('!HHHIH', 0xC00C, 1, 1, ttl, 4) + socket.inet_aton(address)
+    return message
+
+
+def write_pcap(path, frames):
+    """
+    Write (timestamp, frame) pairs as a classic little-endian Ethernet pcap.
+    """
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<IHHiIII', 0xa1b2c3d4, 2, 4, 0, 0, 65535, 1))
+        for timestamp, frame in frames:
+            seconds = int(timestamp)
+            f.write(struct.pack('<IIII', seconds, int((timestamp - seconds) * 1e6), len(frame), len(frame)))
+            f.write(frame)
@@ -0,0 +1,48 @@
+import curses
+
+import pytest
+
+from bwm import BandwidthMonitor
+
+
+class FakeScreen:
+    """
+    Minimal curses window that fails like curses does when drawing off-screen.
+    """
+    def __init__(self, rows, cols=120):
+        self.rows = rows
+        self.cols = cols
+        self.lines = {}
+
+    def getmaxyx(self):
+        return self.rows, self.cols
+
+    def addstr(self, y, x, text, *attributes):
+        if y >= self.rows or x + len(text) > self.cols:
+            raise curses.error('addwstr() returned ERR')
+        self.lines[y] = text
+
+    def clear(self):
+        self.lines.clear()
+
+    def refresh(self):
+        pass
+
+
+class FakeKernelStats:
+    def rates(self):
+        return {}
+
+
+KERNEL_RATES = {'drops': 0.0, 'errors': 0.0, 'tcp_retrans': 1.0, 'retrans_ratio': 0.01,
+                'tcp_in': 100, 'tcp_out': 100, 'packets_in': 10, 'packets_out': 10}
+
+
+@pytest.mark.parametrize('rows', range(11, 30))
+def test_display_usage_fits_short_terminals(rows):
+    screen = FakeScreen(rows)
+    monitor = BandwidthMonitor(stdscr=screen, kernel_stats=FakeKernelStats())
+    monitor.kernel_rates = KERNEL_RATES
+    monitor.display_usage()
+    assert max(screen.lines) < rows
+    assert screen.lines.get(11, 'Drops:').startswith('Drops:')
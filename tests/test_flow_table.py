@@ -0,0 +1,47 @@
+from flow_table import FlowTable
+
+KEY = (6, '10.0.0.1', 50000, '93.184.216.34', 443)
+
+
+def test_rates_drop_to_zero_after_idle_gap_past_longest_window():
+    table = FlowTable(max_flows=16, idle_timeout=600)
+    for second in range(10):
+        table.add(KEY, sent=1000, received=5000, now=1000.0 + second)
+
+    # Idle past the 40 s window (and the ring size)
+    flows = table.top(now=1000.0 + 10 + 71)
+    assert len(flows) == 1
+    key, usage = flows[0]
+    assert key == KEY
+    assert all(rate == 0 for rate in usage['rates'].values())
+    assert usage['sent'] == 10000 and usage['received'] == 50000
+
+    # Windows keep working after the gap
+    table.add(KEY, sent=4000, now=1082.0)
+    _, usage = table.top(now=1083.0)[0]
+    assert usage['rates'][2] == 2000
+    assert usage['rates'][40] == 100
+
+
+def test_rates_after_short_gap():
+    table = FlowTable(max_flows=16, idle_timeout=600)
+    table.add(KEY, sent=1000, now=1000.0)
+    _, usage = table.top(now=1015.0)[0]
+    assert usage['rates'][2] == 0
+    assert usage['rates'][10] == 0
+    assert usage['rates'][40] == 1000 / 40
+
+
+def test_pending_bytes_survive_expiry_on_allocation():
+    table = FlowTable(max_flows=2, idle_timeout=30)
+    other = (17, '10.0.0.1', 5353, '10.0.0.2', 53)
+    table.add(KEY, sent=100, now=1000.0)
+    table.add(other, sent=100, now=1000.0)
+    # KEY is used again after a pause; its bytes are still pending when a
+    # new flow needs a slot and idle flows are expired
+    table.add(KEY, sent=500, now=1040.0)
+    table.add((6, '10.0.0.1', 50001, '10.0.0.3', 80), sent=1, now=1040.0)
+    flows = dict(table.top(now=1040.5))
+    assert KEY in flows
+    assert flows[KEY]['sent'] == 600
+    assert other not in flows
@@ -0,0 +1,128 @@
+import ssl
+import struct
+
+import pytest
+
+from hostname_classifier import (DNS_A, DNS_AAAA, DNS_CNAME, _quic_client_keys, _sni_from_crypto_frames,
+                                 parse_client_hello, parse_dns, parse_quic_initial_sni, parse_tls_sni)
+from packets import dns_name, dns_response
+
+# RFC 9001, Appendix A: client Initial with DCID 0x8394c8f03e515708
+RFC9001_DCID = bytes.fromhex('8394c8f03e515708')
+RFC9001_CLIENT_HELLO = bytes.fromhex(
+    '010000ed0303ebf8fa56f12939b9584a3896472ec40bb863cfd3e86804fe3a47f06a2b69484c000004130113020100'
+    '00c000000010000e00000b6578616d706c652e636f6dff01000100000a00080006001d0017001800100007000504616c706e'
+    '000500050100000000003300260024001d00209370b2c9caa47fbabaf4559fedba753de171fa71f50f1ce15d43e994ec74d748'
+    '002b0003020304000d0010000e0403050306030203080408050806002d00020101001c00024001003900320408ffffffffffff'
+    'ffff05048000ffff07048000ffff0801100104800075300901100f088394c8f03e51570806048000ffff')
+RFC9001_HEADER = bytes.fromhex('c300000001088394c8f03e5157080000449e00000002')
+
+
+def test_quic_initial_keys_match_rfc9001():
+    key, iv, hp = _quic_client_keys(RFC9001_DCID)
+    assert key.hex() == '1f369613dd76d5467730efcbe3b1a22d'
+    assert iv.hex() == 'fa044b2f42a3fd3b46fb255c'
+    assert hp.hex() == '9f50449e04a0e810283a1e9933adedd2'
+
+
+def protect_rfc9001_initial():
+    """
+    Build the RFC 9001 A.2 protected client Initial: CRYPTO frame padded to
+    1162 bytes, packet number 2, AEAD then header protection.
+    """
+    aead = pytest.importorskip('cryptography.hazmat.primitives.ciphers.aead')
+    ciphers = pytest.importorskip('cryptography.hazmat.primitives.ciphers')
+
+    key, iv, hp = _quic_client_keys(RFC9001_DCID)
+    plaintext = bytes.fromhex('060040f1') + RFC9001_CLIENT_HELLO
+    plaintext += bytes(1162 - len(plaintext))
+    nonce = bytes(a ^ b for a, b in zip(iv, (2).to_bytes(12, 'big')))
+    ciphertext = aead.AESGCM(key).encrypt(nonce, plaintext, RFC9001_HEADER)
+
+    sample = ciphertext[:16]
+    encryptor = ciphers.Cipher(ciphers.algorithms.AES(hp), ciphers.modes.ECB()).encryptor()
+    mask = encryptor.update(sample) + encryptor.finalize()
+    header = bytearray(RFC9001_HEADER)
+    header[0] ^= mask[0] & 0x0f
+    for i in range(4):
+        header[-4 + i] ^= mask[1 + i]
+    return sample, mask[:5], bytes(header) + ciphertext
+
+
+def test_quic_initial_sni_from_rfc9001_packet():
+    sample, mask, packet = protect_rfc9001_initial()
+    # Intermediate values and protected header published in RFC 9001 A.2
+    assert sample.hex() == 'd1b1c98dd7689fb8ec11d242b123dc9b'
+    assert mask.hex() == '437b9aec36'
+    assert packet[:22].hex() == 'c000000001088394c8f03e5157080000449e7b9aec34'
+    assert len(packet) == 1200
+    assert parse_quic_initial_sni(packet) == 'example.com'
+
+
+def test_quic_initial_rejects_tampered_packet():
+    _, _, packet = protect_rfc9001_initial()
+    tampered = bytearray(packet)
+    tampered[100] ^= 1
+    assert parse_quic_initial_sni(bytes(tampered)) is None
+    assert parse_quic_initial_sni(packet[:1199]) is None
+
+
+def test_crypto_frames_are_reassembled_out_of_order():
+    first, second = RFC9001_CLIENT_HELLO[:100], RFC9001_CLIENT_HELLO[100:]
+    plaintext = (b'\x01'  # PING
+                 + b'\x06\x40\x64' + bytes([0x40 | len(second) >> 8, len(second) & 0xff]) + second
+                 + b'\x00' * 3  # PADDING
+                 + b'\x06\x00' + bytes([0x40, len(first)]) + first)
+    assert _sni_from_crypto_frames(plaintext) == 'example.com'
+    # A gap before the SNI leaves nothing to parse
+    assert _sni_from_crypto_frames(b'\x06\x40\x64\x40\x10' + second[:16]) is None
+
+
+def client_hello_record(hostname):
+    """
+    First TLS record a real ssl client sends for hostname.
+    """
+    context = ssl.create_default_context()
+    incoming, outgoing = ssl.MemoryBIO(), ssl.MemoryBIO()
+    client = context.wrap_bio(incoming, outgoing, server_hostname=hostname)
+    with pytest.raises(ssl.SSLWantReadError):
+        client.do_handshake()
+    return outgoing.read()
+
+
+def test_tls_sni_from_ssl_client_hello():
+    record = client_hello_record('Video.Example.COM')
+    assert parse_tls_sni(record) == 'video.example.com'
+    assert parse_client_hello(record, 5) == 'video.example.com'
+
+
+def test_tls_sni_rejects_other_payloads():
+    assert parse_tls_sni(b'GET / HTTP/1.1\r\n') is None
+    assert parse_tls_sni(client_hello_record('example.com')[:40]) is None
+
+
+def test_dns_response_with_compression_and_cname():
+    message = struct.pack('!HHHHHH', 1, 0x8180, 1, 3, 0, 0) + dns_name('www.example.com') + struct.pack('!HH', 1, 1)
+    cname = dns_name('cdn.example.net')
+    message += struct.pack('!HHHIH', 0xC00C, DNS_CNAME, 1, 60, len(cname)) + cname
+    cname_at = len(message) - len(cname)
+    message += struct.pack('!HHHIH', 0xC000 | cname_at, DNS_A, 1, 300, 4) + bytes([192, 0, 2, 7])
+    message += struct.pack('!HHHIH', 0xC000 | cname_at, DNS_AAAA, 1, 300, 16) + bytes.fromhex('20010db8' + '0' * 23 + '1')
+
+    parsed = parse_dns(message)
+    assert parsed.qname == 'www.example.com'
+    assert parsed.is_response
+    assert [(r.name, r.rtype, r.data) for r in parsed.answers] == [
+        ('www.example.com', DNS_CNAME, 'cdn.example.net'),
+        ('cdn.example.net', DNS_A, '192.0.2.7'),
+        ('cdn.example.net', DNS_AAAA, '2001:db8::1'),
+    ]
+
+
+def test_dns_query_and_malformed_messages():
+    query = struct.pack('!HHHHHH', 1, 0x0100, 1, 0, 0, 0) + dns_name('example.org') + struct.pack('!HH', 1, 1)
+    parsed = parse_dns(query)
+    assert parsed.qname == 'example.org' and not parsed.is_response and parsed.answers == []
+    assert parse_dns(dns_response('example.org', ['192.0.2.1'])[:-3]) is None
+    loop = struct.pack('!HHHHHH', 1, 0x8180, 1, 0, 0, 0) + b'\xc0\x0c'
+    assert parse_dns(loop) is None
@@ -0,0 +1,32 @@
+from nettop_backend import NettopBackend, NettopParser
+
+
+def test_parser_splits_samples_at_headers():
+    parser = NettopParser()
+    assert parser.feed('time,,bytes_in,bytes_out,') is None
+    assert parser.feed('12:00:00,Safari.512,1000,2000,') is None
+    assert parser.feed('12:00:00,Google Chrome H.77,30,0,') is None
+    assert parser.feed('time,,bytes_in,bytes_out,') == {512: ('Safari', 1000, 2000),
+                                                        77: ('Google Chrome H', 30, 0)}
+    assert parser.flush() is None
+
+
+def test_deltas_totals_and_reset():
+    backend = NettopBackend()
+    backend.update({512: ('Safari', 1000, 2000)}, now=0.0)
+    backend.update({512: ('Safari', 1500, 2100)}, now=1.0)
+    backend.update({512: ('Safari', 100, 0)}, now=2.0)  # counter restarted
+    assert backend.top() == [(512, 'Safari', 100, 0, 600, 100)]
+    backend.reset()
+    assert backend.top(by='total') == [(512, 'Safari', 100, 0, 0, 0)]
+
+
+def test_pids_missing_past_idle_timeout_are_forgotten():
+    backend = NettopBackend(idle_timeout=10.0)
+    backend.update({1: ('a', 0, 0), 2: ('b', 0, 0)}, now=0.0)
+    backend.update({1: ('a', 10, 0)}, now=5.0)
+    assert sorted(backend.processes) == [1, 2]
+    backend.update({1: ('a', 20, 0)}, now=11.0)
+    assert list(backend.processes) == [1]
+    assert list(backend._previous) == [1]
+    assert backend.top() == [(1, 'a', 10, 0, 20, 0)]
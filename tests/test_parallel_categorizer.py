@@ -0,0 +1,59 @@
+import queue
+import threading
+
+from category_rules import DEFAULT_RULES_PATH
+from packets import udp_frame
+from parallel_categorizer import ParallelCategorizer, _categorize_worker
+from prefix_trie import DEFAULT_RANGES_PATH
+
+
+def run_worker(messages):
+    """
+    Run a worker in a thread over the given inbox messages and return its last report.
+    """
+    inbox, outbox = queue.Queue(), queue.Queue()
+    for message in messages + [None]:
+        inbox.put(message)
+    worker = threading.Thread(target=_categorize_worker,
+                              args=(0, 'lo', DEFAULT_RULES_PATH, DEFAULT_RANGES_PATH, 60.0, inbox, outbox))
+    worker.start()
+    worker.join(30)
+    reports = []
+    while not outbox.empty():
+        reports.append(outbox.get())
+    return reports[-1]
+
+
+def test_worker_drops_batches_tagged_before_a_reset():
+    frame = udp_frame('192.0.2.10', '198.51.100.7', 40000, 9999)
+    report = run_worker([
+        ('frames', 0, 1, [(frame, 1)] * 5),
+        ('reset', 1),
+        # Sent before the reset but delivered after it
+        ('frames', 0, 1, [(frame, 1)] * 7),
+        ('frames', 1, 1, [(frame, 1)] * 3),
+    ])
+    assert report['generation'] == 1
+    assert report['packets'] == 3
+
+
+def test_snapshot_merges_host_summaries_across_workers():
+    # 60 busy hosts per worker push the shared host out of each worker's top 50,
+    # but its merged total is the largest
+    shared = udp_frame('203.0.113.1', '192.0.2.10', 9999, 40000, b'x' * 1000)
+    reports = []
+    for worker in range(2):
+        frames = [(shared, 1)] * 5
+        for i in range(60):
+            frames += [(udp_frame(f'198.51.{100 + worker}.{i}', '192.0.2.10', 9999, 40000, b'x' * 1000), 1)] * 6
+        report = run_worker([('frames', 0, 1, frames)])
+        report['worker'] = worker
+        reports.append(report)
+    assert all('203.0.113.1' not in [h for h, _, _ in r['hosts'].top(50)] for r in reports)
+
+    categorizer = ParallelCategorizer(workers=2)
+    categorizer._outbox = queue.Queue()
+    categorizer._reports = {report['worker']: report for report in reports}
+    host, _, count, error = categorizer.snapshot(top_n=1)['hosts'][0]
+    assert host == '203.0.113.1'
+    assert count - error <= 10 * len(shared) <= count
@@ -0,0 +1,54 @@
+from category_rules import CategoryRules
+from packets import dns_response, udp_frame, write_pcap
+from pcap_analyzer import PcapAnalyzer, print_report
+from prefix_trie import IpRanges
+
+RULES = CategoryRules([('suffix', 'youtube.com', 'video'), ('port', 'udp/3478', 'apps'),
+                       ('cidr', '198.51.100.0/24', 'audio')])
+
+
+def analyze(tmp_path, frames, **kwargs):
+    path = str(tmp_path / 'capture.pcap')
+    write_pcap(path, frames)
+    analyzer = PcapAnalyzer(**kwargs)
+    analyzer.analyze(path)
+    return analyzer
+
+
+def test_categories_from_dns_names_cidr_and_port_rules(tmp_path):
+    frames = [(1000.0, udp_frame('8.8.8.8', '192.168.1.2', 53, 50000,
+                                 dns_response('rr1.youtube.com', ['203.0.113.5'])))]
+    frames += [(1001.0, udp_frame('203.0.113.5', '192.168.1.2', 443, 50001, b'v' * 1000))] * 4
+    frames += [(1002.0, udp_frame('192.168.1.2', '198.51.100.9', 50002, 5004, b'a' * 500))] * 3
+    frames += [(1003.0, udp_frame('192.168.1.2', '192.0.2.1', 50003, 3478, b'p' * 200))] * 2
+    frames += [(1004.0, udp_frame('192.168.1.2', '192.0.2.1', 50004, 9999, b't' * 100))]
+    analyzer = analyze(tmp_path, frames)
+
+    categories = {category: (sent, received, packets)
+                  for category, sent, received, packets in analyzer.categories(RULES, IpRanges())}
+    frame = lambda size: 14 + 20 + 8 + size
+    assert categories['video'] == (0, 4 * frame(1000), 4)
+    assert categories['audio'] == (3 * frame(500), 0, 3)
+    assert categories['apps'] == (2 * frame(200), 0, 2)
+    # The DNS response and the unmatched flow
+    assert categories['text'][2] == 2
+
+
+def test_published_ranges_come_before_rules(tmp_path):
+    ranges = IpRanges()
+    ranges.add('198.51.100.0/24', 'video', 'Example CDN')
+    frames = [(1000.0, udp_frame('192.168.1.2', '198.51.100.9', 50002, 5004))]
+    analyzer = analyze(tmp_path, frames)
+    assert [row[0] for row in analyzer.categories(RULES, ranges)] == ['video']
+
+
+def test_report_shows_only_the_busiest_buckets(tmp_path, capsys):
+    frames = [(1000.0 + 60 * i, udp_frame('192.168.1.2', '192.0.2.1', 50000, 443, b'x' * (10 + i)))
+              for i in range(30)]
+    analyzer = analyze(tmp_path, frames, bucket_seconds=60)
+    print_report(analyzer, top_n=3, rules=RULES, ranges=IpRanges())
+    out = capsys.readouterr().out
+    assert 'Busiest 3 of 30 60s buckets' in out
+    assert 'Usage per category' in out
+    bucket_table = out[out.index('Busiest'):out.index('Packets:')]
+    assert bucket_table.count(' MB ') == 6  # sent and received of 3 buckets
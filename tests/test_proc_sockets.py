@@ -0,0 +1,42 @@
+import os
+
+from proc_sockets import ProcSocketMapper
+
+TCP_HEADER = '  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode\n'
+
+
+def _write_tcp(proc, inodes):
+    lines = [f"   {i}: 0100007F:{1000 + i:04X} 0100007F:0050 01 00000000:00000000 00:00000000 00000000  1000        0 {inode}\n"
+             for i, inode in enumerate(inodes)]
+    with open(os.path.join(proc, 'net', 'tcp'), 'w') as f:
+        f.write(TCP_HEADER + ''.join(lines))
+
+
+def _point_fd(proc, pid, fd, target):
+    path = os.path.join(proc, str(pid), 'fd', str(fd))
+    if os.path.lexists(path):
+        os.remove(path)
+    os.symlink(target, path)
+
+
+def test_budgeted_search_reaches_every_pid(tmp_path):
+    proc = str(tmp_path)
+    os.makedirs(os.path.join(proc, 'net'))
+    pids = list(range(100, 120))
+    for pid in pids:
+        os.makedirs(os.path.join(proc, str(pid), 'fd'))
+        for fd in range(4):
+            _point_fd(proc, pid, fd, '/dev/null')
+    _write_tcp(proc, [])
+
+    # One PID per refresh fits in the budget
+    mapper = ProcSocketMapper(proc=proc, scan_budget=4)
+    mapper.refresh(now=0)
+
+    # Every PID replaces a file with a socket; fd counts are unchanged
+    for pid in pids:
+        _point_fd(proc, pid, 3, f'socket:[{pid}]')
+    _write_tcp(proc, pids)
+    for now in range(1, len(pids) + 1):
+        mapper.refresh(now=now)
+    assert mapper.owners == {pid: pid for pid in pids}
@@ -0,0 +1,91 @@
+import time
+
+import pytest
+
+from quota import Quota, QuotaTracker, RETENTION_HOURS, load_quotas
+
+
+@pytest.fixture(autouse=True)
+def utc(monkeypatch):
+    monkeypatch.setenv('TZ', 'UTC')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def at(year, month, day, hour=0, minute=0):
+    return time.mktime((year, month, day, hour, minute, 0, 0, 0, -1))
+
+
+def test_monthly_window_clamps_start_day_to_month_length():
+    quota = Quota('billing', 'monthly', 100, start=31)
+    assert quota.window(at(2024, 2, 10)) == (at(2024, 1, 31), at(2024, 2, 29))
+    assert quota.window(at(2024, 3, 1)) == (at(2024, 2, 29), at(2024, 3, 31))
+    assert quota.window(at(2024, 12, 31, 12)) == (at(2024, 12, 31), at(2025, 1, 31))
+
+
+def test_daily_window_starts_at_the_configured_hour():
+    quota = Quota('fair-use', 'daily', 100, start=6)
+    assert quota.window(at(2024, 5, 2, 5, 59)) == (at(2024, 5, 1, 6), at(2024, 5, 2, 6))
+    assert quota.window(at(2024, 5, 2, 6)) == (at(2024, 5, 2, 6), at(2024, 5, 3, 6))
+
+
+def test_usage_and_alerts_restart_when_the_billing_cycle_rolls_over():
+    quota = Quota('billing', 'monthly', 100, start=15)
+    tracker = QuotaTracker([quota], state_path=None)
+
+    alerts = tracker.add(85, now=at(2024, 3, 14, 22, 30))
+    assert [level for _, level, _ in alerts] == [80]
+    alerts = tracker.add(15, now=at(2024, 3, 14, 23, 30))
+    assert [level for _, level, _ in alerts] == [90, 100]
+    assert tracker.usage(quota, now=at(2024, 3, 14, 23, 59)) == 100
+
+    # New cycle: usage starts from zero and every level can fire again
+    assert tracker.add(50, now=at(2024, 3, 15, 0, 30)) == []
+    assert tracker.usage(quota, now=at(2024, 3, 15, 1)) == 50
+    alerts = tracker.add(40, now=at(2024, 3, 20))
+    assert [(level, used) for _, level, used in alerts] == [(80, 90), (90, 90)]
+    # Hours without samples carry the total over
+    assert tracker.usage_between(at(2024, 3, 14), at(2024, 3, 21)) == 190
+    assert tracker.usage_between(at(2024, 3, 16), at(2024, 3, 19)) == 0
+
+
+def test_rolling_window_slides_and_rearms_alerts():
+    quota = Quota('last-24h', 'rolling', 100, start=24, alerts=(100,))
+    tracker = QuotaTracker([quota], state_path=None)
+    assert len(tracker.add(120, now=at(2024, 1, 1, 10))) == 1
+    assert tracker.add(1, now=at(2024, 1, 1, 20)) == []
+
+    # The 120 MB hour left the window; the level fires again once reached
+    assert tracker.usage(quota, now=at(2024, 1, 2, 12)) == 1
+    assert tracker.add(50, now=at(2024, 1, 2, 12)) == []
+    assert len(tracker.add(60, now=at(2024, 1, 2, 13))) == 1
+
+
+def test_state_survives_restart_and_old_hours_are_dropped(tmp_path):
+    path = str(tmp_path / 'quota_state.json')
+    quota = Quota('billing', 'monthly', 100)
+    tracker = QuotaTracker([quota], state_path=path)
+    tracker.add(85, now=at(2024, 1, 1, 1))
+    tracker.save()
+
+    restarted = QuotaTracker([quota], state_path=path)
+    assert restarted.usage(quota, now=at(2024, 1, 1, 2)) == 85
+    # The 80% alert already fired in this window
+    assert restarted.add(1, now=at(2024, 1, 1, 2)) == []
+
+    restarted.add(1, now=at(2024, 6, 1))
+    assert len(restarted.prefix) == RETENTION_HOURS + 1
+    assert restarted.usage(quota, now=at(2024, 6, 1)) == 1
+
+
+def test_load_quotas(tmp_path):
+    path = tmp_path / 'quotas.conf'
+    path.write_text("# comment\nbilling monthly 100000 15 50,100\nday daily 5000\n")
+    quotas = load_quotas(str(path))
+    assert [(q.name, q.period, q.limit, q.start, q.alerts) for q in quotas] == [
+        ('billing', 'monthly', 100000, 15, (50, 100)), ('day', 'daily', 5000, 0, (80, 90, 100))]
+    path.write_text("weekly weekly 10\n")
+    with pytest.raises(ValueError, match='quotas.conf:1'):
+        load_quotas(str(path))
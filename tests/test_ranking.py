@@ -0,0 +1,29 @@
+from ranking import RateRanker
+
+
+def test_top_orders_by_rate_and_total():
+    ranker = RateRanker()
+    ranker.add('a', sent=1000, now=100.0)
+    ranker.add('b', received=5000, now=100.0)
+    ranker.add('a', sent=8000, now=130.0)
+    assert [key for key, _ in ranker.top(2, mode='rate', window=2, now=130.5)] == ['a', 'b']
+    assert [key for key, _ in ranker.top(2, mode='total', now=130.5)] == ['a', 'b']
+    assert ranker.stats('b', now=130.5)['rates'] == {2: 0, 10: 0, 40: 5000 / 40}
+
+
+def test_expire_forgets_idle_keys():
+    ranker = RateRanker(idle_timeout=60)
+    ranker.add(1, sent=100, now=0.0)
+    ranker.add(2, sent=100, now=0.0)
+    ranker.top(5, now=10.0)
+    ranker.add(2, sent=100, now=50.0)
+    assert ranker.expire(now=70.0) == [1]
+    assert 1 not in ranker and 2 in ranker
+    assert [key for key, _ in ranker.top(5, mode='total', now=70.0)] == [2]
+
+
+def test_expire_keeps_every_key_without_idle_timeout():
+    ranker = RateRanker()
+    ranker.add(1, sent=100, now=0.0)
+    assert ranker.expire(now=1e6) == []
+    assert len(ranker) == 1
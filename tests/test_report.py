@@ -0,0 +1,44 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from report import build_report, bucket_totals
+
+
+@pytest.fixture
+def new_york():
+    previous = os.environ.get('TZ')
+    os.environ['TZ'] = 'America/New_York'
+    time.tzset()
+    yield
+    if previous is None:
+        del os.environ['TZ']
+    else:
+        os.environ['TZ'] = previous
+    time.tzset()
+
+
+def test_day_and_hour_buckets_follow_daylight_saving(new_york):
+    # Hourly samples from 2024-03-09 00:00 EST to 2024-03-12 00:00 EDT;
+    # clocks went forward on 2024-03-10 at 02:00
+    start = time.mktime((2024, 3, 9, 0, 0, 0, 0, 0, -1))
+    timestamps = np.arange(start, start + 71 * 3600, 3600.0)
+    ones = np.ones(len(timestamps))
+    report = build_report(timestamps, ones, ones * 0)
+
+    day_starts, day_in, _ = report['days']
+    assert [time.localtime(t)[:5] for t in day_starts] == [(2024, 3, 9, 0, 0), (2024, 3, 10, 0, 0),
+                                                          (2024, 3, 11, 0, 0)]
+    assert day_in.tolist() == [24, 23, 24]
+    hour_starts, hour_in, _ = report['hours']
+    assert len(hour_starts) == 71 and (hour_in == 1).all()
+    assert all(time.localtime(t).tm_min == 0 for t in hour_starts)
+
+
+def test_bucket_totals_constant_offset():
+    timestamps = np.array([0.0, 10.0, 3600.0, 3700.0])
+    starts, incoming, outgoing = bucket_totals(timestamps, np.array([1.0, 2, 3, 4]), np.zeros(4), 3600)
+    assert starts.tolist() == [0, 3600]
+    assert incoming.tolist() == [3, 7]
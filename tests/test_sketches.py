@@ -0,0 +1,138 @@
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+
+import pytest
+
+from sketches import CountMinSketch, HyperLogLog, RemoteTrafficSketch, SpaceSaving, _hash64
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope='module')
+def zipf_traffic():
+    """
+    Zipf-distributed synthetic traffic: (host, packet size) pairs and the
+    exact bytes per host.
+    """
+    rng = random.Random(7)
+    hosts = 50000
+    weights = [1.0 / (rank + 1) ** 1.1 for rank in range(hosts)]
+    stream = rng.choices([f"10.{h >> 16}.{(h >> 8) & 255}.{h & 255}" for h in range(hosts)],
+                         weights=weights, k=200000)
+    packets = [(host, rng.randint(60, 1500)) for host in stream]
+    exact = {}
+    for host, size in packets:
+        exact[host] = exact.get(host, 0) + size
+    return packets, exact
+
+
+def test_space_saving_error_bound(zipf_traffic):
+    packets, exact = zipf_traffic
+    summary = SpaceSaving(500)
+    for host, size in packets:
+        summary.add(host, size)
+
+    bound = summary.error_bound()
+    assert bound == pytest.approx(sum(exact.values()) / 500)
+    for host, count, error in summary.top(10):
+        assert exact[host] <= count <= exact[host] + error <= exact[host] + bound
+    for host, count in exact.items():
+        if count > bound:
+            estimate, error = summary.estimate(host)
+            assert count <= estimate <= count + error
+
+
+def test_space_saving_merge_error_bound(zipf_traffic):
+    # Packets spread over four summaries, as flows are over workers
+    packets, exact = zipf_traffic
+    parts = [SpaceSaving(500) for _ in range(4)]
+    for i, (host, size) in enumerate(packets):
+        parts[i % 4].add(host, size)
+    merged = SpaceSaving(500)
+    for part in parts:
+        merged.merge(part)
+
+    assert merged.total == sum(exact.values())
+    assert len(merged) <= 500
+    bound = merged.error_bound()
+    for host, count, error in merged.top(50):
+        assert exact[host] <= count <= exact[host] + error <= exact[host] + bound
+    assert [host for host, _, _ in merged.top(5)] == sorted(exact, key=exact.get, reverse=True)[:5]
+
+
+def test_count_min_error_bound(zipf_traffic):
+    packets, exact = zipf_traffic
+    cms = CountMinSketch(epsilon=0.001, delta=0.01)
+    for host, size in packets:
+        cms.add(host, size)
+
+    assert all(cms.estimate(host) >= count for host, count in exact.items())
+    misses = sum(1 for host, count in exact.items() if cms.estimate(host) - count > cms.error_bound())
+    assert misses <= cms.delta * len(exact)
+
+
+def test_hyperloglog_relative_error(zipf_traffic):
+    packets, exact = zipf_traffic
+    hll = HyperLogLog()
+    for host, _ in packets:
+        hll.add(host)
+
+    distinct = len(exact)
+    assert abs(hll.count() - distinct) / distinct <= 3 * hll.relative_error()
+
+
+def test_hyperloglog_small_cardinality():
+    hll = HyperLogLog()
+    for i in range(100):
+        hll.add(f"192.168.0.{i}")
+        hll.add(f"192.168.0.{i}")
+    assert hll.count() == pytest.approx(100, rel=0.05)
+
+
+def test_hash_is_stable_across_processes():
+    # str hashes are randomized per process; the sketch hash must not be
+    code = "from sketches import _hash64; print(_hash64('93.184.216.34'))"
+    values = set()
+    for seed in ('1', '2'):
+        result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True,
+                                env=dict(os.environ, PYTHONHASHSEED=seed), check=True)
+        values.add(int(result.stdout))
+    assert values == {_hash64('93.184.216.34')}
+
+
+def test_unique_hosts_are_counted_per_interval():
+    remote = RemoteTrafficSketch()
+    for i in range(50):
+        remote.observe(f"10.0.0.{i}", 443, 100)
+    assert remote.end_interval().count() == pytest.approx(50, rel=0.05)
+    remote.observe('10.0.0.1', 443, 100)
+    assert remote.unique_hosts() == pytest.approx(1, abs=0.5)
+    assert remote.hosts.total == 5100
+
+
+def _count_hosts(first, last, results):
+    hll = HyperLogLog()
+    for i in range(first, last):
+        hll.add(f"10.0.{i >> 8}.{i & 255}")
+    results.put(hll)
+
+
+def test_hyperloglog_merge_across_processes(monkeypatch):
+    # Overlapping host ranges in separate processes, each with its own hash seed
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    processes = []
+    for worker, first in enumerate(range(0, 800, 200)):
+        monkeypatch.setenv('PYTHONHASHSEED', str(worker + 1))
+        process = context.Process(target=_count_hosts, args=(first, first + 400, results))
+        process.start()
+        processes.append(process)
+    merged = HyperLogLog()
+    for _ in processes:
+        merged.merge(results.get(timeout=30))
+    for process in processes:
+        process.join()
+    assert merged.count() == pytest.approx(1000, rel=3 * merged.relative_error())
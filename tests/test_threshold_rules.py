@@ -0,0 +1,95 @@
+import pytest
+
+from threshold_rules import Rule, RuleEngine, counter_deltas, load_rules
+
+MB = 1024 ** 2
+
+
+def feed(engine, samples):
+    """
+    Feed (time, {nic: (bytes_recv, bytes_sent)}) samples; return the names of
+    the rules triggered at each time.
+    """
+    return {now: [rule.name for rule in engine.update(counters, now)] for now, counters in samples}
+
+
+def test_volume_rule_evicts_samples_that_leave_the_window():
+    rule = Rule('burst', '*', 'total', '1MB', '10s')
+    engine = RuleEngine([rule])
+    received = 0
+    samples = []
+    for now in range(0, 21):
+        # 200 KB per second until t=6, then idle
+        received += 200 * 1024 if 0 < now <= 6 else 0
+        samples.append((float(now), {'eth0': (received, 0)}))
+    triggered = feed(engine, samples)
+
+    assert [now for now, names in triggered.items() if names] == [6.0]
+    assert not rule.active
+    # Only the samples after t=10 remain in the window
+    assert rule.value == 0
+
+    # Re-armed: a new burst triggers again
+    assert engine.update({'eth0': (received + 2 * MB, 0)}, 21.0) == [rule]
+
+
+def test_counter_reset_counts_the_new_value():
+    assert counter_deltas({'eth0': (5000, 900), 'wlan0': (1, 1)},
+                          {'eth0': (300, 1000), 'tun0': (7, 7)}) == {'eth0': (300, 100)}
+
+    rule = Rule('in', 'eth0', 'in', '1MB', '1min')
+    engine = RuleEngine([rule])
+    engine.update({'eth0': (10 * MB, 0)}, 0.0)
+    engine.update({'eth0': (10 * MB + 100, 0)}, 1.0)
+    # The NIC counter restarted (driver reload): the delta is the new value, never negative
+    engine.update({'eth0': (200, 0)}, 2.0)
+    assert rule.value == 300
+    assert not rule.active
+
+
+def test_sustained_rule_restarts_its_run_when_the_rate_drops():
+    rule = Rule('saturated', '*', 'in', '1MB/s', '3s')
+    engine = RuleEngine([rule])
+    # Bytes received per second
+    rates = [2, 2, 2, 0.5, 2, 2, 2, 2, 0.5]
+    received = 0
+    samples = [(0.0, {'eth0': (0, 0)})]
+    for second, rate in enumerate(rates, 1):
+        received += int(rate * MB)
+        samples.append((float(second), {'eth0': (received, 0)}))
+    triggered = {}
+    for now, counters in samples:
+        triggered[now] = [r.name for r in engine.update(counters, now)]
+        if now == 2.0:
+            # Above the threshold since t=0
+            assert rule.run_start == 0.0 and not rule.active
+        if now == 4.0:
+            assert rule.run_start is None and not rule.active
+        if now == 5.0:
+            assert rule.run_start == 4.0
+
+    # Two seconds above, a dip at t=4, then three full seconds above from t=4
+    assert [now for now, names in triggered.items() if names] == [3.0, 7.0]
+    assert not rule.active  # the dip at t=9 re-arms it
+    assert rule.value == 0.5 * MB
+
+
+def test_rules_are_per_interface_and_direction():
+    eth_out = Rule('eth-out', 'eth0', 'out', '1MB', '10s')
+    all_in = Rule('all-in', '*', 'in', '1MB', '10s')
+    engine = RuleEngine([eth_out, all_in])
+    engine.update({'eth0': (0, 0), 'wlan0': (0, 0)}, 0.0)
+    triggered = engine.update({'eth0': (MB // 2 + 1, 2 * MB), 'wlan0': (MB // 2, 0)}, 1.0)
+    assert triggered == [eth_out, all_in]
+    assert engine.active() == [eth_out, all_in]
+
+
+def test_load_rules(tmp_path):
+    path = tmp_path / 'rules.conf'
+    path.write_text("# comment\nbulk * total >500MB 10min\nsat eth0 in >50Mbit/s 2min  # trailing\n")
+    bulk, sat = load_rules(str(path))
+    assert (bulk.threshold, bulk.window, bulk.sustained) == (500 * MB, 600, False)
+    assert (sat.threshold, sat.window, sat.sustained) == (50e6 / 8, 120, True)
+    path.write_text("bad * sideways >1MB 10s\n")
+    with pytest.raises(ValueError, match='rules.conf:1: unknown direction'):
+        load_rules(str(path))
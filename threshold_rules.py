@@ -0,0 +1,248 @@
+import argparse
+import os
+import re
+import time
+from collections import deque
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'threshold_rules.conf')
+
+DIRECTIONS = ('in', 'out', 'total')
+
+# Unit -> bytes (volumes) or bytes per second (rates)
+VOLUME_UNITS = {'b': 1, 'kb': 1024, 'mb': 1024 ** 2, 'gb': 1024 ** 3, 'tb': 1024 ** 4}
+RATE_UNITS = {'bit/s': 1 / 8, 'kbit/s': 1e3 / 8, 'mbit/s': 1e6 / 8, 'gbit/s': 1e9 / 8,
+              'b/s': 1, 'kb/s': 1024, 'mb/s': 1024 ** 2, 'gb/s': 1024 ** 3}
+DURATION_UNITS = {'s': 1, 'sec': 1, 'min': 60, 'm': 60, 'h': 3600}
+
+_QUANTITY = re.compile(r'^([0-9]*\.?[0-9]+)\s*([a-zA-Z/]*)$')
+
+
+def _parse_quantity(text, units, default_unit):
+    match = _QUANTITY.match(text)
+    if not match:
+        raise ValueError(f"invalid quantity '{text}'")
+    unit = (match.group(2) or default_unit).lower()
+    if unit not in units:
+        raise ValueError(f"unknown unit '{match.group(2)}' in '{text}'")
+    return float(match.group(1)) * units[unit]
+
+
+class Rule:
+    def __init__(self, name, interface, direction, threshold, window):
+        """
+        One threshold rule, e.g. '> 500 MB in any 10 min window' or
+        '> 50 Mbit/s sustained for 2 min'.
+        :param interface: NIC name, or '*' for the sum of all NICs.
+        :param direction: 'in', 'out' or 'total'.
+        :param threshold: Text such as '500MB' (volume within the window) or
+                          '50Mbit/s' (rate held for the whole window).
+        :param window: Text such as '10min', '2min' or '30s'.
+        """
+        if direction not in DIRECTIONS:
+            raise ValueError(f"unknown direction '{direction}', expected one of {', '.join(DIRECTIONS)}")
+        self.name = name
+        self.interface = interface
+        self.direction = direction
+        self.text = f"{direction} > {threshold} {'for' if '/' in threshold else 'in'} {window}"
+        self.sustained = '/' in threshold
+        if self.sustained:
+            self.threshold = _parse_quantity(threshold, RATE_UNITS, 'mbit/s')
+        else:
+            self.threshold = _parse_quantity(threshold, VOLUME_UNITS, 'mb')
+        self.window = _parse_quantity(window, DURATION_UNITS, 's')
+        if self.window <= 0:
+            raise ValueError(f"window must be positive: '{window}'")
+        self.active = False
+        self.value = 0.0  # bytes in the window, or the latest rate for sustained rules
+        self.run_start = None  # sustained rules: when the rate last rose above the threshold
+
+    def __repr__(self):
+        return f"Rule({self.name!r}, {self.interface!r}, {self.text!r})"
+
+
+def load_rules(path=DEFAULT_RULES_PATH):
+    """
+    Read a rules file: one '<name> <interface|*> <in|out|total> ><threshold> <window>'
+    entry per line, '#' comments. A missing file yields no rules.
+    """
+    rules = []
+    if not os.path.exists(path):
+        return rules
+    with open(path) as f:
+        for number, line in enumerate(f, 1):
+            fields = line.split('#', 1)[0].split()
+            if not fields:
+                continue
+            if len(fields) != 5 or not fields[3].startswith('>'):
+                raise ValueError(f"{path}:{number}: expected '<name> <interface|*> <direction> ><threshold> <window>'")
+            try:
+                rules.append(Rule(fields[0], fields[1], fields[2], fields[3][1:], fields[4]))
+            except ValueError as e:
+                raise ValueError(f"{path}:{number}: {e}")
+    return rules
+
+
+def counter_deltas(previous, current):
+    """
+    Per-NIC (bytes in, bytes out) since the previous counters. A counter that
+    went backwards was reset, so its current value is the delta. NICs
+    without previous counters are left out.
+    :param previous: {nic: (bytes_recv, bytes_sent)}.
+    :param current: {nic: (bytes_recv, bytes_sent)}.
+    """
+    deltas = {}
+    for nic, (bytes_in, bytes_out) in current.items():
+        last = previous.get(nic)
+        if last is None:
+            continue
+        deltas[nic] = (bytes_in - last[0] if bytes_in >= last[0] else bytes_in,
+                       bytes_out - last[1] if bytes_out >= last[1] else bytes_out)
+    return deltas
+
+
+def nic_counters(counters):
+    """
+    Normalize psutil.net_io_counters(pernic=True) or {nic: (bytes_recv, bytes_sent)}
+    to {nic: (bytes_recv, bytes_sent)}.
+    """
+    return {nic: (c.bytes_recv, c.bytes_sent) if hasattr(c, 'bytes_recv') else tuple(c)
+            for nic, c in counters.items()}
+
+
+class _Window:
+    def __init__(self, length):
+        """
+        Running byte sum over the samples of the last length seconds, shared
+        by the volume rules with the same interface, direction and window.
+        Each sample is added once and evicted once, so updates are O(1)
+        amortized.
+        """
+        self.length = length
+        self.samples = deque()  # (sample end time, bytes)
+        self.total = 0.0
+        self.rules = []
+
+    def push(self, now, value):
+        self.samples.append((now, value))
+        self.total += value
+        horizon = now - self.length
+        samples = self.samples
+        while samples and samples[0][0] <= horizon:
+            self.total -= samples.popleft()[1]
+        if not samples:
+            self.total = 0.0  # drop accumulated float error
+
+
+class RuleEngine:
+    def __init__(self, rules):
+        """
+        Evaluate threshold rules incrementally, one sample at a time.
+
+        Rules are compiled once into a table keyed by (interface, direction).
+        Volume rules sharing a window length share one running sum; sustained
+        rules only keep the time their rate last rose above the threshold.
+        A sample therefore costs O(1) per rule, whatever the window lengths.
+        """
+        self.rules = list(rules)
+        self.streams = {}  # (interface, direction) -> ([_Window], [sustained Rule])
+        for rule in self.rules:
+            windows, sustained = self.streams.setdefault((rule.interface, rule.direction), ([], []))
+            if rule.sustained:
+                sustained.append(rule)
+                continue
+            for window in windows:
+                if window.length == rule.window:
+                    break
+            else:
+                window = _Window(rule.window)
+                windows.append(window)
+            window.rules.append(rule)
+        self.interfaces = {interface for interface, _ in self.streams}
+        self._previous = None  # interface -> (bytes_recv, bytes_sent)
+        self._previous_time = None
+
+    def update(self, counters, now=None):
+        """
+        Feed cumulative per-NIC byte counters, e.g. from
+        psutil.net_io_counters(pernic=True) or {nic: (bytes_recv, bytes_sent)}.
+        :return: List of rules that became active with this sample.
+        """
+        now = time.time() if now is None else now
+        current = nic_counters(counters)
+        previous, previous_time = self._previous, self._previous_time
+        self._previous, self._previous_time = current, now
+        if previous is None or now <= previous_time:
+            return []
+        elapsed = now - previous_time
+
+        deltas = counter_deltas(previous, current)
+        deltas['*'] = (sum(delta[0] for delta in deltas.values()), sum(delta[1] for delta in deltas.values()))
+
+        triggered = []
+        for (interface, direction), (windows, sustained) in self.streams.items():
+            delta = deltas.get(interface)
+            if delta is None:
+                continue
+            value = delta[0] if direction == 'in' else delta[1] if direction == 'out' else delta[0] + delta[1]
+            for window in windows:
+                window.push(now, value)
+                for rule in window.rules:
+                    rule.value = window.total
+                    active = window.total > rule.threshold
+                    if active and not rule.active:
+                        triggered.append(rule)
+                    rule.active = active
+            if sustained:
+                rate = value / elapsed
+                for rule in sustained:
+                    rule.value = rate
+                    if rate <= rule.threshold:
+                        rule.run_start = None
+                        rule.active = False
+                        continue
+                    if rule.run_start is None:
+                        rule.run_start = previous_time
+                    if not rule.active and now - rule.run_start >= rule.window:
+                        rule.active = True
+                        triggered.append(rule)
+        return triggered
+
+    def active(self):
+        return [rule for rule in self.rules if rule.active]
+
+
+def describe(rule):
+    """
+    One display line for a rule and its current value.
+    """
+    value = f"{rule.value * 8 / 1e6:.1f} Mbit/s" if rule.sustained else f"{rule.value / 1024 ** 2:.1f} MB"
+    return f"{rule.name} [{rule.interface} {rule.text}]: {value}"
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description='Sliding-window threshold rules over NIC counters')
+    parser.add_argument('-R', '--rules', type=str, default=DEFAULT_RULES_PATH,
+                        help='Rules file')
+    parser.add_argument('-r', '--refresh', type=float, default=1,
+                        help='Sampling interval in seconds')
+    return parser.parse_args()
+
+
+def main():
+    import psutil
+
+    args = parse_arguments()
+    engine = RuleEngine(load_rules(args.rules))
+    print(f"{len(engine.rules)} rules on {len(engine.streams)} interface/direction streams")
+    engine.update(psutil.net_io_counters(pernic=True))
+    try:
+        while True:
+            time.sleep(args.refresh)
+            for rule in engine.update(psutil.net_io_counters(pernic=True)):
+                print(f"{time.strftime('%H:%M:%S')} {describe(rule)}", flush=True)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
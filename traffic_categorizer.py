@@ -0,0 +1,331 @@
+import curses
+import threading
+import time
+from category_rules import CategoryRules, DEFAULT_RULES_PATH
+from dns_cache import DnsCache
+from flow_cache import FlowVerdictCache, flow_key
+from hostname_classifier import extract_hostname
+from net_utils import local_addresses
+from prefix_trie import DEFAULT_RANGES_PATH, IpRanges
+from raw_packet import IPPROTO_UDP, LINKTYPES_BY_LAYER, LINKTYPE_ETHERNET, parse_frame
+from sampling import PacketSampler, SampledEstimates
+from sketches import RemoteTrafficSketch
+
+class TrafficCategorizer:
+    def __init__(self, interface: str = 'en0', sample_rate: int = 1, cpu_budget: float = None,
+                 rules_path: str = DEFAULT_RULES_PATH, ranges_path: str = DEFAULT_RANGES_PATH):
+        """
+        Initialize the traffic categorizer with the network interface to monitor.
+        :param interface: Network interface to capture packets (e.g., 'en0', 'wlan0').
+        :param sample_rate: Categorize 1 in N packets and scale the usage up.
+        :param cpu_budget: Fraction of one core for categorization; adjusts N automatically.
+        :param rules_path: Category rules file (see category_rules.conf).
+        :param ranges_path: Published IP ranges file (see ip_ranges.conf).
+        """
+        self.interface = interface
+        self.categories = {
+            "video": 0.0,
+            "audio": 0.0,
+            "apps": 0.0,
+            "text": 0.0
+        }
+        self.rules = CategoryRules.load(rules_path)
+        self.ip_ranges = IpRanges.load(ranges_path)
+        for category in self.rules.categories + self.ip_ranges.categories:
+            self.categories.setdefault(category, 0.0)
+        self.remote_traffic = RemoteTrafficSketch(asn_lookup=self.ip_ranges.owner)
+        self.local_ips = local_addresses()
+        self.sampler = PacketSampler(rate=sample_rate, cpu_budget=cpu_budget)
+        self.category_estimates = SampledEstimates()
+        self.linktype = None
+        self.flow_cache = FlowVerdictCache()
+        self.dns_cache = DnsCache()
+
+        # The capture thread updates the counters under this lock; the view
+        # only holds it long enough to copy them.
+        self.lock = threading.Lock()
+        self.running = True
+        self.last_error = None
+
+    def categorize_packet(self, packet, weight=1):
+        """
+        Categorize a single packet from its raw bytes.
+        :param packet: A pyshark packet object captured with include_raw=True.
+        :param weight: Sampling weight; the packet stands for this many packets.
+        """
+        try:
+            if self.linktype is None:
+                self.linktype = LINKTYPES_BY_LAYER.get(packet.layers[0].layer_name, LINKTYPE_ETHERNET)
+            self.categorize_frame(packet.get_raw_packet(), weight)
+        except Exception as e:
+            self.last_error = f"Error processing packet: {e}"
+
+    def categorize_frame(self, frame, weight=1):
+        """
+        Categorize a raw frame. A flow's category comes from the published IP
+        range containing the remote address if there is one; otherwise the rules
+        are applied to the hostname in its TLS ClientHello, QUIC Initial or DNS
+        message (or the name the remote address was resolved from in an earlier
+        DNS response), then to the remote address and port. The verdict is
+        cached so later packets of the flow only cost a lookup; unmatched flows
+        count as text.
+        :param frame: Raw frame bytes.
+        :param weight: Sampling weight; the frame stands for this many frames.
+        """
+        linktype = LINKTYPE_ETHERNET if self.linktype is None else self.linktype
+        info = parse_frame(frame, linktype)
+        if info is None:
+            return
+        length = len(frame)
+        packet_size_mb = length / (1024 * 1024)
+        remote_ip, remote_port = self.observe_remote(info, length, weight)
+
+        now = time.time()
+        if info.proto == IPPROTO_UDP and info.sport == 53:
+            self.dns_cache.learn_payload(info.payload, now)
+
+        key = flow_key(info)
+        category = self.flow_cache.lookup(key, length, now)
+        if category is None:
+            found = self.ip_ranges.category(remote_ip)
+            if found is None:
+                hostname = extract_hostname(info) or self.dns_cache.lookup(remote_ip, now)
+                found = self.rules.match_hostname(hostname) if hostname else None
+            if found is None:
+                found = self.rules.match_address(remote_ip) or self.rules.match_port(info.proto, remote_port)
+            category = self.flow_cache.record(key, found, length, now) or 'text'
+        self.categories[category] += packet_size_mb * weight
+        self.category_estimates.add(category, packet_size_mb, weight)
+
+    def learn_dns(self, frame):
+        """
+        Learn hostnames from a frame carrying a DNS response without counting it.
+        """
+        linktype = LINKTYPE_ETHERNET if self.linktype is None else self.linktype
+        info = parse_frame(frame, linktype)
+        if info is not None and info.proto == IPPROTO_UDP and info.sport == 53:
+            self.dns_cache.learn_payload(info.payload, time.time())
+
+    def process_packet(self, packet):
+        """
+        Categorize a packet if the sampler picks it, accounting the time spent.
+        """
+        weight = self.sampler.sample()
+        if not weight:
+            return False
+        start = time.perf_counter()
+        with self.lock:
+            self.categorize_packet(packet, weight)
+        self.sampler.record_cost(time.perf_counter() - start)
+        return True
+
+    def observe_remote(self, info, length, weight=1):
+        """
+        Feed the remote endpoint of a packet into the heavy-hitter sketches.
+        :param info: FrameInfo of the decoded packet.
+        :return: (remote address, remote port)
+        """
+        outgoing = info.src in self.local_ips
+        remote_ip = info.dst if outgoing else info.src
+        remote_port = info.dport if outgoing else info.sport
+        self.remote_traffic.observe(remote_ip, remote_port, length * weight)
+        return remote_ip, remote_port
+
+    def display_remote_hosts(self, top_n=5):
+        """
+        Display the heaviest remote hosts with their error bounds.
+        """
+        now = time.time()
+        print(f"\n{'Remote Host':<40}{'Hostname':<40}{'Usage (MB)':<20}{'Error (MB)':<20}")
+        for host, count, error in self.remote_traffic.hosts.top(top_n):
+            hostname = self.dns_cache.lookup(host, now) or ''
+            print(f"{host:<40}{hostname[:39]:<40}{count / (1024 * 1024):<20.2f}{error / (1024 * 1024):<20.2f}")
+        print(f"Unique remote hosts (estimate): {self.remote_traffic.unique_hosts():.0f}")
+        self.remote_traffic.end_interval()
+        owners = self.remote_traffic.asns.top(top_n)
+        if owners:
+            print(f"\n{'Owner':<40}{'Usage (MB)':<20}")
+            for owner, count, _ in owners:
+                print(f"{owner:<40}{count / (1024 * 1024):<20.2f}")
+
+    def snapshot(self, top_n=5):
+        """
+        Copy what the view displays, holding the lock only for the copy.
+        """
+        now = time.time()
+        with self.lock:
+            categories = [(category, usage, self.category_estimates.interval(category)[1])
+                          for category, usage in self.categories.items()]
+            hosts = [(host, self.dns_cache.lookup(host, now) or '', count, error)
+                     for host, count, error in self.remote_traffic.hosts.top(top_n)]
+            owners = self.remote_traffic.asns.top(top_n)
+            # Distinct hosts are counted per display interval
+            unique_hosts = self.remote_traffic.end_interval().count()
+        return {
+            'categories': categories,
+            'hosts': hosts,
+            'owners': owners,
+            'unique_hosts': unique_hosts,
+            'sample_rate': self.sampler.rate,
+        }
+
+    def reset(self):
+        """
+        Reset the categorized usage and remote host counters.
+        """
+        with self.lock:
+            for category in self.categories:
+                self.categories[category] = 0.0
+            self.category_estimates.reset()
+            self.remote_traffic.reset()
+
+    def display_categories(self):
+        """
+        Display the usage per category with its 95% confidence interval.
+        """
+        print(f"{'Category':<20}{'Usage (MB)':<20}{'95% CI (MB)':<20}")
+        for category, usage in self.categories.items():
+            _, margin = self.category_estimates.interval(category)
+            print(f"{category.capitalize():<20}{usage:<20.2f}{'±' + format(margin, '.2f'):<20}")
+        print(f"Sampling 1 in {self.sampler.rate} packets")
+
+    def capture(self):
+        """
+        Capture and categorize packets until stopped. Runs in its own thread so
+        packet processing never waits on the terminal.
+        """
+        import asyncio
+        import pyshark
+
+        asyncio.set_event_loop(asyncio.new_event_loop())
+        capture = pyshark.LiveCapture(interface=self.interface, use_json=True, include_raw=True)
+
+        last_adjust_time = time.time()
+        try:
+            for packet in capture.sniff_continuously():
+                if not self.running:
+                    break
+                self.process_packet(packet)
+                if time.time() - last_adjust_time >= 5:
+                    self.sampler.adjust()
+                    last_adjust_time = time.time()
+        except Exception as e:
+            self.last_error = f"Capture stopped: {e}"
+        finally:
+            capture.close()
+
+    def start_categorizing(self, refresh_rate=1.0):
+        """
+        Start monitoring and categorizing network traffic, rendering the
+        categorized usage every refresh_rate seconds.
+        """
+        capture_thread = threading.Thread(target=self.capture, daemon=True)
+        capture_thread.start()
+
+        stdscr = curses.initscr()
+        curses.noecho()
+        curses.cbreak()
+        stdscr.keypad(True)
+        try:
+            CategoryView(self, stdscr, refresh_rate=refresh_rate).run()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.running = False
+            curses.nocbreak()
+            stdscr.keypad(False)
+            curses.echo()
+            curses.endwin()
+            with self.lock:
+                self.final_summary()
+
+    def final_summary(self):
+        """
+        Display a final summary of categorized usage.
+        """
+        print("\nFinal Summary of Categorized Usage:")
+        self.display_categories()
+        self.display_remote_hosts(top_n=10)
+
+
+class CategoryView:
+    def __init__(self, categorizer, stdscr, refresh_rate=1.0):
+        """
+        Curses view of the categorized usage, redrawn on a fixed timer.
+        """
+        self.categorizer = categorizer
+        self.stdscr = stdscr
+        self.refresh_rate = refresh_rate
+        self.running = True
+
+    def run(self):
+        """
+        Main loop for displaying the usage and handling input.
+        """
+        self.stdscr.nodelay(True)
+        last_refresh_time = 0.0
+
+        while self.running:
+            key = self.stdscr.getch()
+            if key != -1:
+                key_char = chr(key).lower()
+                if key_char == 'q':
+                    self.running = False
+                elif key_char == 'r':
+                    self.categorizer.reset()
+                    last_refresh_time = 0.0
+
+            current_time = time.time()
+            if current_time - last_refresh_time >= self.refresh_rate:
+                self.display_usage()
+                last_refresh_time = current_time
+
+            time.sleep(0.1)
+
+    def display_usage(self):
+        """
+        Display the usage per category and the heaviest remote hosts.
+        """
+        snapshot = self.categorizer.snapshot(top_n=10)
+        max_rows, max_cols = self.stdscr.getmaxyx()
+        self.stdscr.clear()
+        lines = []
+
+        status = (f"Interface: {self.categorizer.interface} | Refresh Rate: {self.refresh_rate}s | "
+                  f"Sampling 1 in {snapshot['sample_rate']} packets")
+        lines.append((3, status))
+
+        line = 5
+        lines.append((line, f"{'Category':<20}{'Usage (MB)':<20}{'95% CI (MB)':<20}"))
+        for category, usage, margin in snapshot['categories']:
+            line += 1
+            lines.append((line, f"{category.capitalize():<20}{usage:<20.2f}{'±' + format(margin, '.2f'):<20}"))
+
+        line += 2
+        lines.append((line, f"{'Remote Host':<40}{'Hostname':<40}{'Usage (MB)':<14}{'Error (MB)':<14}"))
+        for host, hostname, count, error in snapshot['hosts']:
+            line += 1
+            lines.append((line, f"{host:<40}{hostname[:39]:<40}{count / (1024 * 1024):<14.2f}{error / (1024 * 1024):<14.2f}"))
+        line += 1
+        lines.append((line, f"Unique remote hosts (estimate): {snapshot['unique_hosts']:.0f}"))
+
+        if snapshot['owners']:
+            line += 2
+            lines.append((line, f"{'Owner':<40}{'Usage (MB)':<14}"))
+            for owner, count, _ in snapshot['owners']:
+                line += 1
+                lines.append((line, f"{owner:<40}{count / (1024 * 1024):<14.2f}"))
+
+        self.stdscr.addstr(0, 0, "Traffic Categorizer"[:max_cols - 1])
+        self.stdscr.addstr(1, 0, "=" * 20)
+        for row, text in lines:
+            if row >= max_rows - 2:
+                break
+            self.stdscr.addstr(row, 0, text[:max_cols - 1])
+
+        footer = "R: reset | Q: quit"
+        if self.categorizer.last_error:
+            footer += f" | {self.categorizer.last_error}"
+        if max_rows > 4:
+            self.stdscr.addstr(max_rows - 1, 0, footer[:max_cols - 1])
+        self.stdscr.refresh()